@@ -0,0 +1,284 @@
+"""Benchmark runner of the oktapy hot paths.
+
+Runs the cases of `benchmarks/cases.py` for each dataset size against a local Okta API
+emulator, see `oktapy.emulator`, and reports for each case the records processed per
+second, the p50 and p99 latency of its API calls and the peak RSS of the process. Every
+case runs in its own process, so that peak RSS is measured per case, and the emulator in
+another one.
+
+    python benchmarks/bench.py run --sizes 1k,10k,100k
+    python benchmarks/bench.py run --sizes 1k,10k --compare benchmarks/baselines/baseline.json
+    python benchmarks/bench.py compare benchmarks/baselines/baseline.json benchmarks/results/latest.json
+
+Baselines are results files kept in `benchmarks/baselines`. They depend on the machine,
+so compare against a baseline recorded on the same machine.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(os.path.dirname(BENCHMARKS), "src")
+
+DEFAULT_OUTPUT = os.path.join(BENCHMARKS, "results", "latest.json")
+
+# Seconds below which a case without setup is run several times per sample
+MIN_SAMPLE_TIME = 0.2
+
+_UNITS = {"k": 1000, "m": 1000000}
+
+
+def parse_size(value):
+    value = value.strip().lower()
+    if value[-1:] in _UNITS:
+        return int(float(value[:-1]) * _UNITS[value[-1]])
+    return int(value)
+
+
+def size_label(size):
+    for unit, factor in sorted(_UNITS.items(), key=lambda item: -item[1]):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{unit}"
+    return str(size)
+
+
+def percentile(values, p):
+    """Returns the nearest-rank percentile of the values, or None when there are none."""
+
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _env():
+    return dict(os.environ, PYTHONPATH=os.pathsep.join([SRC] + [p for p in [os.environ.get("PYTHONPATH")] if p]))
+
+
+# Case process
+
+def run_case(args):
+    sys.path[:0] = [SRC, BENCHMARKS]
+    from cases import CASES
+
+    options = {"concurrency": args.concurrency, "bulk_limit": args.bulk_limit}
+    case = CASES[args.name](args.size, args.url, options)
+
+    latencies = []
+    recording = [False]
+
+    def record(response, *hook_args, **hook_kwargs):
+        if recording[0]:
+            latencies.append(response.elapsed.total_seconds())
+
+    if case.okta is not None:
+        # Every API call goes through the pooled session of the requester; time them with its response hook
+        case.okta._requester._session.hooks["response"].append(record)
+
+    def sample(number):
+        if case.setup is not None:
+            case.setup()
+        recording[0] = True
+        start = time.perf_counter()
+        for _ in range(number):
+            records = case.run()
+        elapsed = time.perf_counter() - start
+        recording[0] = False
+        return records, elapsed / number
+
+    number = 1
+    records, first = sample(number)
+    times = [first]
+    if case.setup is None and first < MIN_SAMPLE_TIME:
+        # Too short to time reliably: treat the first run as a warm-up and loop the case in each sample
+        number = math.ceil(MIN_SAMPLE_TIME / max(first, 1e-6))
+        times = []
+        del latencies[:]
+    while len(times) < args.repeat:
+        records, seconds = sample(number)
+        times.append(seconds)
+
+    # The fastest sample is the least disturbed by the rest of the machine
+    seconds = min(times)
+    p50 = percentile(latencies, 50)
+    p99 = percentile(latencies, 99)
+    print(json.dumps({
+        "case": args.name,
+        "size": args.size,
+        "records": records,
+        "seconds": round(seconds, 4),
+        "records_per_sec": round(records / seconds, 1) if seconds else None,
+        "requests": len(latencies) // (args.repeat * number),
+        "p50_ms": None if p50 is None else round(p50 * 1000, 2),
+        "p99_ms": None if p99 is None else round(p99 * 1000, 2),
+        "peak_rss_mb": peak_rss_mb(),
+    }))
+
+
+# Runner
+
+def _start_emulator(size, latency):
+    process = subprocess.Popen([sys.executable, "-m", "oktapy.emulator", "--users", str(size), "--port", "0",
+                                "--latency", str(latency)], stdout=subprocess.PIPE, text=True, env=_env())
+    line = process.stdout.readline()
+    if not line:
+        process.wait()
+        sys.exit(f"The emulator failed to start (exit code {process.returncode})")
+    return process, line.split()[-1]
+
+
+def _format_row(values, widths):
+    return "  ".join(str(value).rjust(width) if index else str(value).ljust(width)
+                     for index, (value, width) in enumerate(zip(values, widths)))
+
+
+_COLUMNS = [("case", 24), ("size", 6), ("records/s", 12), ("requests", 9), ("p50 ms", 8), ("p99 ms", 8), ("peak MB", 8)]
+
+
+def _result_row(result):
+    return [result["case"], size_label(result["size"]), f"{result['records_per_sec']:,.0f}", result["requests"] or "",
+            "" if result["p50_ms"] is None else result["p50_ms"], "" if result["p99_ms"] is None else result["p99_ms"],
+            "" if result["peak_rss_mb"] is None else result["peak_rss_mb"]]
+
+
+def run(args):
+    sys.path[:0] = [BENCHMARKS]
+    from cases import CASES
+
+    names = args.cases.split(",") if args.cases else list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        sys.exit(f"Unknown case(s): {', '.join(unknown)}. Cases: {', '.join(CASES)}")
+
+    widths = [width for _, width in _COLUMNS]
+    print(_format_row([name for name, _ in _COLUMNS], widths))
+    results = []
+    for size in [parse_size(size) for size in args.sizes.split(",")]:
+        emulator, url = _start_emulator(size, args.latency)
+        try:
+            for name in names:
+                process = subprocess.run([sys.executable, os.path.abspath(__file__), "case", name, "--size", str(size),
+                                          "--url", url, "--repeat", str(args.repeat), "--concurrency", str(args.concurrency),
+                                          "--bulk-limit", str(args.bulk_limit)],
+                                         capture_output=True, text=True, env=_env())
+                if process.returncode != 0:
+                    print(process.stderr, file=sys.stderr)
+                    sys.exit(f"Case {name} failed for {size_label(size)} users")
+                result = json.loads(process.stdout.strip().splitlines()[-1])
+                results.append(result)
+                print(_format_row(_result_row(result), widths), flush=True)
+        finally:
+            emulator.terminate()
+            emulator.wait()
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": {"repeat": args.repeat, "concurrency": args.concurrency, "bulk_limit": args.bulk_limit,
+                    "latency": args.latency},
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=4)
+    print(f"Results saved in {args.output}")
+    if args.compare:
+        return compare(args.compare, args.output, args.threshold)
+    return 0
+
+
+def compare(baseline_file, results_file, threshold):
+    """Prints the change of every result against the baseline and returns 1 when any case regressed.
+
+    A case regresses when its throughput drops, or its peak RSS grows, by more than `threshold`.
+    """
+
+    with open(baseline_file) as file:
+        baseline = {(result["case"], result["size"]): result for result in json.load(file)["results"]}
+    with open(results_file) as file:
+        results = json.load(file)["results"]
+
+    columns = [("case", 24), ("size", 6), ("baseline/s", 12), ("records/s", 12), ("change", 8), ("p99 ms", 14),
+               ("peak MB", 14), ("", 0)]
+    widths = [width for _, width in columns]
+    print(_format_row([name for name, _ in columns], widths))
+    regressions = 0
+    for result in results:
+        base = baseline.get((result["case"], result["size"]))
+        if base is None:
+            print(_format_row([result["case"], size_label(result["size"]), "", f"{result['records_per_sec']:,.0f}", "",
+                               "", "", "no baseline"], widths))
+            continue
+        change = result["records_per_sec"] / base["records_per_sec"] - 1
+        notes = []
+        if change < -threshold:
+            notes.append("SLOWER")
+        elif change > threshold:
+            notes.append("faster")
+        if base["peak_rss_mb"] and result["peak_rss_mb"] and result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + threshold):
+            notes.append("MORE MEMORY")
+        regressions += any(note.isupper() for note in notes)
+        p99 = f"{base['p99_ms']} -> {result['p99_ms']}" if result["p99_ms"] is not None else ""
+        rss = f"{base['peak_rss_mb']} -> {result['peak_rss_mb']}" if result["peak_rss_mb"] is not None else ""
+        print(_format_row([result["case"], size_label(result["size"]), f"{base['records_per_sec']:,.0f}",
+                           f"{result['records_per_sec']:,.0f}", f"{change:+.1%}", p99, rss, ", ".join(notes)], widths))
+    print(f"{regressions} regression(s) beyond {threshold:.0%}.")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench.py", description="Benchmark the oktapy hot paths.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks and save the results.")
+    run_parser.add_argument("--sizes", default="1k,10k,100k", help="Comma separated dataset sizes, such as 1k,100k,1m")
+    run_parser.add_argument("--cases", help="Comma separated cases to run (default is all)")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Samples per case; the fastest is reported")
+    run_parser.add_argument("--concurrency", type=int, default=8, help="Concurrency of the bulk cases")
+    run_parser.add_argument("--bulk-limit", type=int, default=1000, help="Maximum users processed by the bulk cases")
+    run_parser.add_argument("--latency", type=float, default=0, help="Seconds of emulated latency per API call")
+    run_parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Results file")
+    run_parser.add_argument("--compare", metavar="BASELINE", help="Compare the results with a baseline file")
+    run_parser.add_argument("--threshold", type=float, default=0.2, help="Relative change reported as a regression")
+
+    compare_parser = commands.add_parser("compare", help="Compare results with a baseline.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("results", nargs="?", default=DEFAULT_OUTPUT)
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="Relative change reported as a regression")
+
+    case_parser = commands.add_parser("case", help=argparse.SUPPRESS)
+    case_parser.add_argument("name")
+    case_parser.add_argument("--size", type=int, required=True)
+    case_parser.add_argument("--url", required=True)
+    case_parser.add_argument("--repeat", type=int, default=3)
+    case_parser.add_argument("--concurrency", type=int, default=8)
+    case_parser.add_argument("--bulk-limit", type=int, default=1000)
+
+    args = parser.parse_args(argv)
+    if args.command == "case":
+        return run_case(args)
+    if args.command == "compare":
+        return compare(args.baseline, args.results, args.threshold)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""Benchmark cases of the oktapy hot paths.
+
+Every case is a function taking the dataset size, the emulator URL and the runner options,
+which does its untimed setup and returns a `Case`. The runner times `Case.run`, whose
+return value is the number of records processed. API cases talk to the emulator started by
+the runner, see `oktapy.emulator`. Local cases build their input from the same synthetic
+dataset.
+"""
+
+import atexit
+import contextlib
+import os
+import shutil
+import tempfile
+import uuid
+
+
+class Case(object):
+    """Timed part of a benchmark case.
+
+    Attributes
+    ----------
+    run : callable
+        Processes the records once and returns their number.
+    setup : callable, optional
+        Prepares the input of the next `run`, outside of the timing (default is None).
+    okta : object, optional
+        Okta client whose API calls are timed for the latency percentiles (default is None).
+    """
+
+    def __init__(self, run, setup=None, okta=None):
+        self.run = run
+        self.setup = setup
+        self.okta = okta
+
+
+def _okta(url, options):
+    from oktapy.okta import Okta
+
+    return Okta(url, token="benchmark", pool_maxsize=max(10, options.get("concurrency", 1)))
+
+
+def _users(size):
+    from oktapy.emulator import Dataset
+    from oktapy.resources.user import User
+
+    dataset = Dataset(users=size)
+    return [User(dataset.user(index)) for index in range(size)]
+
+
+def _payloads(count):
+    run = uuid.uuid4().hex[:8]
+    return [{"profile": {"login": f"bench.{run}.{index}@example.com", "email": f"bench.{run}.{index}@example.com",
+                         "firstName": "Bench", "lastName": str(index)}} for index in range(count)]
+
+
+def get_users(size, url, options):
+    """Lists every user page by page."""
+
+    users = _okta(url, options).UserMgr()
+    return Case(lambda: len(users.getUsers(limit=200)), okta=users._client)
+
+
+def get_users_lean(size, url, options):
+    """Lists every user into a UserBatch, decoding pages leanly."""
+
+    users = _okta(url, options).UserMgr()
+    return Case(lambda: len(users.getUsers(limit=200, bulk=True, lean=True)), okta=users._client)
+
+
+def to_users_json_from_csv(size, url, options):
+    """Builds user creation payloads from a CSV file."""
+
+    from oktapy.manage.UserMgr import to_frame, to_users_json_from_csv
+
+    directory = tempfile.mkdtemp(prefix="okta-bench-")
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    file = os.path.join(directory, "users.csv")
+    # Same layout as the CSV export of `users`
+    to_frame(_users(size)).to_csv(file, index=False)
+    return Case(lambda: len(to_users_json_from_csv(file, {"no-password": True})))
+
+
+def deep_search(size, url, options):
+    """Filters users with a regular expression and a substring pattern."""
+
+    import pandas  # noqa: F401 - imported outside of the timing
+    from oktapy.manage.UserMgr import UserMgr
+
+    users = _users(size)
+    manager = UserMgr(None)
+
+    def run():
+        manager.deep_search(users, {"login": r"^user\d*7@", "department": "Sales"})
+        return len(users)
+
+    return Case(run)
+
+
+def to_frame(size, url, options):
+    """Converts users to a DataFrame."""
+
+    import pandas  # noqa: F401 - imported outside of the timing
+    from oktapy.manage.UserMgr import to_frame
+
+    users = _users(size)
+    return Case(lambda: len(to_frame(users)))
+
+
+def tabulate_csv(size, url, options):
+    """Writes users as CSV with the `users` commands output."""
+
+    from commands.users import tabulate
+
+    users = _users(size)
+
+    def run():
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            tabulate(users, mode="csv")
+        return len(users)
+
+    return Case(run)
+
+
+def _bulk_size(size, options):
+    return min(size, options.get("bulk_limit", 1000))
+
+
+def create_users(size, url, options):
+    """Creates users in parallel."""
+
+    users = _okta(url, options).UserMgr()
+    state = {}
+
+    def setup():
+        state["payloads"] = _payloads(_bulk_size(size, options))
+
+    def run():
+        result = users.createUsers(state["payloads"], concurrency=options.get("concurrency", 1))
+        return len(result["success"])
+
+    return Case(run, setup=setup, okta=users._client)
+
+
+def _create(users, count, options):
+    concurrency = options.get("concurrency", 1)
+    payloads = _payloads(count)
+    users.createUsers(payloads, activate=True, concurrency=concurrency)
+    logins = [payload["profile"]["login"] for payload in payloads]
+    found, _ = users.resolveUsers(logins, concurrency=concurrency)
+    return [user["id"] for user in found]
+
+
+def deactivate_users(size, url, options):
+    """Deactivates users in parallel."""
+
+    users = _okta(url, options).UserMgr()
+    state = {}
+
+    def setup():
+        state["ids"] = _create(users, _bulk_size(size, options), options)
+
+    def run():
+        result = users.deactivateUsers(state["ids"], concurrency=options.get("concurrency", 1))
+        return len(result["success"])
+
+    return Case(run, setup=setup, okta=users._client)
+
+
+def delete_users(size, url, options):
+    """Deletes deactivated users in parallel."""
+
+    users = _okta(url, options).UserMgr()
+    state = {}
+
+    def setup():
+        state["ids"] = _create(users, _bulk_size(size, options), options)
+        users.deactivateUsers(state["ids"], concurrency=options.get("concurrency", 1))
+
+    def run():
+        result = users.deleteUsers(state["ids"], concurrency=options.get("concurrency", 1))
+        return len(result["success"])
+
+    return Case(run, setup=setup, okta=users._client)
+
+
+CASES = {case.__name__: case for case in [get_users, get_users_lean, to_users_json_from_csv, deep_search, to_frame,
+                                          tabulate_csv, create_users, deactivate_users, delete_users]}
@@ -58,4 +58,8 @@ setup(
         'pandas>=2.1.0',
         'prettytable==1.0.1'
     ],
+    extras_require={
+        'fast': ['orjson>=3.9'],
+        'async': ['aiohttp>=3.8'],
+    },
 )
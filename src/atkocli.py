@@ -3,35 +3,100 @@ import os
 import sys
 import json
 import configparser
-import importlib.util
+import importlib
 
 plugin_folder = os.path.join(os.path.dirname(__file__), 'commands')
 
+# Command names and short help, kept so that help and completion do not import every command module
+manifest_file = os.path.expanduser("~/.atkocli/commands.json")
+
 CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
 
 
 class AtkoCLI(click.MultiCommand):
+    """Command group loading its commands from the modules of the `commands` package.
+
+    A command module is imported once, on first use. Listing the commands, help and shell
+    completion read the command manifest instead, which is rebuilt whenever a command
+    module changes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(AtkoCLI, self).__init__(*args, **kwargs)
+        self._commands = {}
+        self._manifest = None
+
+    def _signature(self):
+        signature = {}
+        for entry in os.scandir(plugin_folder):
+            if entry.name.endswith('.py') and not entry.name.startswith('__init__'):
+                stat = entry.stat()
+                signature[entry.name[:-3]] = [stat.st_mtime_ns, stat.st_size]
+        return signature
+
+    def manifest(self, ctx):
+        """Returns the command name to short help mapping, from the manifest file while it is up to date."""
+        if self._manifest is not None:
+            return self._manifest
+        signature = self._signature()
+        try:
+            with open(manifest_file, 'r') as infile:
+                cached = json.load(infile)
+            if cached.get("signature") == signature:
+                self._manifest = cached["commands"]
+                return self._manifest
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+        commands = {}
+        for name in sorted(signature):
+            cmd = self.get_command(ctx, name)
+            if cmd is not None and not cmd.hidden:
+                commands[name] = cmd.get_short_help_str(limit=1000)
+        self._manifest = commands
+        try:
+            os.makedirs(os.path.dirname(manifest_file), exist_ok=True)
+            with open(manifest_file, 'w') as outfile:
+                json.dump({"signature": signature, "commands": commands}, outfile)
+        except OSError:
+            pass
+        return commands
 
     def list_commands(self, ctx):
-        rv = []
-        for filename in os.listdir(plugin_folder):
-            if filename.endswith('.py') and not filename.startswith('__init__'):
-                rv.append(filename[:-3])
-        rv.sort()
-        return rv
+        return list(self.manifest(ctx))
 
     def get_command(self, ctx, name):
-        try:
-            module_path = os.path.join(plugin_folder, name + '.py')
-            spec = importlib.util.spec_from_file_location(name, module_path)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            return module.cli
-        except Exception as e:
-            click.echo(f"Error loading command {name}: {str(e)}", err=True)
-            return None
+        if name not in self._commands:
+            try:
+                self._commands[name] = importlib.import_module(f"commands.{name}").cli
+            except Exception as e:
+                click.echo(f"Error loading command {name}: {str(e)}", err=True)
+                return None
+        return self._commands[name]
+
+    def format_commands(self, ctx, formatter):
+        commands = self.manifest(ctx)
+        if commands:
+            limit = formatter.width - 6 - max(len(name) for name in commands)
+            rows = [(name, click.utils.make_default_short_help(help, limit)) for name, help in commands.items()]
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
+
+    def shell_complete(self, ctx, incomplete):
+        from click.shell_completion import CompletionItem
+
+        results = [CompletionItem(name, help=help) for name, help in self.manifest(ctx).items() if name.startswith(incomplete)]
+        # Options of the group itself
+        results.extend(click.Command.shell_complete(self, ctx, incomplete))
+        return results
 
     def __call__(self, *args, **kwargs):
+        if not args and "args" not in kwargs:
+            # Run in the agent when one is up, with its warm clients
+            from common import okt_agent
+            code = okt_agent.forward(sys.argv[1:])
+            if code is not None:
+                sys.exit(code)
         try:
             return super(AtkoCLI, self).__call__(
                 *args, standalone_mode=False, **kwargs)
@@ -65,6 +130,7 @@ def cli(ctx):
     _config_file = os.path.expanduser(_config_directory + "/config")
     _credential_file = os.path.expanduser(_config_directory + "/credentials")
     _cache_file = os.path.expanduser(_config_directory + "/cache")
+    _jobs_directory = os.path.expanduser(_config_directory + "/jobs")
 
     if(not os.path.isdir(_config_directory)):
         click.echo(f"{_config_directory} does not exist")
@@ -91,16 +157,13 @@ def cli(ctx):
         with open(_credential_file, 'w'):
             _credentials.write(_credential_file)
 
-    if not os.path.exists(_cache_file):
-        with open(_cache_file, 'w') as out:
-            json.dump({}, out)
-
     ctx.obj = {
         'config': _config,
         'credentials': _credentials,
         'config_file': _config_file,
         'credential_file': _credential_file,
-        'cache_file': _cache_file
+        'cache_file': _cache_file,
+        'jobs_directory': _jobs_directory
     }
 
 
@@ -0,0 +1,85 @@
+import click
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from common import okt_agent
+
+
+@click.group()
+def cli():
+    """Manage the local agent keeping clients warm."""
+
+
+@cli.command()
+@click.option("--idle-timeout", type=click.FloatRange(min=0), default=3600, show_default=True,
+              help="Seconds without commands after which the agent exits. 0 keeps it running.")
+def start(idle_timeout):
+    """Start the agent in the background.
+
+    While it runs, atko commands are executed by the agent, reusing its Okta clients,
+    connections and caches. Set ATKO_NO_AGENT to run a command in-process anyway.
+    """
+
+    path = okt_agent.socket_path()
+    try:
+        status = okt_agent.request("ping", path)
+        click.echo(f"Agent already running (pid {status['pid']}).")
+        return
+    except (OSError, ValueError):
+        pass
+
+    log_file = os.path.join(os.path.dirname(path), "agent.log")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    src_directory = os.path.dirname(os.path.dirname(os.path.abspath(okt_agent.__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([src_directory] + [p for p in [os.environ.get("PYTHONPATH")] if p]))
+    env.pop("ATKO_PROFILE", None)
+    with open(log_file, "a") as log:
+        process = subprocess.Popen([sys.executable, "-m", "common.okt_agent", path, str(idle_timeout)],
+                                   stdin=subprocess.DEVNULL, stdout=log, stderr=log, env=env,
+                                   cwd=os.path.expanduser("~"), start_new_session=True)
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise click.ClickException(f"Agent failed to start. See {log_file}")
+        try:
+            status = okt_agent.request("ping", path)
+            click.echo(f"Agent started (pid {status['pid']}), listening on {path}.")
+            return
+        except (OSError, ValueError):
+            time.sleep(0.05)
+    raise click.ClickException(f"Agent did not start in time. See {log_file}")
+
+
+@cli.command()
+def stop():
+    """Stop the agent."""
+
+    path = okt_agent.socket_path()
+    try:
+        status = okt_agent.request("stop", path)
+    except (OSError, ValueError):
+        click.echo("Agent is not running.")
+        return
+    deadline = time.monotonic() + 10
+    while os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    click.echo(f"Agent stopped (pid {status['pid']}, {status['served']} command(s) served).")
+
+
+@cli.command()
+def status():
+    """Show whether the agent is running."""
+
+    try:
+        status = okt_agent.request("ping")
+    except (OSError, ValueError):
+        click.echo("Agent is not running.")
+        sys.exit(1)
+    click.echo(f"Agent running (pid {status['pid']}) since {datetime.fromtimestamp(status['started']).strftime('%Y-%m-%d %H:%M:%S')}.")
+    click.echo(f"{status['served']} command(s) served.")
+    if status["profiles"]:
+        click.echo(f"Warm profiles: {', '.join(status['profiles'])}")
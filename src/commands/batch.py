@@ -0,0 +1,128 @@
+import click
+import io
+import json
+import shlex
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import okt_common
+from common.okt_output import ThreadLocalStream
+
+# Commands that cannot run from a batch
+_EXCLUDED = ["batch", "agent"]
+
+
+def _parse(script):
+    """Returns the stages of a batch script, each a list of `(line number, text, arguments)` commands.
+
+    Commands are separated into stages by `wait` lines. Blank lines and `#` comments are ignored,
+    and a leading `atko` is optional.
+    """
+    stages = [[]]
+    for number, line in enumerate(script, start=1):
+        try:
+            args = shlex.split(line, comments=True)
+        except ValueError as err:
+            raise click.ClickException(f"Line {number}: {err}") from err
+        if args and args[0] == "atko":
+            args = args[1:]
+        if not args:
+            continue
+        if args == ["wait"]:
+            stages.append([])
+            continue
+        if args[0] in _EXCLUDED:
+            raise click.ClickException(f"Line {number}: `{args[0]}` cannot run in a batch.")
+        stages[-1].append((number, line.strip(), args))
+    return [stage for stage in stages if stage]
+
+
+def _execute(command, capture, streams):
+    """Runs one command of the batch and returns its result, with its output when captured."""
+    from atkocli import cli
+
+    number, text, args = command
+    output = io.StringIO() if capture else None
+    stdout, stderr, stdin = streams
+    if capture:
+        stdout.bind(output)
+        stderr.bind(output)
+    # Commands get no input; prompts must be answered with options such as --confirm
+    stdin.bind(io.StringIO())
+    start = time.perf_counter()
+    code = 0
+    try:
+        cli(args, prog_name="atko")
+    except SystemExit as ex:
+        code = ex.code if isinstance(ex.code, int) else (0 if ex.code is None else 1)
+    except BaseException as ex:
+        click.echo(f"{ex.__class__}:{ex}")
+        code = 112
+    finally:
+        stdout.unbind()
+        stderr.unbind()
+        stdin.unbind()
+    return {"line": number, "command": text, "exit_code": code, "seconds": round(time.perf_counter() - start, 3),
+            "output": output.getvalue() if capture else None}
+
+
+@click.command(short_help='Run many commands in one process')
+@click.argument('script', type=click.File(mode="r"))
+@click.option('--parallel', type=click.IntRange(min=1), default=1, help='Number of commands of a stage run at the same time.')
+@click.option('--stop-on-error', is_flag=True, help='Skip the remaining stages once a command fails.')
+@click.option('--report', 'report_file', type=click.File(mode="w"), help='Save the result of every command as JSON.')
+@okt_common.timer
+def cli(script, parallel, stop_on_error, report_file):
+    """Run the users and groups commands of a SCRIPT file, or - for stdin, in one process.
+
+    Each line holds one command as typed after `atko`, such as `users get john.doe@example.com`.
+    All commands share the Okta clients, connections and cache of their profile. With
+    --parallel, the commands between two `wait` lines run concurrently, and their output is
+    shown in script order once each completes. Commands get no input, so bulk commands need
+    their --confirm option.
+    """
+
+    stages = _parse(script)
+    okt_common.keep_providers()
+
+    streams = (ThreadLocalStream(sys.stdout), ThreadLocalStream(sys.stderr), ThreadLocalStream(sys.stdin))
+    saved_streams = (sys.stdout, sys.stderr, sys.stdin)
+    sys.stdout, sys.stderr, sys.stdin = streams
+    results = []
+    skipped = []
+    try:
+        for index, stage in enumerate(stages):
+            if parallel == 1:
+                for command in stage:
+                    if stop_on_error and any(result["exit_code"] != 0 for result in results):
+                        skipped.append(command)
+                        continue
+                    results.append(_execute(command, False, streams))
+            else:
+                with ThreadPoolExecutor(max_workers=parallel) as pool:
+                    futures = [pool.submit(_execute, command, True, streams) for command in stage]
+                    for future in futures:
+                        result = future.result()
+                        click.echo(result["output"], nl=False)
+                        results.append(result)
+            if stop_on_error and any(result["exit_code"] != 0 for result in results):
+                skipped.extend(command for stage in stages[index + 1:] for command in stage)
+                break
+    finally:
+        sys.stdout, sys.stderr, sys.stdin = saved_streams
+
+    failed = [result for result in results if result["exit_code"] != 0]
+    click.echo()
+    click.echo(f"{len(results)} command(s) run, {len(results) - len(failed)} succeeded, {len(failed)} failed.")
+    for result in failed:
+        click.echo(f"Line {result['line']}: `{result['command']}` exited with {result['exit_code']}.")
+    if skipped:
+        click.echo(f"{len(skipped)} command(s) skipped after a failure.")
+    if report_file:
+        report = results + [{"line": number, "command": text, "exit_code": None, "seconds": 0, "output": None}
+                            for number, text, args in skipped]
+        json.dump(sorted(report, key=lambda result: result["line"]), report_file, indent=4)
+        click.echo(f"Report saved in {report_file.name}")
+    if failed:
+        sys.exit(113)
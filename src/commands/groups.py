@@ -3,17 +3,16 @@ import sys
 import os
 import json
 import traceback
-from prettytable import PrettyTable
 
 # Add src directory to Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from common.okt_common import global_options, get_profile, get_okta_provider
-from oktapy.okta import Okta
+from common.okt_common import global_options, get_profile, get_okta_provider, get_journal, result_suffix, MutuallyExclusiveOption
+from common.okt_output import STREAM_MODES, write_records
 from oktapy.manage.GroupMgr import GroupMgr
-from oktapy.manage.UserMgr import UserMgr
 from oktapy.exceptions import ServiceException
 from oktapy.resources.user import User  # Add this import at the top
+from oktapy.utils import readCSV
 
 @click.group()
 @global_options
@@ -23,14 +22,10 @@ def cli(ctx, **kwargs):
     pass
 
 def tabulate(itemlist, all=False, mode="stdout", headers=['Name', 'Type', 'ID']):
-    if mode == "csv":
-        item_frame = GroupMgr.to_frame(itemlist)
-        click.echo(",".join(item_frame.columns.tolist()))
-        csv_list = [",".join(item) for item in item_frame.values]
-        click.echo("\n".join(csv_list))
-        click.echo()
-        click.echo(f"{len(csv_list)} record(s)")
+    if mode in STREAM_MODES:
+        write_records(itemlist, mode=mode)
     else:
+        from prettytable import PrettyTable
         _pretty_table = PrettyTable(headers)
 
         if all or len(itemlist) <= 10:
@@ -50,29 +45,29 @@ def tabulate(itemlist, all=False, mode="stdout", headers=['Name', 'Type', 'ID'])
 @click.option('--limit', type=int, default=20, help='Number of results to return')
 @click.option('--all', '-a', is_flag=True, help='List all records')
 @click.option('--file', 'output_file', type=click.File(mode="w"), help='Output file')
+@click.option('--prefetch', type=click.IntRange(min=0), default=2, help='Number of pages to fetch ahead with --all')
 @global_options
 @click.pass_context
-def find(ctx, query, filter, limit, all, output_file, **kwargs):
+def find(ctx, query, filter, limit, all, output_file, prefetch, **kwargs):
     """List groups"""
     provider = get_okta_provider(ctx, kwargs["profile"])
     try:
-        groups = provider.GroupMgr().list(query=query, filter=filter, limit=limit)
+        if all:
+            # Follow all pages, using the limit as the page size
+            groups = provider.GroupMgr().iter_groups(query=query, filter=filter, limit=limit, prefetch=prefetch)
+        else:
+            groups = provider.GroupMgr().list(query=query, filter=filter, limit=limit)
         output_mode = kwargs.get("output", "stdout")
         
         if output_file:
-            if output_mode == "csv":
-                GroupMgr.to_frame(groups).to_csv(output_file.name, index=False)
-            else:
-                json.dump([json.loads(str(group)) for group in groups], output_file, indent=4, sort_keys=True)
-            click.echo(f"Saved groups in {output_file.name}")
+            count = write_records(groups, mode=output_mode if output_mode in STREAM_MODES else "json", file=output_file)
+            click.echo(f"Saved {count} group(s) in {output_file.name}")
+        elif output_mode in STREAM_MODES:
+            write_records(groups, mode=output_mode)
         elif output_mode == "id":
             click.echo(','.join([group["id"] for group in groups]))
-        elif output_mode == "json":
-            click.echo(groups)
-        elif output_mode == "csv":
-            tabulate(groups, all=True, mode="csv")
         else:
-            tabulate(groups, all=all)
+            tabulate(list(groups), all=all)
             
     except ServiceException as e:
         click.echo(f"Error listing groups: {str(e)}")
@@ -228,37 +223,39 @@ def users():
 @click.option('--limit', type=int, default=200, help='Number of results to return')
 @click.option('--file', 'output_file', type=click.File(mode="w"), help='Output file')
 @click.option('--all', '-a', is_flag=True, help='List all records')
+@click.option('--prefetch', type=click.IntRange(min=0), default=2, help='Number of pages to fetch ahead with --all')
 @global_options
 @click.pass_context
-def list_users(ctx, group_id, limit, output_file, all, **kwargs):
+def list_users(ctx, group_id, limit, output_file, all, prefetch, **kwargs):
     """List group members"""
     provider = get_okta_provider(ctx, kwargs["profile"])
     try:
-        raw_users = provider.GroupMgr().list_users(group_id, limit=limit)
-        # Convert raw user data to User objects
-        users = [User(data) for data in raw_users]
+        if all:
+            # Follow all pages, fetching ahead while the current page is written
+            users = provider.GroupMgr().iter_users(group_id, limit=limit, prefetch=prefetch)
+        else:
+            raw_users = provider.GroupMgr().list_users(group_id, limit=limit)
+            # Convert raw user data to User objects
+            users = [User(data) for data in raw_users]
         
         output_mode = kwargs.get("output", "stdout")
         
         if output_file:
-            if output_mode == "csv":
-                UserMgr.to_frame(users).to_csv(output_file.name, index=False)
-            else:
-                json.dump([json.loads(str(user)) for user in users], output_file, indent=4, sort_keys=True)
-            click.echo(f"Saved users in {output_file.name}")
+            count = write_records(users, mode=output_mode if output_mode in STREAM_MODES else "json", file=output_file)
+            click.echo(f"Saved {count} user(s) in {output_file.name}")
+        elif output_mode in STREAM_MODES:
+            write_records(users, mode=output_mode)
         elif output_mode == "id":
             click.echo(','.join([user["id"] for user in users]))
-        elif output_mode == "json":
-            click.echo(users)
-        elif output_mode == "csv":
-            tabulate(users, all=True, mode="csv", headers=['Login', 'First Name', 'Last Name', 'Email', 'Status', 'ID'])
         else:
+            users = list(users)
             if all or len(users) <= 10:
                 items = [user.summary() for user in users]
             else:
                 items = [user.summary() for user in sorted(users[0:5])]
                 items = items + [["..." for i in range(6)]] * 2
 
+            from prettytable import PrettyTable
             _pretty_table = PrettyTable(['Login', 'First Name', 'Last Name', 'Email', 'Status', 'ID'])
             for item in items:
                 _pretty_table.add_row(item)
@@ -274,15 +271,104 @@ def list_users(ctx, group_id, limit, output_file, all, **kwargs):
         else:
             click.echo(f"Error listing users: {str(e)}")
 
+def _member_targets(provider, file, field, search):
+    """Returns the values identifying the users of a bulk membership change, and the attribute they belong to"""
+    if file:
+        data = readCSV(file)
+        if field not in data:
+            raise click.UsageError(f"Column '{field}' not found in {file}.")
+        return data[field], field
+    if search:
+        # Only the ids are needed
+        return [user["id"] for user in provider.UserMgr().iterUsers(search=search, attr="login", lean=True)], "id"
+
+
+def _update_members(ctx, provider, group_id, targets, field, operation, confirm, concurrency, resume, debug):
+    """Adds or removes many users, reporting the outcome like `atko users deactivate`"""
+    verb = "added to" if operation == "add" else "removed from"
+    if len(targets) == 0:
+        click.echo("No target users(s).")
+        return
+    if not (confirm or click.confirm(f"{len(targets)} user(s) are going to be {verb} group {group_id}. Proceed?")):
+        click.echo("Cancelled.")
+        return
+
+    group_manager = provider.GroupMgr()
+    bulk = group_manager.add_users if operation == "add" else group_manager.remove_users
+    with get_journal(ctx, f"group-{operation}", resume=resume) as journal:
+        if resume:
+            click.echo(f"Resuming job {journal.job_id}.")
+        else:
+            click.echo(f"Job {journal.job_id}. If interrupted, run the same command with `--resume {journal.job_id}`.")
+        result = bulk(group_id, targets, field=field, concurrency=concurrency, journal=journal)
+    if result["resumed"] > 0:
+        click.echo(f"{result['resumed']} record(s) already completed by an earlier run were skipped.")
+    if not journal.finish():
+        click.echo(f"Run the same command with `--resume {journal.job_id}` to retry the failed records.")
+
+    success = result["success"]
+    failure = result["failure"]
+    suffix = result_suffix()
+    click.echo(f"{len(success)} user(s) {verb} group {group_id}.")
+    if result["retries"] > 0:
+        click.echo(f"{result['retries']} API call(s) retried.")
+    if len(success) > 0:
+        success_file = f"okt_group_{operation}_success_{suffix}.txt"
+        with open(success_file, 'w') as outfile:
+            json.dump(success, outfile)
+    if len(failure) > 0:
+        click.echo(f"Failed for {len(failure)} user(s).")
+        failure_file = f"okt_group_{operation}_failed_{suffix}.txt"
+        with open(failure_file, 'w') as outfile:
+            json.dump(failure, outfile)
+    if debug and len(result["errors"]) > 0:
+        error_file = f"okt_errors_group_{operation}_{suffix}.log"
+        with open(error_file, 'w') as outfile:
+            json.dump(result["errors"], outfile, default=str)
+        click.echo(f"Error information saved to {error_file}")
+
+
+_bulk_member_options = [
+    click.option('--user-id', help='User ID', cls=MutuallyExclusiveOption, mutually_exclusive=["file", "search"]),
+    click.option('--file', type=click.Path(exists=True, dir_okay=False), help='Header based CSV file containing target users.',
+                 cls=MutuallyExclusiveOption, mutually_exclusive=["user_id", "search"]),
+    click.option('--field', default="id", help='CSV column identifying the users with --file. Example - login'),
+    click.option('--search', help='Okta search expression selecting the target users.',
+                 cls=MutuallyExclusiveOption, mutually_exclusive=["user_id", "file"]),
+    click.option('--confirm', '-y', is_flag=True, help='Confirm bulk operation.'),
+    click.option('--concurrency', type=click.IntRange(min=1), default=1, help='Number of API calls to run in parallel. Connections per host are capped by the profile pool_maxsize setting.'),  # noqa: E501
+    click.option('--resume', 'resume', metavar='JOB_ID', help='Resume an interrupted bulk job. Users that already succeeded are skipped.'),  # noqa: E501
+]
+
+
+def bulk_member_options(func):
+    for option in reversed(_bulk_member_options):
+        func = option(func)
+    return func
+
+
 @users.command(name='add')
 @click.option('--group-id', required=True, help='Group ID')
-@click.option('--user-id', required=True, help='User ID')
+@bulk_member_options
 @global_options
 @click.pass_context
-def add_user(ctx, group_id, user_id, **kwargs):
-    """Add user to group"""
+def add_user(ctx, group_id, user_id, file, field, search, confirm, concurrency, resume, **kwargs):
+    """Add users to group, one with --user-id or many with --file or --search"""
     provider = get_okta_provider(ctx, kwargs["profile"])
     debug = kwargs.get("debug", False)
+    if not (user_id or file or search):
+        raise click.UsageError("One of --user-id, --file or --search is required.")
+    if not user_id:
+        try:
+            targets, target_field = _member_targets(provider, file, field, search)
+            _update_members(ctx, provider, group_id, targets, target_field, "add", confirm, concurrency, resume, debug)
+        except click.ClickException:
+            raise
+        except Exception as e:
+            click.echo(f"Error adding users: {str(e)}")
+            if debug:
+                traceback.print_exc()
+        return
     try:
         # First verify the group exists
         try:
@@ -328,12 +414,26 @@ def add_user(ctx, group_id, user_id, **kwargs):
 
 @users.command(name='remove')
 @click.option('--group-id', required=True, help='Group ID')
-@click.option('--user-id', required=True, help='User ID')
+@bulk_member_options
 @global_options
 @click.pass_context
-def remove_user(ctx, group_id, user_id, **kwargs):
-    """Remove user from group"""
+def remove_user(ctx, group_id, user_id, file, field, search, confirm, concurrency, resume, **kwargs):
+    """Remove users from group, one with --user-id or many with --file or --search"""
     provider = get_okta_provider(ctx, kwargs["profile"])
+    if not (user_id or file or search):
+        raise click.UsageError("One of --user-id, --file or --search is required.")
+    if not user_id:
+        try:
+            targets, target_field = _member_targets(provider, file, field, search)
+            _update_members(ctx, provider, group_id, targets, target_field, "remove", confirm, concurrency, resume,
+                            kwargs["debug"])
+        except click.ClickException:
+            raise
+        except Exception as e:
+            click.echo(f"Error removing users: {str(e)}")
+            if kwargs["debug"]:
+                traceback.print_exc()
+        return
     try:
         provider.GroupMgr().remove_user(group_id, user_id)
         click.echo(f"User {user_id} removed from group {group_id}")
@@ -2,10 +2,9 @@ import click
 import json
 import sys
 import traceback
-from datetime import datetime
-from prettytable import PrettyTable
 from oktapy.exceptions import ServiceException
-from common.okt_common import global_options, get_handler, MutuallyExclusiveOption, DependentOption, timer
+from common.okt_common import global_options, get_handler, get_store, get_journal, result_suffix, MutuallyExclusiveOption, DependentOption, timer
+from common.okt_output import STREAM_MODES, write_records
 import oktapy.manage.UserMgr as UserMgr
 from oktapy.utils import readCSV
 
@@ -105,9 +104,18 @@ def _single_user_from_prompt(password=None, password_import=False, password_requ
     return user_payload
 
 
-def _retrieve_target_ids(user_manager, query, operation=None, field="id", prefix=False, file=False, conditions=False, pattern=False):
+def _retrieve_target_ids(user_manager, query, operation=None, field="id", prefix=False, file=False, conditions=False, pattern=False,
+                         concurrency=1):
 
-    ALL_STATUS = ["STAGED", "PROVISIONED", "ACTIVE", "RECOVERY", "LOCKED_OUT", "PASSWORD_EXPIRED", "SUSPENDED", "DEPROVISIONED"]
+    return [user["id"] for user in _retrieve_target_users(user_manager, query, operation=operation, field=field, prefix=prefix,
+                                                          file=file, conditions=conditions, pattern=pattern,
+                                                          concurrency=concurrency)]
+
+
+def _retrieve_target_users(user_manager, query, operation=None, field="id", prefix=False, file=False, conditions=False, pattern=False,
+                           concurrency=1):
+
+    ALL_STATUS = UserMgr.ALL_STATUS
 
     if operation == "deactivate":
         status_list = list(set(ALL_STATUS) - {"DEPROVISIONED"})
@@ -116,24 +124,28 @@ def _retrieve_target_ids(user_manager, query, operation=None, field="id", prefix
     else:
         status_list = ALL_STATUS
 
-    if file:
-        data = readCSV(query)
-        query_field = data.get(field, {})
-        if not query_field:
-            return []
-        query_str = ",".join(query_field)
-    else:
-        query_str = query
-
     if conditions:
         criteria, p_dict = _get_filter_criteria(query, conditions=conditions, pattern=pattern, status_list=status_list)
-        targets = [user["id"] for user in user_manager.getUsers(search=criteria, deepSearch=p_dict)]
+        return user_manager.getUsers(search=criteria, deepSearch=p_dict)
+
+    if file:
+        values = readCSV(query).get(field, [])
     else:
-        criteria, p_dict = _get_filter_criteria(query_str, field, status_list=status_list, fuzzy=prefix)
-        targets = [user["id"] for user in user_manager.getUsers(search=criteria)]
+        values = query.split(",")
+
+    # Targets are always looked up live: the status of a cached user may be stale, and
+    # decides whether the user is deactivated, deleted or skipped
+    users, unresolved = user_manager.resolveUsers(values, field=field, status_list=status_list, prefix=prefix,
+                                                  concurrency=concurrency)
+    user_manager.cacheUsers(users)
+    if unresolved:
+        click.echo(f"{len(unresolved)} value(s) did not match any target user.")
+        unresolved_file = "okt_user_unresolved_" + result_suffix() + ".txt"
+        with open(unresolved_file, 'w') as outfile:
+            json.dump(unresolved, outfile)
+        click.echo(f"Unmatched values saved to {unresolved_file}")
 
-    print(targets)
-    return targets
+    return users
 
 
 def _get_filter_criteria(query, field=None, status_list=[], conditions=False, pattern=False, fuzzy=False):
@@ -192,15 +204,26 @@ def _get_filter_criteria(query, field=None, status_list=[], conditions=False, pa
     return criteria, p_dict
 
 
+def _job_started(journal, resume):
+    if resume:
+        click.echo(f"Resuming job {journal.job_id}.")
+    else:
+        click.echo(f"Job {journal.job_id}. If interrupted, run the same command with `--resume {journal.job_id}`.")
+
+
+def _job_finished(journal, result):
+    if result.get("resumed", 0) > 0:
+        click.echo(f"{result['resumed']} record(s) already completed by an earlier run were skipped.")
+    # The journal is only kept to retry failed records
+    if not journal.finish():
+        click.echo(f"Run the same command with `--resume {journal.job_id}` to retry the failed records.")
+
+
 def tabulate(itemlist, all=False, mode="stdout", headers=['Login', 'First Name', 'Last Name', 'Email', "Status", "ID"]):
-    if mode == "csv":
-        item_frame = UserMgr.to_frame(itemlist)
-        click.echo(",".join(item_frame.columns.tolist()))
-        csv_list = [",".join(item) for item in item_frame.values]
-        click.echo("\n".join(csv_list))
-        click.echo()
-        click.echo(f"{len(csv_list)} record(s)")
+    if mode in STREAM_MODES:
+        write_records(itemlist, mode=mode)
     else:
+        from prettytable import PrettyTable
         _pretty_table = PrettyTable(headers)
 
         if all or len(itemlist) <= 10:
@@ -215,6 +238,22 @@ def tabulate(itemlist, all=False, mode="stdout", headers=['Login', 'First Name',
         click.echo(f"{len(itemlist)} record(s)")
 
 
+def csv_columns(attr):
+    """Returns the CSV columns of users filtered with `--attr`, or None when every attribute is kept."""
+
+    if attr is None:
+        return None
+    return set(attr.split(",")) | {"id", "login", "status"}
+
+
+def save(users, output_file, output_mode, columns=None):
+    """Writes users to the output file, as CSV or NDJSON when requested and as JSON otherwise."""
+
+    count = write_records(users, mode=output_mode if output_mode in STREAM_MODES else "json", file=output_file,
+                          columns=columns)
+    click.echo(f"Saved {count} user(s) in {output_file.name}")
+
+
 @click.group()
 def cli():
     """Okta User Management"""
@@ -291,7 +330,7 @@ def get(ctx, output_file, query, attr, count, all, multiple, field, conditions,
                 criteria = criteria + f"{key} sw \"{val}\""
                 criteria = criteria + " and "
             criteria = criteria[:-5]
-        users_list = user_manager.getUsers(search=criteria, attr=attr, threshold=count, deepSearch=p_dict)
+        users_list = user_manager.getUsers(search=criteria, attr=attr, threshold=count, deepSearch=p_dict, lean=True)
     elif multiple:
         if field in ["id", "status", "type.id"]:
             search = field
@@ -303,28 +342,20 @@ def get(ctx, output_file, query, attr, count, all, multiple, field, conditions,
             criteria = criteria + f"{search} sw \"{key}\""
             criteria = criteria + " or "
         criteria = criteria[:-4]
-        users_list = user_manager.getUsers(search=criteria, attr=attr, threshold=count)
+        users_list = user_manager.getUsers(search=criteria, attr=attr, threshold=count, lean=True)
     else:
         key = query
         user = user_manager.getUser(key, attr=attr)
         users_list = [user]
 
     if(output_file):
-        if output_mode == "csv":
-            UserMgr.to_frame(users_list).to_csv(output_file.name, index=False)
-        else:
-            json.dump([json.loads(str(ob)) for ob in users_list], output_file, indent=4, sort_keys=True)
-        click.echo(f"Saved users in {output_file.name}")
+        save(users_list, output_file, output_mode, columns=csv_columns(attr))
     elif output_mode == "id":
         click.echo(','.join([user["id"] for user in users_list]))
     elif output_mode == "login":
         click.echo(','.join([user["profile"]["login"] for user in users_list]))
-    elif output_mode == "json":
-        click.echo(users_list)
-    elif output_mode == "csv":
-        tabulate(users_list, all=True, mode="csv")
     else:
-        tabulate(users_list, all=all)
+        tabulate(users_list, all=all, mode=output_mode)
 
 
 @cli.command(short_help='List users')
@@ -336,11 +367,19 @@ def get(ctx, output_file, query, attr, count, all, multiple, field, conditions,
 @click.option('--attr', help='Filter with subset of attributes')
 @click.option('--count', type=int, default=0, help='Maximum number of records to return')
 @click.option('--pattern', '-e', help='Search based on pattern or substring. Expensive operation.')
+@click.option('--prefetch', type=click.IntRange(min=0), default=2, help='Number of pages to fetch ahead while the current page is processed.')
+@click.option('--literal', is_flag=True, help='Match patterns as literal substrings instead of regular expressions.')
+@click.option('--ignore-case', '-i', is_flag=True, help='Match patterns case-insensitively.')
+@click.option('--offline', is_flag=True, help='Query the local user snapshot instead of Okta. Run `users sync` first.')
 @global_options
 @click.pass_context
 @timer
-def find(ctx, output_file, all, query, filter, search, attr, count, pattern, **kwargs):
-    """List all users. Optionally save them to a file."""
+def find(ctx, output_file, all, query, filter, search, attr, count, pattern, literal, ignore_case, prefetch, offline, **kwargs):
+    """List all users. Optionally save them to a file.
+
+    With `--offline`, the criteria are evaluated against the local user snapshot kept by
+    `users sync`, without any API call.
+    """
 
     debug = kwargs["debug"]
     output_mode = kwargs["output"]
@@ -358,7 +397,32 @@ def find(ctx, output_file, all, query, filter, search, attr, count, pattern, **k
                 val = components[1]
                 p_dict[key] = val
 
-        users_list = user_manager.getUsers(query=query, filter=filter, search=search, attr=attr, threshold=count, deepSearch=p_dict)
+        if offline:
+            store = get_store(ctx, kwargs["profile"])
+            if store.count() == 0:
+                raise click.ClickException("Local user snapshot is empty. Run `atko users sync` first.")
+            users = user_manager.findOfflineUsers(store, query=query, filter=filter, search=search, attr=attr, threshold=count,
+                                                  deepSearch=p_dict, regex=not literal, case=not ignore_case)
+        else:
+            users = None
+
+        if output_file or output_mode in STREAM_MODES:
+            if users is None:
+                users = user_manager.iterUsers(query=query, filter=filter, search=search, attr=attr, threshold=count, deepSearch=p_dict,
+                                               prefetch=prefetch, regex=not literal, case=not ignore_case, lean=True)
+            if output_file:
+                save(users, output_file, output_mode, columns=csv_columns(attr))
+            else:
+                write_records(users, mode=output_mode, columns=csv_columns(attr))
+            click.echo()
+            return
+
+        if users is not None:
+            users_list = list(users)
+        else:
+            users_list = user_manager.getUsers(query=query, filter=filter, search=search, attr=attr, threshold=count, deepSearch=p_dict,
+                                               prefetch=prefetch, regex=not literal, case=not ignore_case, bulk=True,
+                                               lean=True)
     except ServiceException as ex:
         click.echo(traceback.format_exc()) if debug else click.echo(f"Error: {ex.info}")
         click.echo()
@@ -368,25 +432,85 @@ def find(ctx, output_file, all, query, filter, search, attr, count, pattern, **k
         click.echo()
         sys.exit(113)
     else:
-        if(output_file):
-            if output_mode == "csv":
-                UserMgr.to_frame(users_list).to_csv(output_file.name, index=False)
-            else:
-                json.dump([json.loads(str(ob)) for ob in users_list], output_file, indent=4, sort_keys=True)
-            click.echo(f"Saved users in {output_file.name}")
-        elif output_mode == "id":
+        if output_mode == "id":
             click.echo(','.join([user["id"] for user in users_list]))
         elif output_mode == "login":
             click.echo(','.join([user["profile"]["login"] for user in users_list]))
-        elif output_mode == "json":
-            click.echo(users_list)
-        elif output_mode == "csv":
-            tabulate(users_list, all=True, mode="csv")
         else:
             tabulate(users_list, all=all)
         click.echo()
 
 
+@cli.command(short_help='Export all users')
+@click.option('--file', 'output_file', type=click.File(mode="w"), help='Output file')
+@click.option('--shards', type=click.IntRange(min=1), default=4, help='Number of disjoint user shards paginated in parallel.')
+@click.option('--search', '-s', help='Restrict the export to users matching the search criteria')
+@click.option('--attr', help='Filter with subset of attributes')
+@global_options
+@click.pass_context
+@timer
+def export(ctx, output_file, shards, search, attr, **kwargs):
+    """Export all users, in every status, as CSV (default), JSON or NDJSON.
+
+    The user population is split into disjoint shards by status and login range, and
+    the shards are paginated concurrently.
+    """
+
+    debug = kwargs["debug"]
+    output_mode = kwargs["output"] if kwargs["output"] in STREAM_MODES else "csv"
+
+    user_manager = get_handler(ctx, kwargs["profile"], "users")
+    try:
+        count = write_records(user_manager.exportUsers(shards=shards, search=search, attr=attr, lean=True), mode=output_mode,
+                              file=output_file, columns=csv_columns(attr))
+    except ServiceException as ex:
+        click.echo(traceback.format_exc()) if debug else click.echo(f"Error: {ex.info}")
+        click.echo()
+        sys.exit(113)
+    except Exception as ex:
+        click.echo(traceback.format_exc()) if debug else click.echo(f"Error: {ex}")
+        click.echo()
+        sys.exit(113)
+    else:
+        if output_file:
+            click.echo(f"Saved {count} user(s) in {output_file.name}")
+        click.echo()
+
+
+@cli.command(short_help='Sync the local user snapshot')
+@click.option('--full', is_flag=True, help='Discard the local snapshot and fetch every user.')
+@click.option('--prefetch', type=click.IntRange(min=0), default=2, help='Number of pages to fetch ahead while the current page is stored.')
+@global_options
+@click.pass_context
+@timer
+def sync(ctx, full, prefetch, **kwargs):
+    """Synchronize the local user snapshot with the org.
+
+    The first run fetches every user. Later runs only fetch the users updated since the
+    previous run. Users deleted in Okta are only dropped from the snapshot by `--full`.
+    """
+
+    debug = kwargs["debug"]
+
+    user_manager = get_handler(ctx, kwargs["profile"], "users")
+    store = get_store(ctx, kwargs["profile"])
+    try:
+        result = user_manager.syncUsers(store, full=full, prefetch=prefetch)
+    except ServiceException as ex:
+        click.echo(traceback.format_exc()) if debug else click.echo(f"Error: {ex.info}")
+        click.echo()
+        sys.exit(113)
+    except Exception as ex:
+        click.echo(traceback.format_exc()) if debug else click.echo(f"Error: {ex}")
+        click.echo()
+        sys.exit(113)
+    else:
+        click.echo(f"{result['fetched']} user(s) fetched ({result['mode']} sync). Snapshot has {result['total']} user(s).")
+        if result["high_water_mark"]:
+            click.echo(f"Snapshot is current up to {result['high_water_mark']}.")
+        click.echo()
+
+
 @cli.command(short_help='Deactivate users')
 @global_options
 @click.option('--confirm', '-y', is_flag=True, help='Confirm operation.')
@@ -396,10 +520,12 @@ def find(ctx, output_file, all, query, filter, search, attr, count, pattern, **k
 @click.option('--file', '-f', is_flag=True, help='Header based CSV file containing target users.', cls=MutuallyExclusiveOption, mutually_exclusive=["conditions"])  # noqa: E501
 @click.option('--conditions', '-c', is_flag=True, help='Search based on conditions.', cls=MutuallyExclusiveOption, mutually_exclusive=["file", "field", "prefix"])  # noqa: E501
 @click.option('--pattern', '-e', is_flag=True, help='Search based on pattern or substring. Expensive operation.', cls=DependentOption, dependent_on=["conditions"])  # noqa: E501
+@click.option('--concurrency', type=click.IntRange(min=1), default=1, help='Number of API calls to run in parallel. Connections per host are capped by the profile pool_maxsize setting.')  # noqa: E501
+@click.option('--resume', 'resume', metavar='JOB_ID', help='Resume an interrupted job. Records that already succeeded are skipped, failed ones are retried.')  # noqa: E501
 @click.argument('query')
 @click.pass_context
 @timer
-def deactivate(ctx, query, confirm, notify, field, prefix, file, conditions, pattern, **kwargs):
+def deactivate(ctx, query, confirm, notify, field, prefix, file, conditions, pattern, concurrency, resume, **kwargs):
     """Deactivates users."""
 
     success = []
@@ -416,7 +542,8 @@ def deactivate(ctx, query, confirm, notify, field, prefix, file, conditions, pat
                                        prefix=prefix,
                                        file=file,
                                        conditions=conditions,
-                                       pattern=pattern)
+                                       pattern=pattern,
+                                       concurrency=concurrency)
     except ServiceException as ex:
         click.echo(traceback.format_exc()) if debug else click.echo(f"Error: {ex.info}")
         sys.exit(113)
@@ -429,26 +556,31 @@ def deactivate(ctx, query, confirm, notify, field, prefix, file, conditions, pat
             sys.exit(0)
 
         if confirm or click.confirm(f"{len(targets)} user(s) are going to be deactivated. Proceed?"):
-            result = user_manager.deactivateUsers(targets, notify=notify)
+            with get_journal(ctx, "deactivate", resume=resume) as journal:
+                _job_started(journal, resume)
+                result = user_manager.deactivateUsers(targets, notify=notify, concurrency=concurrency, journal=journal)
+            _job_finished(journal, result)
             success = result["success"]
             failure = result["failure"]
-            datestr = datetime.now().strftime("%Y%m%d-%H%M%S")
+            suffix = result_suffix()
 
             click.echo(f"{len(success)} user(s) successfully deactivated.")
+            if result["retries"] > 0:
+                click.echo(f"{result['retries']} API call(s) retried.")
             if len(success) > 0:
-                success_file = "okt_user_deactivate_success_" + datestr + ".txt"
+                success_file = "okt_user_deactivate_success_" + suffix + ".txt"
                 with open(success_file, 'w') as outfile:
                     json.dump(success, outfile)
             if len(failure) > 0:
                 click.echo(f"Deactivation failed for {len(failure)} user(s).")
-                failure_file = "okt_user_deactivate_failed_" + datestr + ".txt"
+                failure_file = "okt_user_deactivate_failed_" + suffix + ".txt"
                 with open(failure_file, 'w') as outfile:
                     json.dump(failure, outfile)
 
             if debug:
                 errors = result["errors"]
                 if len(errors) > 0:
-                    error_file = "okt_errors_user_deactivate_" + datestr + ".log"
+                    error_file = "okt_errors_user_deactivate_" + suffix + ".log"
                     with open(error_file, 'w') as outfile:
                         json.dump(errors, outfile)
                         click.echo(f"Error information saved to {error_file}")
@@ -467,14 +599,18 @@ def deactivate(ctx, query, confirm, notify, field, prefix, file, conditions, pat
 @click.option('--file', '-f', is_flag=True, help='Header based CSV file containing target users.', cls=MutuallyExclusiveOption, mutually_exclusive=["conditions"])  # noqa: E501
 @click.option('--conditions', '-c', is_flag=True, help='Search based on conditions.', cls=MutuallyExclusiveOption, mutually_exclusive=["file", "field", "prefix"])  # noqa: E501
 @click.option('--pattern', '-e', is_flag=True, help='Search based on pattern or substring. Expensive operation.', cls=DependentOption, dependent_on=["conditions"])  # noqa: E501
+@click.option('--concurrency', type=click.IntRange(min=1), default=1, help='Number of API calls to run in parallel. Connections per host are capped by the profile pool_maxsize setting.')  # noqa: E501
+@click.option('--resume', 'resume', metavar='JOB_ID', help='Resume an interrupted job. Records that already succeeded are skipped, failed ones are retried.')  # noqa: E501
 @click.argument('query')
 @click.pass_context
 @timer
-def delete(ctx, query, confirm, notify, field, prefix, file, conditions, pattern, **kwargs):
-    """Delete users."""
+def delete(ctx, query, confirm, notify, field, prefix, file, conditions, pattern, concurrency, resume, **kwargs):
+    """Delete users.
+
+    Users that are not deprovisioned yet are deactivated first. Each user is deleted as
+    soon as its deactivation succeeds.
+    """
 
-    deactivate_success = []
-    deactivate_failure = []
     success = []
     failure = []
     debug = kwargs["debug"]
@@ -482,22 +618,16 @@ def delete(ctx, query, confirm, notify, field, prefix, file, conditions, pattern
     user_manager = get_handler(ctx, kwargs["profile"], "users")
 
     try:
-        deactivate_targets = _retrieve_target_ids(user_manager,
-                                                  query=query,
-                                                  operation="deactivate",
-                                                  field=field,
-                                                  prefix=prefix,
-                                                  file=file,
-                                                  conditions=conditions,
-                                                  pattern=pattern)
-        delete_targets = _retrieve_target_ids(user_manager,
-                                              query=query,
-                                              operation="delete",
-                                              field=field,
-                                              prefix=prefix,
-                                              file=file,
-                                              conditions=conditions,
-                                              pattern=pattern)
+        # One search in every status; the status of each user decides whether it needs deactivating
+        targets = _retrieve_target_users(user_manager,
+                                         query=query,
+                                         operation="purge",
+                                         field=field,
+                                         prefix=prefix,
+                                         file=file,
+                                         conditions=conditions,
+                                         pattern=pattern,
+                                         concurrency=concurrency)
     except ServiceException as ex:
         click.echo(traceback.format_exc()) if debug else click.echo(f"Error: {ex.info}")
         sys.exit(113)
@@ -505,48 +635,36 @@ def delete(ctx, query, confirm, notify, field, prefix, file, conditions, pattern
         click.echo(traceback.format_exc()) if debug else click.echo(f"Error: {ex}")
         sys.exit(113)
     else:
-        targets = list(set(deactivate_targets + delete_targets))
         if len(targets) == 0:
             click.echo("No target users(s) to delete.")
             sys.exit(0)
 
         if confirm or click.confirm(f"{len(targets)} user(s) are going to be deleted. Proceed?"):
-            result = None
-            deactivate_result = user_manager.deactivateUsers(deactivate_targets)
-            deactivate_success = deactivate_result["success"]
-            deactivate_failure = deactivate_result["failure"]
-            datestr = datetime.now().strftime("%Y%m%d-%H%M%S")
-
-            final_targets = list(set(deactivate_success + delete_targets))
-            if len(final_targets) > 0:
-                result = user_manager.deleteUsers(final_targets, notify=notify)
-                success = result["success"]
-                failure = result["failure"]
-                click.echo(f"{len(success)} user(s) successfully deleted.")
-                if len(success) > 0:
-                    success_file = "okt_user_delete_success_" + datestr + ".txt"
-                    with open(success_file, 'w') as outfile:
-                        json.dump(success, outfile)
-                if len(failure) > 0:
-                    click.echo(f"Deletion failed for {len(failure)} user(s).")
-                    failure_file = "okt_user_delete_failed_" + datestr + ".txt"
-                    with open(failure_file, 'w') as outfile:
-                        json.dump(failure, outfile)
-
-            if len(deactivate_failure) > 0:
-                click.echo(f"Deactivation failed for {len(deactivate_failure)} user(s).")
-                failure_file = "okt_user_delete_deactivation_failed_" + datestr + ".txt"
+            with get_journal(ctx, "delete", resume=resume) as journal:
+                _job_started(journal, resume)
+                result = user_manager.purgeUsers(targets, notify=notify, concurrency=concurrency, journal=journal)
+            _job_finished(journal, result)
+            success = result["success"]
+            failure = [user["id"] for user in result["failure"]]
+            suffix = result_suffix()
+
+            click.echo(f"{len(success)} user(s) successfully deleted.")
+            if result["retries"] > 0:
+                click.echo(f"{result['retries']} API call(s) retried.")
+            if len(success) > 0:
+                success_file = "okt_user_delete_success_" + suffix + ".txt"
+                with open(success_file, 'w') as outfile:
+                    json.dump(success, outfile)
+            if len(failure) > 0:
+                click.echo(f"Deletion failed for {len(failure)} user(s).")
+                failure_file = "okt_user_delete_failed_" + suffix + ".txt"
                 with open(failure_file, 'w') as outfile:
-                    json.dump(deactivate_failure, outfile)
+                    json.dump(failure, outfile)
 
             if debug:
-                errors = []
-                if deactivate_result:
-                    errors = errors + deactivate_result["errors"]
-                if result:
-                    errors = errors + result["errors"]
+                errors = result["errors"]
                 if len(errors) > 0:
-                    error_file = "okt_errors_user_delete_" + datestr + ".log"
+                    error_file = "okt_errors_user_delete_" + suffix + ".log"
                     with open(error_file, 'w') as outfile:
                         json.dump(errors, outfile)
                         click.echo(f"Error information saved to {error_file}")
@@ -566,9 +684,12 @@ def delete(ctx, query, confirm, notify, field, prefix, file, conditions, pattern
 @click.option('--file', '-f', 'input_file', help='Input file', cls=MutuallyExclusiveOption, mutually_exclusive=["default_password", "no_password", "import_password", "multiple"])  # noqa: E501
 @click.option('--mode', default='json', help='User paylod format (JSON or CSV)', cls=DependentOption, dependent_on=["input_file"])
 @click.option('--csv-options', help='Create user options', cls=DependentOption, dependent_on=["mode"])
+@click.option('--concurrency', type=click.IntRange(min=1), default=1, help='Number of API calls to run in parallel. Connections per host are capped by the profile pool_maxsize setting.')  # noqa: E501
+@click.option('--resume', 'resume', metavar='JOB_ID', help='Resume an interrupted job. Records that already succeeded are skipped, failed ones are retried.')  # noqa: E501
 @click.pass_context
 @timer
-def create(ctx, multiple, default_password, no_password, import_password, activate, input_file, mode, csv_options, **kwargs):
+def create(ctx, multiple, default_password, no_password, import_password, activate, input_file, mode, csv_options, concurrency, resume,
+           **kwargs):
     """Create users."""
 
     debug = kwargs["debug"]
@@ -598,16 +719,22 @@ def create(ctx, multiple, default_password, no_password, import_password, activa
             elif key in ["no-password", "import-password", "hashed-password", "hash-salt"]:
                 options[key] = True if val.lower() == 'true' else False
     user_manager = get_handler(ctx, kwargs["profile"], "users")
-    result = user_manager.createUsers(inputs=user_payload, file=input_file, mode=mode, options=options, activate=activate and (not import_password))
+    with get_journal(ctx, "create", resume=resume) as journal:
+        _job_started(journal, resume)
+        result = user_manager.createUsers(inputs=user_payload, file=input_file, mode=mode, options=options,
+                                          activate=activate and (not import_password), concurrency=concurrency, journal=journal)
+    _job_finished(journal, result)
 
     success = result["success"]
     failure = result["failure"]
-    datestr = datetime.now().strftime("%Y%m%d-%H%M%S")
+    suffix = result_suffix()
 
     click.echo(f"{len(success)} user(s) successfully created.")
+    if result["retries"] > 0:
+        click.echo(f"{result['retries']} API call(s) retried.")
 
     if len(success) > 0:
-        success_file = "okt_user_create_success_" + datestr + ".txt"
+        success_file = "okt_user_create_success_" + suffix + ".txt"
         with open(success_file, 'w') as outfile:
             json.dump(success, outfile)
 
@@ -620,12 +747,12 @@ def create(ctx, multiple, default_password, no_password, import_password, activa
             errors = errors + result["errors"]
 
             if len(failure) > 0:
-                failure_file = "okt_user_create_failed_" + datestr + ".txt"
+                failure_file = "okt_user_create_failed_" + suffix + ".txt"
                 with open(failure_file, 'w') as outfile:
                     json.dump(failure, outfile)
 
             if len(errors) > 0:
-                error_file = "okt_errors_user_create_" + datestr + ".log"
+                error_file = "okt_errors_user_create_" + suffix + ".log"
                 with open(error_file, 'w') as outfile:
                     json.dump(errors, outfile)
                     click.echo(f"Error information saved to {error_file}")
@@ -0,0 +1,316 @@
+"""Local atko agent.
+
+The agent is an optional background process that runs CLI commands on behalf of `atko`
+invocations, so that they reuse its warm per-profile Okta clients, pooled connections
+and caches instead of building them from scratch. The CLI forwards its arguments, working
+directory and input over a Unix socket and relays the output back. When the agent is
+not running, commands run in-process as usual.
+
+Only this module's client side is imported on every invocation, so it must stay light.
+"""
+
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+# Environment variables forwarded to the agent with every command
+FORWARDED_ENV = ["ATKO_PROFILE"]
+
+# Commands that can prompt for secrets, such as passwords. The agent has no terminal to read them without echo,
+# so they always run in-process
+LOCAL_COMMANDS = [("users", "create")]
+
+# Set in the agent process, so that the commands it runs are not forwarded again
+serving = False
+
+
+def socket_path():
+    return os.environ.get("ATKO_AGENT_SOCKET") or os.path.expanduser("~/.atkocli/agent.sock")
+
+
+def _connect(path, timeout=None):
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.settimeout(timeout)
+    try:
+        conn.connect(path)
+    except OSError:
+        conn.close()
+        raise
+    return conn
+
+
+def request(op, path=None, timeout=5):
+    """Sends a control request, such as `ping` or `stop`, to the agent and returns its reply.
+
+    Raises OSError when the agent is not running.
+
+    Parameters
+    ----------
+    op : str
+        Control operation. One of `ping` and `stop`.
+    path : str, optional
+        Agent socket (default is None, `socket_path()`).
+    timeout : float
+        Seconds to wait for the reply (default is 5).
+    """
+
+    with _connect(path or socket_path(), timeout=timeout) as conn:
+        conn.sendall(json.dumps({"op": op}).encode() + b"\n")
+        reply = conn.makefile("rb").readline()
+    if not reply:
+        raise ConnectionError("The agent closed the connection")
+    return json.loads(reply)
+
+
+def forward(argv):
+    """Runs a CLI command in the agent, relaying its input and output.
+
+    Returns the exit code of the command, or None when the agent is not running or
+    cannot take the command, in which case the caller runs it in-process. Commands of
+    `LOCAL_COMMANDS` are never forwarded. The agent runs the commands it is sent one at
+    a time, so a command waits while another invocation's command runs.
+
+    Parameters
+    ----------
+    argv : list
+        Command line arguments, without the program name.
+    """
+
+    if serving or os.environ.get("ATKO_NO_AGENT") or (argv and argv[0] == "agent") or tuple(argv[:2]) in LOCAL_COMMANDS:
+        return None
+    path = socket_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        conn = _connect(path, timeout=1)
+    except OSError:
+        return None
+    conn.settimeout(None)
+
+    header = {"op": "run", "argv": list(argv), "cwd": os.getcwd(),
+              "env": {name: os.environ[name] for name in FORWARDED_ENV if name in os.environ},
+              "tty": sys.stdout.isatty()}
+    try:
+        conn.sendall(json.dumps(header).encode() + b"\n")
+    except OSError:
+        conn.close()
+        return None
+
+    def pump():
+        # Input is only read by prompts; relay it until it ends or the command completes
+        try:
+            while True:
+                data = os.read(sys.stdin.fileno(), 65536)
+                if not data:
+                    break
+                conn.sendall(data)
+            conn.shutdown(socket.SHUT_WR)
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    threading.Thread(target=pump, name="atko-agent-input", daemon=True).start()
+
+    replies = conn.makefile("rb")
+    try:
+        for line in replies:
+            frame = json.loads(line)
+            if "out" in frame:
+                sys.stdout.write(frame["out"])
+                sys.stdout.flush()
+            elif "err" in frame:
+                sys.stderr.write(frame["err"])
+                sys.stderr.flush()
+            elif "exit" in frame:
+                return frame["exit"]
+    finally:
+        conn.close()
+    # The agent went away mid-command; its output so far has been shown
+    sys.stderr.write("Error: The atko agent stopped before the command completed.\n")
+    return 1
+
+
+class _FrameWriter(object):
+    """Text stream sending everything written to it as output frames of a connection."""
+
+    encoding = "utf-8"
+    errors = "strict"
+
+    def __init__(self, conn, lock, channel, tty=False):
+        self._conn = conn
+        self._lock = lock
+        self._channel = channel
+        self._tty = tty
+
+    def write(self, text):
+        if not isinstance(text, str):
+            raise TypeError("write() argument must be str")
+        if text:
+            frame = json.dumps({self._channel: text}).encode() + b"\n"
+            with self._lock:
+                self._conn.sendall(frame)
+        return len(text)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return self._tty
+
+    def writable(self):
+        return True
+
+    def readable(self):
+        return False
+
+    def fileno(self):
+        raise OSError("Agent output has no file descriptor")
+
+    @property
+    def closed(self):
+        return False
+
+
+class Agent(object):
+    """Unix socket server running CLI commands in a long lived process.
+
+    Commands run one at a time, serialized by `_run_lock`, as they change the process-wide
+    working directory, environment, output and input to those of the invocation that sent
+    them. Commands arriving meanwhile wait for the running one to complete. The Okta clients built by the commands are kept per profile and reused by later
+    commands (see `common.okt_common.keep_providers`).
+
+    Attributes
+    ----------
+    path : str
+        Socket file name.
+    idle_timeout : float
+        Seconds without any command after which the agent exits. 0 keeps it running.
+    """
+
+    def __init__(self, path, idle_timeout=3600):
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._started = time.time()
+        self._last_used = time.monotonic()
+        self._served = 0
+
+    def status(self):
+        from common import okt_common
+
+        return {"pid": os.getpid(), "started": self._started, "served": self._served,
+                "profiles": sorted({key[0] for key in (okt_common._providers or {})})}
+
+    def serve_forever(self):
+        global serving
+        serving = True
+
+        from atkocli import cli
+        from common import okt_common
+
+        self._cli = cli
+        okt_common.keep_providers()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o077)
+        try:
+            listener.bind(self.path)
+        finally:
+            os.umask(umask)
+        listener.listen(16)
+        listener.settimeout(1)
+        try:
+            while not self._stop.is_set():
+                try:
+                    conn, _ = listener.accept()
+                except socket.timeout:
+                    if self.idle_timeout and not self._run_lock.locked() \
+                            and time.monotonic() - self._last_used > self.idle_timeout:
+                        break
+                    continue
+                conn.settimeout(None)
+                threading.Thread(target=self._handle, args=(conn,), name="atko-agent-conn", daemon=True).start()
+        finally:
+            listener.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            # Let a running command complete
+            with self._run_lock:
+                pass
+
+    def _handle(self, conn):
+        with conn:
+            rfile = conn.makefile("rb")
+            try:
+                header = json.loads(rfile.readline() or b"{}")
+            except ValueError:
+                return
+            op = header.get("op")
+            if op == "ping":
+                conn.sendall(json.dumps(self.status()).encode() + b"\n")
+            elif op == "stop":
+                conn.sendall(json.dumps(self.status()).encode() + b"\n")
+                self._stop.set()
+            elif op == "run":
+                self._run(conn, rfile, header)
+
+    def _run(self, conn, rfile, header):
+        import io
+
+        send_lock = threading.Lock()
+        stdout = _FrameWriter(conn, send_lock, "out", tty=header.get("tty", False))
+        stderr = _FrameWriter(conn, send_lock, "err", tty=header.get("tty", False))
+        stdin = io.TextIOWrapper(rfile, encoding="utf-8")
+
+        with self._run_lock:
+            self._last_used = time.monotonic()
+            self._served = self._served + 1
+            saved_streams = (sys.stdout, sys.stderr, sys.stdin)
+            saved_cwd = os.getcwd()
+            saved_env = {name: os.environ.get(name) for name in FORWARDED_ENV}
+            code = 0
+            try:
+                os.chdir(header.get("cwd") or saved_cwd)
+                for name in FORWARDED_ENV:
+                    os.environ.pop(name, None)
+                os.environ.update(header.get("env") or {})
+                sys.stdout, sys.stderr, sys.stdin = stdout, stderr, stdin
+                try:
+                    self._cli(header.get("argv") or [], prog_name="atko")
+                except SystemExit as ex:
+                    code = ex.code if isinstance(ex.code, int) else (0 if ex.code is None else 1)
+                except Exception as ex:
+                    sys.stdout.write(f"{ex.__class__}:{ex}\n")
+                    code = 112
+            except OSError:
+                # The invocation went away
+                return
+            finally:
+                sys.stdout, sys.stderr, sys.stdin = saved_streams
+                os.chdir(saved_cwd)
+                for name, value in saved_env.items():
+                    if value is None:
+                        os.environ.pop(name, None)
+                    else:
+                        os.environ[name] = value
+                self._last_used = time.monotonic()
+            try:
+                conn.sendall(json.dumps({"exit": code}).encode() + b"\n")
+            except OSError:
+                pass
+
+
+if __name__ == "__main__":
+    # Serve from the importable module, whose `serving` flag the CLI checks
+    from common import okt_agent
+    okt_agent.Agent(sys.argv[1], idle_timeout=float(sys.argv[2]) if len(sys.argv) > 2 else 3600).serve_forever()
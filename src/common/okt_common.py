@@ -1,18 +1,29 @@
 import click
 import functools
+import json
 import time
+import uuid
+from datetime import datetime
 from click import Option, UsageError
-from oktapy.okta import Okta
+from oktapy.core.cache import ResourceCache
+from oktapy.core.store import UserStore
+from oktapy.core.journal import Journal
+from oktapy.exceptions import ConfigurationException
 
 _global_options = [
     click.option('--profile', '-p', default="DEFAULT", envvar='ATKO_PROFILE', help='Profile name'),
     click.option('--debug', is_flag=True, help="Debug information on Exceptions"),
     click.option('--verbose', '-v', is_flag=True, help="Show API calls as cURL commands"),
-    click.option('--output', '-o', default="stdout", help='Output format')
+    click.option('--output', '-o', default="stdout", help='Output format'),
+    click.option('--no-cache', is_flag=True, help="Bypass the local user/group cache")
 ]
 
 # //TODO: Rename file to core.py
 
+# Okta providers kept for reuse by later commands, keyed by profile settings. Only the agent keeps them.
+_providers = None
+
+
 class MutuallyExclusiveOption(Option):
     def __init__(self, *args, **kwargs):
         self.mutually_exclusive = set(kwargs.pop('mutually_exclusive', []))
@@ -101,15 +112,119 @@ def get_profile(ctx, profilename):
     return _profile_details
 
 
+def _to_bool(value):
+    return value.strip().lower() in ["true", "yes", "on", "1"]
+
+
+def _to_list(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _to_int_list(value):
+    return [int(item) for item in _to_list(value)]
+
+
+# Optional client tuning keys that can be set per profile in ~/.atkocli/config
+_client_option_types = {
+    "pool_connections": int,
+    "pool_maxsize": int,
+    "keep_alive": _to_bool,
+    "timeout": float,
+    "rate_limit_fraction": float,
+    "rate_limit_max_waits": int,
+    "retry_max_attempts": int,
+    "retry_backoff_base": float,
+    "retry_backoff_cap": float,
+    "retry_jitter": _to_bool,
+    "retry_statuses": _to_int_list,
+    "retry_methods": _to_list
+}
+
+
+def get_client_options(profile):
+    _options = {}
+    for key, _type in _client_option_types.items():
+        if key not in profile:
+            continue
+        value = profile[key]
+        try:
+            _options[key] = _type(value)
+        except ValueError as err:
+            raise click.ClickException(f"Invalid value `{value}` for profile setting `{key}`.") from err
+    return _options
+
+
+def get_cache(ctx, profilename, profile):
+    _cache_file = ctx.obj.get("cache_file")
+    if (not _cache_file) or ctx.params.get("no_cache", False) or (not _to_bool(profile.get("cache", "true"))):
+        return None
+    try:
+        return ResourceCache(_cache_file,
+                             namespace=profilename,
+                             ttl=float(profile.get("cache_ttl", 300)),
+                             max_entries=int(profile.get("cache_max_entries", 50000)))
+    except ValueError as err:
+        raise click.ClickException(f"Invalid cache setting for profile `{profilename}`: {err}") from err
+
+
+def get_store(ctx, profilename):
+    _cache_file = ctx.obj.get("cache_file")
+    if not _cache_file:
+        raise click.ClickException("Local store is not available.")
+    return UserStore(_cache_file, namespace=profilename)
+
+
+def get_journal(ctx, operation, resume=None):
+    _jobs_directory = ctx.obj.get("jobs_directory")
+    if not _jobs_directory:
+        raise click.ClickException("Job journal is not available.")
+    try:
+        if resume:
+            return Journal.resume(_jobs_directory, resume, operation)
+        # Passwords are never written to the journal
+        _params = {key: value for key, value in ctx.params.items()
+                   if value is not None and "password" not in key and key not in ["csv_options", "resume"]}
+        return Journal.create(_jobs_directory, operation, params=_params)
+    except ConfigurationException as err:
+        raise click.ClickException(err.message) from err
+
+
+def result_suffix():
+    """Returns a unique suffix for the names of the files a command saves its results to.
+
+    Commands of a parallel batch may finish within the same second, so a timestamp alone is not enough.
+    """
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def keep_providers():
+    """Keeps the Okta providers built by commands, with their connection pools and caches, for reuse by later commands."""
+    global _providers
+    if _providers is None:
+        _providers = {}
+
+
 def get_okta_provider(ctx, profilename):
+    # Deferred: the client stack imports requests, which only commands calling the API need
+    from oktapy.okta import Okta
+
     _profile = get_profile(ctx, profilename)
-    _provider = Okta(_profile["base_url"], token=_profile["api_token"], verbose=ctx.params.get("verbose", False))
+    _key = None
+    if _providers is not None:
+        _key = (profilename, ctx.params.get("verbose", False), ctx.params.get("no_cache", False),
+                json.dumps(_profile, sort_keys=True))
+        if _key in _providers:
+            return _providers[_key]
+    _provider = Okta(_profile["base_url"], token=_profile["api_token"], verbose=ctx.params.get("verbose", False),
+                     cache=get_cache(ctx, profilename, _profile), **get_client_options(_profile))
+    if _key is not None:
+        # Commands running in parallel may have built the same provider; keep one
+        _provider = _providers.setdefault(_key, _provider)
     return _provider
 
 
 def get_handler(ctx, profilename, resource):
-    _profile = get_profile(ctx, profilename)
-    _provider = Okta(_profile["base_url"], token=_profile["api_token"], verbose=ctx.params.get("verbose", False))
+    _provider = get_okta_provider(ctx, profilename)
     if resource == "users":
         return _provider.UserMgr()
     elif resource == "groups":
@@ -0,0 +1,158 @@
+import csv
+import json
+import tempfile
+import threading
+
+import click
+
+# Output modes written record by record
+STREAM_MODES = ["csv", "json", "ndjson"]
+
+
+class CSVWriter(object):
+    """Writes resources as CSV rows, quoted as needed.
+
+    With `columns`, such as the attributes selected with `--attr`, the header is written
+    first and every row as it comes. Otherwise the columns are the union of the `to_dict`
+    keys of all records, sorted, so rows are spilled to a temporary file until the last
+    record and written under the header on `close`.
+    """
+
+    def __init__(self, file, columns=None, spool_size=8 * 1024 * 1024):
+        self._file = file
+        self._writer = None
+        self._spool = None
+        self._columns = set()
+        self.count = 0
+        if columns is not None:
+            self._start(sorted(columns))
+        else:
+            self._spool = tempfile.SpooledTemporaryFile(max_size=spool_size, mode="w+", encoding="utf-8")
+
+    def _start(self, columns):
+        self._writer = csv.DictWriter(self._file, fieldnames=columns, restval="", extrasaction="ignore", lineterminator="\n")
+        self._writer.writeheader()
+
+    def write(self, record):
+        row = record.to_dict()
+        if self._spool is None:
+            self._writer.writerow(row)
+        else:
+            self._columns.update(row)
+            self._spool.write(json.dumps(row, separators=(",", ":")) + "\n")
+        self.count = self.count + 1
+
+    def close(self):
+        if self._spool is None:
+            return
+        self._start(sorted(self._columns))
+        self._spool.seek(0)
+        for line in self._spool:
+            self._writer.writerow(json.loads(line))
+        self._spool.close()
+        self._spool = None
+
+
+class JSONArrayWriter(object):
+    """Writes resources as an indented JSON array, one element at a time.
+
+    The output is the same as `json.dump` of the whole list with `indent=4` and `sort_keys=True`.
+    """
+
+    def __init__(self, file):
+        self._file = file
+        self.count = 0
+
+    def write(self, record):
+        element = json.dumps(record._data, indent=4, sort_keys=True).replace("\n", "\n    ")
+        self._file.write(("[\n    " if self.count == 0 else ",\n    ") + element)
+        self.count = self.count + 1
+
+    def close(self):
+        self._file.write("\n]\n" if self.count else "[]\n")
+
+
+class NDJSONWriter(object):
+    """Writes resources as newline delimited JSON, one compact object per line."""
+
+    def __init__(self, file):
+        self._file = file
+        self.count = 0
+
+    def write(self, record):
+        self._file.write(json.dumps(record._data, separators=(",", ":")) + "\n")
+        self.count = self.count + 1
+
+    def close(self):
+        pass
+
+
+_WRITERS = {"csv": CSVWriter, "json": JSONArrayWriter, "ndjson": NDJSONWriter}
+
+
+def write_records(records, mode="csv", file=None, columns=None):
+    """Writes resources as they are produced, without holding them in memory.
+
+    Records are User or Group objects, or any object with `to_dict()` and `_data`. With no
+    file the records go to stdout, followed by a record count footer for CSV output.
+    Returns the number of records written.
+
+    Parameters
+    ----------
+    records : iterable
+        Resources to write, such as a pagination generator.
+    mode : str
+        Output format. One of `csv`, `json` and `ndjson` (default is `csv`).
+    file : object, optional
+        Open text file to write to (default is None, stdout).
+    columns : list, optional
+        CSV columns, when known before the first record (default is None, the columns of all records).
+    """
+
+    out = file if file is not None else click.get_text_stream("stdout")
+    writer = CSVWriter(out, columns=columns) if mode == "csv" else _WRITERS[mode](out)
+    for record in records:
+        writer.write(record)
+    writer.close()
+    out.flush()
+    if file is None and mode == "csv":
+        click.echo()
+        click.echo(f"{writer.count} record(s)")
+    return writer.count
+
+
+class ThreadLocalStream(object):
+    """Text stream writing to the stream bound to the current thread, or to a default stream.
+
+    Installed in place of `sys.stdout`, `sys.stderr` or `sys.stdin`, it lets commands running
+    in parallel threads each have their own output captured or input supplied.
+    """
+
+    def __init__(self, default):
+        self._default = default
+        self._local = threading.local()
+
+    def bind(self, stream):
+        self._local.stream = stream
+
+    def unbind(self):
+        self._local.stream = None
+
+    @property
+    def target(self):
+        return getattr(self._local, "stream", None) or self._default
+
+    @property
+    def encoding(self):
+        return getattr(self.target, "encoding", None) or "utf-8"
+
+    @property
+    def errors(self):
+        return getattr(self.target, "errors", None) or "strict"
+
+    def write(self, text):
+        return self.target.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self.target, name)
+
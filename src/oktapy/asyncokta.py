@@ -0,0 +1,105 @@
+from oktapy.asyncoktaapitoken import AsyncOktaAPIToken
+
+from oktapy.manage.AsyncUserMgr import AsyncUserMgr
+from oktapy.manage.AsyncGroupMgr import AsyncGroupMgr
+
+
+class AsyncOkta(object):
+    """Top level asynchronous Okta resource management class.
+
+    The asyncio counterpart of Okta. Its managers expose awaitable methods, and all of them
+    share one AsyncOktaAPIToken client, and therefore one connection pool and rate limit
+    scheduler. Use as an async context manager, or await `close()` when done, to release
+    the pooled connections. Requires the optional `aiohttp` dependency.
+
+    Example
+    -------
+        async with AsyncOkta("https://example.okta.com", token) as okta:
+            async for user in okta.UserMgr().iterUsers(search='status eq "ACTIVE"'):
+                ...
+
+    Attributes
+    ----------
+    _baseurl : str
+            Base URL of the Okta org. Example - https://example.okta.com
+    _client : object
+            Associated Okta client object. Instance of AsyncOktaAPIToken class.
+    _cache : object
+            Local resource cache shared by the managers. Instance of oktapy.core.cache.ResourceCache, or None.
+
+    Methods
+    -------
+    client()
+        Returns the associated Okta client object
+
+    cache()
+        Returns the associated local resource cache
+
+    baseUrl()
+        Returns the base URL of the target Okta org
+
+    UserMgr()
+        Instantiates and returns async Okta user manager object
+
+    GroupMgr()
+        Instantiates and returns async Okta group manager object
+
+    close()
+        Coroutine closing the pooled connections of the client
+    """
+
+    def __init__(self, baseurl, token=None, verbose=False, cache=None, **options):
+        """
+        Instantiates and associates an AsyncOktaAPIToken client object.
+
+        Parameters
+        ----------
+        baseurl : str
+            Base URL of the Okta org. Example - https://example.okta.com
+        token : str
+            API token value for the org.
+        verbose : bool
+            Flag to enable verbose API calls
+        cache : object, optional
+            Local resource cache consulted by the managers before calling the API.
+            Instance of oktapy.core.cache.ResourceCache (default is None, no cache).
+        options : dict
+            Client tuning options passed through to AsyncOktaAPIToken, such as
+            `pool_maxsize`, `keep_alive`, `timeout`, `rate_limit_fraction`,
+            `rate_limit_max_waits` and the `retry_*` policy settings.
+        """
+        self._baseurl = baseurl
+        self._token = token
+        self._verbose = verbose
+        self._cache = cache
+        self._client = AsyncOktaAPIToken(baseurl, token=token, verbose=verbose, **options)
+
+    def cache(self):
+        """Returns the associated local resource cache, or None."""
+        return self._cache
+
+    def client(self):
+        """Returns the associated AsyncOktaAPIToken client object."""
+        return self._client
+
+    def baseUrl(self):
+        """Returns the base URL of the target Okta org. Example - https://example.okta.com"""
+        return self._baseurl
+
+    def UserMgr(self):
+        """Instantiates and returns async Okta user manager object."""
+        return AsyncUserMgr(client=self._client, cache=self._cache)
+
+    def GroupMgr(self):
+        """Instantiates and returns async Okta group manager object."""
+        return AsyncGroupMgr(client=self._client, cache=self._cache)
+
+    async def close(self):
+        """Closes the pooled connections of the client."""
+        await self._client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
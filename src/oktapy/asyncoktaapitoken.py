@@ -0,0 +1,117 @@
+from oktapy.oktaapitoken import OktaAPIToken
+from oktapy.core.aioapi import AsyncOktaRequest
+from oktapy.core.ratelimit import RateLimiter
+from oktapy.core.retry import RetryPolicy
+
+
+class AsyncOktaAPIToken(OktaAPIToken):
+    """Asynchronous API Token Manager client.
+
+    The asyncio counterpart of OktaAPIToken. `request` is a coroutine, and every call made
+    through the client shares one connection pool, rate limit scheduler and retry policy.
+    Requires the optional `aiohttp` dependency.
+
+    Attributes
+    ----------
+    _requester : object
+            An instance of oktapy.core.aioapi.AsyncOktaRequest class. This object handles the actual
+            HTTPS API call to Okta endpoints
+
+    Methods
+    -------
+    request(apiurl, caller, mode="get", data=None)
+        Coroutine carrying out the REST API call to supplied Okta endpoint.
+
+    close()
+        Coroutine closing the pooled connections of the underlying requester.
+
+    last_retries()
+        Returns the number of times the last API call made from the current task was replayed.
+    """
+
+    def __init__(self, baseurl, token=None, verbose=False, pool_maxsize=100, keep_alive=True, timeout=None,
+                 rate_limit_fraction=0.8, rate_limit_max_waits=5, retry_max_attempts=3, retry_backoff_base=0.5,
+                 retry_backoff_cap=30, retry_jitter=True, retry_statuses=None, retry_methods=None):
+        """
+
+        Instantiates AsyncOktaAPIToken client object along with the supplied token.
+        The supplied token is assumed to be active and valid. No token validation is performed.
+
+        Parameters
+        ----------
+        baseurl : str
+            Base URL of the Okta org. Example - https://example.okta.com
+        token : str
+            API token value for the org
+        verbose : bool
+            Flag to print API calls as cURL commands
+        pool_maxsize : int
+            Maximum number of connections open at a time. 0 means no limit (default is 100).
+        keep_alive : bool
+            Reuse connections across API calls (default is True).
+        timeout : float, optional
+            Total timeout in seconds for every API call (default is None).
+
+        The rate limit and retry settings are the same as for OktaAPIToken.
+        """
+
+        self._baseurl = baseurl
+        assert token is not None
+        self._token = token
+        self._verbose = verbose
+        self._rate_limiter = RateLimiter(fraction=rate_limit_fraction, max_waits=rate_limit_max_waits) \
+            if rate_limit_fraction else None
+        self._retry_policy = RetryPolicy(max_attempts=retry_max_attempts,
+                                         backoff_base=retry_backoff_base,
+                                         backoff_cap=retry_backoff_cap,
+                                         jitter=retry_jitter,
+                                         retry_statuses=retry_statuses,
+                                         retry_methods=retry_methods)
+        self._requester = AsyncOktaRequest(pool_maxsize=pool_maxsize,
+                                           keep_alive=keep_alive,
+                                           timeout=timeout,
+                                           rate_limiter=self._rate_limiter,
+                                           retry_policy=self._retry_policy)
+
+    async def close(self):
+        """Closes the pooled connections of the underlying requester."""
+
+        await self._requester.close()
+
+    async def request(self, apiurl, caller, mode="get", data=None, decoder=None):
+        """Carries out and return result from the actual REST API call to supplied Okta endpoint.
+
+        Parameters
+        ----------
+        apiurl : str
+            Relative URL of the Okta endpoint. Example - /api/v1/users
+        caller : object
+            Caller object making the API call.
+        mode : str
+            REST method. Allowed values are `get`, `post`, `put` and `delete` (default is `get`).
+        data : object, optional
+            REST API payload (default is None).
+        decoder : callable, optional
+            Decodes the raw body of a GET response (default is None, standard JSON decoding).
+        """
+
+        headers = {'Content-Type': 'application/json', 'Accept': 'application/json',
+                   'Authorization': f'SSWS {self._token}'}
+
+        full_url = self._baseurl + apiurl
+        self._print_curl(full_url, mode, headers, data)
+
+        if mode == "get":
+            return await self._requester.get(full_url, headers=headers, decoder=decoder)
+        elif mode == "post":
+            return await self._requester.post(full_url, data=data, headers=headers)
+        elif mode == "put":
+            return await self._requester.put(full_url, data=data, headers=headers)
+        elif mode == "delete":
+            return await self._requester.delete(full_url, headers=headers)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
@@ -0,0 +1,279 @@
+"""Asynchronous Okta API request handler.
+
+The asyncio counterpart of oktapy.core.api. Calls are awaitable and share one pooled
+`aiohttp.ClientSession`, so a single event loop can keep thousands of calls in flight
+without threads. Rate limiting and retries use the same RateLimiter and RetryPolicy as
+the synchronous requester. Requires the optional `aiohttp` dependency.
+"""
+
+import asyncio
+import contextvars
+import json
+import re
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+from oktapy.exceptions import APIException, ConfigurationException, ServiceException
+
+# Number of replays of the last call made from the current task
+_retries = contextvars.ContextVar("okta_retries", default=0)
+
+
+class AsyncOktaRequest(object):
+    """Asynchronous Okta API request handler class.
+
+    All calls go through a single `aiohttp.ClientSession`, created on the first call from
+    within the running event loop. Its connector caps the number of open connections,
+    further calls wait for a free connection.
+
+    Attributes
+    ----------
+    _headers : Object
+        HTTP header key-value pairs
+    _session : object
+        Pooled `aiohttp.ClientSession` used for every API call, or None until the first call
+
+    Methods
+    -------
+    get(url, headers=None)
+        Executes HTTP GET call to the supplied Okta endpoint and returns the response.
+
+    post(url, data=None, headers=None)
+        Executes HTTP POST call to the supplied Okta endpoint and returns the response.
+
+    delete(url, headers=None)
+        Executes HTTP DELETE call to the supplied Okta endpoint and returns the response.
+
+    put(url, data=None, headers=None)
+        Executes HTTP PUT call to the supplied Okta endpoint and returns the response.
+
+    close()
+        Closes all pooled connections.
+    """
+
+    def __init__(self, pool_maxsize=100, keep_alive=True, timeout=None, rate_limiter=None, retry_policy=None):
+        """
+
+        Instantiates AsyncOktaRequest handler object and bootstraps the default HTTP header key-value pairs.
+
+        Parameters
+        ----------
+        pool_maxsize : int
+            Maximum number of connections open at a time. 0 means no limit (default is 100).
+        keep_alive : bool
+            Reuse connections across calls (default is True).
+        timeout : float, optional
+            Total timeout in seconds for every call (default is None, no timeout).
+        rate_limiter : object, optional
+            Instance of oktapy.core.ratelimit.RateLimiter pacing the calls made through this
+            requester (default is None, no client side rate limiting).
+        retry_policy : object, optional
+            Instance of oktapy.core.retry.RetryPolicy deciding which transient failures are
+            retried (default is None, no retries).
+
+        Raises
+        ------
+        ConfigurationException
+            When `aiohttp` is not installed.
+        """
+
+        if aiohttp is None:
+            raise ConfigurationException("The async client requires aiohttp. Install it with `pip install atko[async]`.")
+        self._headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+        self._pool_maxsize = pool_maxsize
+        self._keep_alive = keep_alive
+        self._timeout = timeout
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self._pool_maxsize, force_close=not self._keep_alive)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=aiohttp.ClientTimeout(total=self._timeout))
+        return self._session
+
+    async def close(self):
+        """Closes all pooled connections."""
+
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _retry_error(self, mode, error, attempt):
+        policy = self._retry_policy
+        if not policy or attempt + 1 >= policy.max_attempts:
+            return False
+        # A connection that could not be established never carried the request
+        if isinstance(error, aiohttp.ClientConnectorError):
+            return True
+        return mode in policy.retry_methods
+
+    async def _send(self, url, data=None, headers=None, mode="get"):
+        """Sends the HTTP request through the pooled session and returns the response, with its body read.
+
+        Rate limiting and retries behave as in OktaRequest._send, waiting with
+        `asyncio.sleep` instead of blocking the thread.
+        """
+
+        limiter = self._rate_limiter
+        policy = self._retry_policy
+        waits = 0
+        attempt = 0
+        _retries.set(0)
+        session = self._get_session()
+        while True:
+            if limiter:
+                delay = limiter.reserve(mode, url)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            try:
+                res = await session.request(mode.upper(), url, data=data, headers=headers)
+                await res.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                if not self._retry_error(mode, err, attempt):
+                    raise
+                attempt += 1
+                _retries.set(waits + attempt)
+                await asyncio.sleep(policy.backoff(attempt))
+                continue
+
+            if limiter:
+                limiter.update(mode, url, res.headers)
+                if res.status == 429 and waits < limiter.max_waits:
+                    waits += 1
+                    _retries.set(waits + attempt)
+                    await asyncio.sleep(limiter.reset_delay(mode, url))
+                    continue
+            if policy and policy.retry_status(mode, res.status, attempt):
+                attempt += 1
+                _retries.set(waits + attempt)
+                await asyncio.sleep(policy.backoff(attempt))
+                continue
+            return res
+
+    @property
+    def last_retries(self):
+        """Number of times the last call made from the current task was replayed."""
+
+        return _retries.get()
+
+    async def _httpcall(self, url, data=None, headers=None, mode="get", decoder=None):
+        """Internal common function to execute REST API call.
+
+        Returns the same results and raises the same exceptions as OktaRequest._httpcall.
+
+        Parameters
+        ----------
+        url : str
+            Okta API endpoint. Example - https://example.okta.com/api/v1/users
+        data : object, optional
+            Payload data for the API endpoint (default is None).
+        headers : object, optional
+            HTTP header key-value pairs specific to the API endpoint (default is None).
+        mode : str
+            HTTP Call type. Allowed value - `get`, `post`, `delete`, `put` (default is `get`).
+        decoder : callable, optional
+            Decodes the raw body of a successful GET response (default is None, standard JSON decoding).
+
+        Raises
+        ------
+        APIException
+            Exception related to  HTTP REST calls.
+        ServiceException
+            Exception related to Okta API calls.
+        """
+
+        if mode not in ["get", "post", "put", "delete"]:
+            raise APIException(f"HTTP {mode} is not supported", None)
+
+        final_headers = self._headers.copy()
+        final_headers.update(headers or {})
+
+        try:
+            res = await self._send(url, data=data, headers=final_headers, mode=mode)
+        except asyncio.TimeoutError as errt:
+            raise APIException("Timeout Error:", errt) from errt
+        except aiohttp.ClientConnectionError as errc:
+            raise APIException("Error Connecting:", errc) from errc
+        except aiohttp.ClientError as err:
+            raise APIException("OOps: Something Else", err) from err
+
+        content = await res.read()
+        try:
+            if res.status >= 400:
+                result = json.loads(content)
+                code = result.get("errorCode") or result.get("error") or "unknown_error"
+                raise ServiceException(status=res.status, code=code, message="Okta Service Exception", info=result)
+            if mode == "get":
+                next = res.links.get("next", {}).get("url")
+                # Get the relative URL
+                next = re.sub(r".*\/\/.[^\/]*\/", "/", str(next)) if next else None
+                return (decoder(content) if decoder else json.loads(content), next)
+            elif mode == "post":
+                return json.loads(content)
+            return res.status
+        except ValueError as verr:
+            raise APIException("Failed to parse API response", res) from verr
+
+    async def get(self, url, headers=None, decoder=None):
+        """Executes HTTP GET call to the supplied Okta endpoint and returns the response.
+
+        Parameters
+        ----------
+        url : str
+            Okta API endpoint. Example - https://example.okta.com/api/v1/users
+        headers : object, optional
+            HTTP header key-value pairs specific to the API endpoint (default is None).
+        decoder : callable, optional
+            Decodes the raw response body (default is None, standard JSON decoding).
+        """
+
+        return await self._httpcall(url=url, headers=headers, mode="get", decoder=decoder)
+
+    async def post(self, url, data=None, headers=None):
+        """Executes HTTP POST call to the supplied Okta endpoint and returns the response.
+
+        Parameters
+        ----------
+        url : str
+            Okta API endpoint. Example - https://example.okta.com/api/v1/users
+        data : object, optional
+            Payload data for the API endpoint (default is None).
+        headers : object, optional
+            HTTP header key-value pairs specific to the API endpoint (default is None).
+        """
+
+        return await self._httpcall(url=url, headers=headers, data=data, mode="post")
+
+    async def delete(self, url, headers=None):
+        """Executes HTTP DELETE call to the supplied Okta endpoint and returns the response.
+
+        Parameters
+        ----------
+        url : str
+            Okta API endpoint. Example - https://example.okta.com/api/v1/users/${userId}
+        headers : object, optional
+            HTTP header key-value pairs specific to the API endpoint (default is None).
+        """
+
+        return await self._httpcall(url=url, headers=headers, mode="delete")
+
+    async def put(self, url, data=None, headers=None):
+        """Executes HTTP PUT call to the supplied Okta endpoint and returns the response.
+
+        Parameters
+        ----------
+        url : str
+            Okta API endpoint
+        data : object, optional
+            Payload data for the API endpoint (default is None).
+        headers : object, optional
+            HTTP header key-value pairs specific to the API endpoint (default is None).
+        """
+
+        return await self._httpcall(url=url, headers=headers, data=data, mode="put")
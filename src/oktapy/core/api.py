@@ -1,5 +1,8 @@
 import requests
 import re
+import threading
+
+from requests.adapters import HTTPAdapter
 
 from oktapy.exceptions import APIException, ServiceException
 
@@ -8,11 +11,15 @@ class OktaRequest(object):
     """Okta API request handler class.
 
     This class handles the actual HTTPS API call to Okta endpoints.
+    All calls go through a single long-lived `requests.Session`, so TCP/TLS connections
+    to the org are pooled and kept alive across calls.
 
     Attributes
     ----------
     _headers : Object
         HTTP header key-value pairs
+    _session : object
+        Pooled `requests.Session` used for every API call
 
     Methods
     -------
@@ -27,19 +34,118 @@ class OktaRequest(object):
 
     put(url, data=None, headers=None)
         Executes HTTP PUT call to the supplied Okta endpoint and returns the response.
+
+    close()
+        Closes all pooled connections.
     """
 
-    def __init__(self):
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=True, keep_alive=True, timeout=None, rate_limiter=None,
+                 retry_policy=None):
         """
 
         Instantiates OktaRequest handler object and bootstraps the default HTTP header key-value pairs.
         Since most of the API's deal with JSON data, `Content-Type` and `Accept` headers are set to
         `application/json`
+
+        Parameters
+        ----------
+        pool_connections : int
+            Number of per-host connection pools to cache (default is 10).
+        pool_maxsize : int
+            Maximum number of connections kept open to a single host (default is 10).
+        pool_block : bool
+            Block when all connections to a host are in use instead of opening extra,
+            unpooled connections. Caps concurrent connections per host (default is True).
+        keep_alive : bool
+            Reuse connections across calls. When False, every call asks the server to close
+            the connection (default is True).
+        timeout : float, optional
+            Connect/read timeout in seconds for every call (default is None, no timeout).
+        rate_limiter : object, optional
+            Instance of oktapy.core.ratelimit.RateLimiter pacing the calls made through this
+            requester (default is None, no client side rate limiting).
+        retry_policy : object, optional
+            Instance of oktapy.core.retry.RetryPolicy deciding which transient failures are
+            retried (default is None, no retries).
         """
 
         self._headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+        if not keep_alive:
+            self._headers['Connection'] = 'close'
+        self._timeout = timeout
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        self._local = threading.local()
+
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        self._session = requests.Session()
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def close(self):
+        """Closes all pooled connections."""
+
+        self._session.close()
+
+    def _send(self, url, data=None, headers=None, mode="get"):
+        """Sends the HTTP request through the pooled session and returns the raw response.
+
+        When a rate limiter is attached, the call waits for budget in its rate limit bucket
+        before it is sent, and a 429 response is retried after the bucket resets instead of
+        being returned, up to `max_waits` times. When a retry policy is attached, transient
+        connection errors and statuses are retried with backoff as the policy allows.
+        The number of replays is available from `last_retries` afterwards, and the `Date`
+        header of the response from `last_date`.
+        """
+
+        limiter = self._rate_limiter
+        policy = self._retry_policy
+        waits = 0
+        attempt = 0
+        self._local.retries = 0
+        while True:
+            if limiter:
+                limiter.acquire(mode, url)
+            try:
+                res = self._session.request(mode.upper(), url, data=data, headers=headers, timeout=self._timeout)
+            except requests.exceptions.RequestException as err:
+                if not (policy and policy.retry_error(mode, err, attempt)):
+                    raise
+                attempt += 1
+                self._local.retries = waits + attempt
+                policy.wait(attempt)
+                continue
+
+            if limiter:
+                limiter.update(mode, url, res.headers)
+                if res.status_code == 429 and waits < limiter.max_waits:
+                    waits += 1
+                    self._local.retries = waits + attempt
+                    res.close()
+                    limiter.wait_reset(mode, url)
+                    continue
+            if policy and policy.retry_status(mode, res.status_code, attempt):
+                attempt += 1
+                self._local.retries = waits + attempt
+                res.close()
+                policy.wait(attempt)
+                continue
+            self._local.date = res.headers.get("Date")
+            return res
+
+    @property
+    def last_retries(self):
+        """Number of times the last call made from the current thread was replayed."""
+
+        return getattr(self._local, "retries", 0)
+
+    @property
+    def last_date(self):
+        """`Date` header of the response to the last call made from the current thread, or None."""
+
+        return getattr(self._local, "date", None)
 
-    def _httpcall(self, url, data=None, headers=None, mode="get"):
+    def _httpcall(self, url, data=None, headers=None, mode="get", decoder=None):
         """Internal common function to execute REST API call.
 
         Parameters
@@ -52,6 +158,8 @@ class OktaRequest(object):
             HTTP header key-value pairs specific to the API endpoint (default is None).
         mode : str
             HTTP Call type. Allowed value - `get`, `post`, `delete`, `put`, `patch` (default is `get`).
+        decoder : callable, optional
+            Decodes the raw body of a successful GET response (default is None, `Response.json`).
 
         Raises
         ------
@@ -67,19 +175,19 @@ class OktaRequest(object):
         try:
             res = requests.models.Response()
             if mode == "get":
-                res = requests.get(url, headers=final_headers)
+                res = self._send(url, headers=final_headers, mode=mode)
                 next = res.links.get("next", {}).get("url")
                 # Get the relative URL
                 next = re.sub(r".*\/\/.[^\/]*\/", "/", next) if next else None
-                result = (res.json(), next)
+                result = (decoder(res.content) if (decoder and res.ok) else res.json(), next)
             elif mode == "post":
-                res = requests.post(url, data=data, headers=final_headers)
+                res = self._send(url, data=data, headers=final_headers, mode=mode)
                 result = res.json()
             elif mode == "put":
-                res = requests.put(url, data=data, headers=final_headers)
+                res = self._send(url, data=data, headers=final_headers, mode=mode)
                 result = res.status_code  # PUT usually returns 204 No Content
             elif mode == "delete":
-                res = requests.delete(url, headers=final_headers)
+                res = self._send(url, headers=final_headers, mode=mode)
                 result = res.status_code
             else:
                 raise APIException(f"HTTP {mode} is not supported", None)
@@ -123,7 +231,7 @@ class OktaRequest(object):
 
         return result
 
-    def get(self, url, headers=None):
+    def get(self, url, headers=None, decoder=None):
         """Executes HTTP GET call to the supplied Okta endpoint and returns the response.
 
         Parameters
@@ -132,9 +240,12 @@ class OktaRequest(object):
             Okta API endpoint. Example - https://example.okta.com/api/v1/users
         headers : object, optional
             HTTP header key-value pairs specific to the API endpoint (default is None).
+        decoder : callable, optional
+            Decodes the raw response body (default is None, `Response.json`).
+            See oktapy.core.decode.user_decoder.
         """
 
-        return self._httpcall(url=url, headers=headers, mode="get")
+        return self._httpcall(url=url, headers=headers, mode="get", decoder=decoder)
 
     def post(self, url, data=None, headers=None):
         """Executes HTTP GET call to the supplied Okta endpoint and returns the response.
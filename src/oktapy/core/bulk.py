@@ -0,0 +1,198 @@
+"""Bulk operation executor.
+
+Runs one API operation per record with bounded concurrency and collects the outcome
+in the `success`/`failure`/`errors`/`retries` report shape used by the resource managers.
+Outcomes can be checkpointed to a journal (see oktapy.core.journal) so that a resumed
+run skips the records that already succeeded. AsyncBulkExecutor does the same for
+coroutine operations on an event loop.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from oktapy.exceptions import ServiceException
+
+
+def error_info(ex):
+    """Returns the reportable error detail for an exception raised by an API operation.
+
+    Parameters
+    ----------
+    ex : Exception
+        Exception raised while processing a record.
+    """
+
+    if isinstance(ex, ServiceException):
+        return ex.info
+    return getattr(ex, "message", None) or str(ex)
+
+
+class BulkExecutor(object):
+    """Bounded-concurrency executor for bulk API operations.
+
+    Records are consumed lazily from the input iterable and at most `2 * concurrency`
+    of them are in flight at any time. Outcomes are reported in input order, so
+    `failure[i]` is always the record that produced `errors[i]`.
+
+    Attributes
+    ----------
+    _concurrency : int
+        Maximum number of operations executed in parallel.
+    _retry_counter : callable
+        Returns the number of retries of the last API call made from the current thread.
+
+    Methods
+    -------
+    run(records, operation, on_success=None, journal=None, stage=None, key=None)
+        Executes the operation for every record and returns the bulk report.
+    """
+
+    def __init__(self, concurrency=1, retry_counter=None):
+        """
+        Instantiates a bulk executor.
+
+        Parameters
+        ----------
+        concurrency : int
+            Maximum number of operations executed in parallel (default is 1, serial).
+        retry_counter : callable, optional
+            Returns the number of retries of the last API call made from the current thread,
+            such as `OktaAPIToken.last_retries`. Summed into the `retries` entry of the report.
+        """
+
+        self._concurrency = max(1, int(concurrency or 1))
+        self._retry_counter = retry_counter
+
+    def _execute(self, operation, record):
+        try:
+            outcome = (True, operation(record))
+        except Exception as ex:
+            outcome = (False, ex)
+        retries = self._retry_counter() if self._retry_counter else 0
+        return outcome + (retries,)
+
+    def _outcomes(self, records, operation):
+        if self._concurrency == 1:
+            for record in records:
+                yield (record,) + self._execute(operation, record)
+            return
+
+        window = deque()
+        max_in_flight = 2 * self._concurrency
+        with ThreadPoolExecutor(max_workers=self._concurrency) as pool:
+            for record in records:
+                window.append((record, pool.submit(self._execute, operation, record)))
+                if len(window) >= max_in_flight:
+                    record, future = window.popleft()
+                    yield (record,) + future.result()
+            while window:
+                record, future = window.popleft()
+                yield (record,) + future.result()
+
+    def run(self, records, operation, on_success=None, journal=None, stage=None, key=None):
+        """Executes the operation for every record and returns the bulk report.
+
+        With a journal, records that already succeeded in the stage are skipped and
+        reported as success with their journaled value, and every new outcome is journaled
+        as soon as it is known. The number of skipped records is reported as `resumed`.
+
+        Parameters
+        ----------
+        records : iterable
+            Records to process. Consumed lazily.
+        operation : callable
+            Called with a record; performs the API call and returns its response.
+        on_success : callable, optional
+            Called with `(record, response)`; returns the entry to report as success
+            (default is None, the record itself).
+        journal : object, optional
+            Job journal. Instance of oktapy.core.journal.Journal.
+        stage : str, optional
+            Journal stage of the operation (default is the journal operation).
+        key : callable, optional
+            Returns the journal key of a record (default is None, the record itself).
+        """
+
+        report, records, stage, key = self._start(records, journal, stage, key)
+        for outcome in self._outcomes(records, operation):
+            self._collect(report, outcome, on_success, journal, stage, key)
+        return report
+
+    def _start(self, records, journal, stage, key):
+        report = {"success": [], "failure": [], "errors": [], "retries": 0, "resumed": 0}
+        if journal is not None:
+            stage = stage or journal.operation
+            key = key or (lambda record: record)
+            records = self._pending(records, journal.completed(stage), key, report)
+        return report, records, stage, key
+
+    @staticmethod
+    def _pending(records, completed, key, report):
+        for record in records:
+            record_key = key(record)
+            if record_key in completed:
+                report["resumed"] += 1
+                report["success"].append(completed[record_key] if completed[record_key] is not None else record)
+                continue
+            yield record
+
+    @staticmethod
+    def _collect(report, outcome, on_success, journal, stage, key):
+        record, ok, value, record_retries = outcome
+        report["retries"] += record_retries
+        if ok:
+            entry = on_success(record, value) if on_success else record
+            report["success"].append(entry)
+            if journal is not None:
+                journal.record(stage, key(record), True, value=entry)
+        else:
+            report["errors"].append(error_info(value))
+            report["failure"].append(record)
+            if journal is not None:
+                journal.record(stage, key(record), False, error=report["errors"][-1])
+
+
+class AsyncBulkExecutor(BulkExecutor):
+    """Bounded-concurrency executor for bulk API operations on an event loop.
+
+    The asyncio counterpart of BulkExecutor, for coroutine operations such as the ones of
+    the async resource managers. At most `concurrency` operations are awaited at a time,
+    and the report has the same shape and order as BulkExecutor's.
+
+    Methods
+    -------
+    run(records, operation, on_success=None, journal=None, stage=None, key=None)
+        Coroutine executing the operation for every record and returning the bulk report.
+    """
+
+    async def _execute(self, operation, record):
+        try:
+            outcome = (True, await operation(record))
+        except Exception as ex:
+            outcome = (False, ex)
+        retries = self._retry_counter() if self._retry_counter else 0
+        return outcome + (retries,)
+
+    async def _outcomes(self, records, operation):
+        import asyncio
+
+        window = deque()
+        for record in records:
+            window.append((record, asyncio.ensure_future(self._execute(operation, record))))
+            if len(window) >= self._concurrency:
+                record, task = window.popleft()
+                yield (record,) + await task
+        while window:
+            record, task = window.popleft()
+            yield (record,) + await task
+
+    async def run(self, records, operation, on_success=None, journal=None, stage=None, key=None):
+        """Executes the coroutine operation for every record and returns the bulk report.
+
+        Takes the same parameters as BulkExecutor.run, with `operation` returning an awaitable.
+        """
+
+        report, records, stage, key = self._start(records, journal, stage, key)
+        async for outcome in self._outcomes(records, operation):
+            self._collect(report, outcome, on_success, journal, stage, key)
+        return report
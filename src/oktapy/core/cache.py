@@ -0,0 +1,233 @@
+"""Local persistent resource cache.
+
+Okta resources fetched by id or login are kept in a SQLite database, namespaced per
+profile, so that repeated lookups within the time-to-live are served without an API call.
+The least recently used entries are evicted once a namespace exceeds its size limit.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+_SQLITE_HEADER = b"SQLite format 3\x00"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, kind, id)
+);
+CREATE INDEX IF NOT EXISTS cache_entries_accessed ON cache_entries (namespace, accessed_at);
+CREATE TABLE IF NOT EXISTS cache_keys (
+    namespace TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    id TEXT NOT NULL,
+    PRIMARY KEY (namespace, kind, key)
+);
+CREATE INDEX IF NOT EXISTS cache_keys_id ON cache_keys (namespace, kind, id);
+"""
+
+
+def connect(path):
+    """Opens the SQLite database at `path`, replacing a legacy non-SQLite file.
+
+    Earlier versions created the cache file as an empty JSON document.
+
+    Parameters
+    ----------
+    path : str
+        Database file name.
+    """
+
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        with open(path, "rb") as dbfile:
+            header = dbfile.read(len(_SQLITE_HEADER))
+        if header != _SQLITE_HEADER:
+            os.remove(path)
+    connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class ResourceCache(object):
+    """Per profile cache of Okta resources.
+
+    Entries are stored by resource kind (`users`, `groups`) and id, and can be looked up by
+    any of their keys, such as the id or the login. Keys are case-insensitive.
+
+    Attributes
+    ----------
+    namespace : str
+        Cache namespace, usually the profile name.
+    ttl : float
+        Time-to-live of an entry in seconds.
+    max_entries : int
+        Maximum number of entries kept in the namespace.
+
+    Methods
+    -------
+    get(kind, key)
+        Returns the cached resource for the key, or None.
+
+    put(kind, data, keys)
+        Caches a resource under its id and the supplied keys.
+
+    put_many(kind, records, keys)
+        Caches several resources in one transaction.
+
+    invalidate(kind, id)
+        Removes a resource from the cache.
+
+    clear()
+        Removes every entry of the namespace.
+    """
+
+    def __init__(self, path, namespace="DEFAULT", ttl=300, max_entries=50000, clock=time.time):
+        """
+        Opens, and creates if needed, the cache database.
+
+        Parameters
+        ----------
+        path : str
+            SQLite database file name. Example - ~/.atkocli/cache
+        namespace : str
+            Cache namespace, usually the profile name (default is `DEFAULT`).
+        ttl : float
+            Time-to-live of an entry in seconds (default is 300).
+        max_entries : int
+            Maximum number of entries kept in the namespace (default is 50000).
+        clock : callable
+            Function returning the current epoch time (default is `time.time`).
+        """
+
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._db = connect(path)
+        self._db.executescript(_SCHEMA)
+
+    def get(self, kind, key):
+        """Returns the cached resource for the key, or None.
+
+        Parameters
+        ----------
+        kind : str
+            Resource kind. Example - users
+        key : str
+            Any key the resource was cached under, such as its id or login.
+        """
+
+        now = self._clock()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT e.id, e.data, e.stored_at FROM cache_keys k JOIN cache_entries e "
+                "ON e.namespace = k.namespace AND e.kind = k.kind AND e.id = k.id "
+                "WHERE k.namespace = ? AND k.kind = ? AND k.key = ?",
+                (self.namespace, kind, str(key).lower())).fetchone()
+            if row is None:
+                return None
+            if row[2] + self.ttl < now:
+                self._delete(kind, row[0])
+                return None
+            self._db.execute("UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND kind = ? AND id = ?",
+                             (now, self.namespace, kind, row[0]))
+        return json.loads(row[1])
+
+    def put(self, kind, data, keys=()):
+        """Caches a resource under its id and the supplied keys.
+
+        Parameters
+        ----------
+        kind : str
+            Resource kind. Example - users
+        data : dict
+            Resource JSON object as returned by Okta. Must have an `id`.
+        keys : iterable
+            Additional lookup keys. Example - the user login
+        """
+
+        self.put_many(kind, [data], lambda record: keys)
+
+    def put_many(self, kind, records, keys=None):
+        """Caches several resources in one transaction.
+
+        Parameters
+        ----------
+        kind : str
+            Resource kind. Example - users
+        records : iterable
+            Resource JSON objects as returned by Okta. Each must have an `id`.
+        keys : callable, optional
+            Returns the additional lookup keys of a record (default is None, id only).
+        """
+
+        now = self._clock()
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for data in records:
+                    rid = data["id"]
+                    self._db.execute("INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?, ?)",
+                                     (self.namespace, kind, rid, json.dumps(data), now, now))
+                    for key in [rid] + [key for key in (keys(data) if keys else ()) if key]:
+                        self._db.execute("INSERT OR REPLACE INTO cache_keys VALUES (?, ?, ?, ?)",
+                                         (self.namespace, kind, str(key).lower(), rid))
+                self._evict()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def invalidate(self, kind, id):
+        """Removes a resource from the cache.
+
+        Parameters
+        ----------
+        kind : str
+            Resource kind. Example - users
+        id : str
+            Resource id.
+        """
+
+        with self._lock:
+            self._delete(kind, id)
+
+    def clear(self):
+        """Removes every entry of the namespace."""
+
+        with self._lock:
+            self._db.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+            self._db.execute("DELETE FROM cache_keys WHERE namespace = ?", (self.namespace,))
+
+    def _delete(self, kind, id):
+        self._db.execute("DELETE FROM cache_entries WHERE namespace = ? AND kind = ? AND id = ?", (self.namespace, kind, id))
+        self._db.execute("DELETE FROM cache_keys WHERE namespace = ? AND kind = ? AND id = ?", (self.namespace, kind, id))
+
+    def _evict(self):
+        count = self._db.execute("SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)).fetchone()[0]
+        if count <= self.max_entries:
+            return
+        # Evict down to 90% of the limit so that eviction does not run on every insert
+        excess = count - int(self.max_entries * 0.9)
+        self._db.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS cache_evicted (kind TEXT, id TEXT)")
+        self._db.execute("DELETE FROM cache_evicted")
+        self._db.execute(
+            "INSERT INTO cache_evicted SELECT kind, id FROM cache_entries WHERE namespace = ? "
+            "ORDER BY accessed_at LIMIT ?", (self.namespace, excess))
+        self._db.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND (kind, id) IN (SELECT kind, id FROM cache_evicted)",
+            (self.namespace,))
+        self._db.execute(
+            "DELETE FROM cache_keys WHERE namespace = ? AND (kind, id) IN (SELECT kind, id FROM cache_evicted)",
+            (self.namespace,))
@@ -0,0 +1,71 @@
+"""Lean decoding of API responses.
+
+Decodes response bodies straight from bytes, with `orjson` when it is installed and the
+standard library otherwise, and reduces each user to the requested attributes while the
+page is decoded, so that only the projected objects outlive the page.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def loads(content):
+    """Decodes a JSON response body.
+
+    Parameters
+    ----------
+    content : bytes
+        Raw response body.
+    """
+
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def project_user(data, attrs=None):
+    """Returns the user JSON object reduced to the requested profile attributes, without `_links`.
+
+    The result has the same shape as the data of `User(data, attr=...)`.
+
+    Parameters
+    ----------
+    data : dict
+        User JSON object as returned by Okta.
+    attrs : list, optional
+        Profile attributes to keep besides `login`. None keeps every attribute but `_links`.
+    """
+
+    if attrs is None:
+        data.pop("_links", None)
+        return data
+    source = data["profile"]
+    profile = {"login": source["login"]}
+    for name in attrs:
+        if name in source:
+            profile[name] = source[name]
+    return {"id": data["id"], "status": data["status"], "profile": profile}
+
+
+def user_decoder(attr=None):
+    """Returns a function decoding a page of users into projected user JSON objects.
+
+    Parameters
+    ----------
+    attr : str, optional
+        Comma separated subset of profile attributes to keep (default is None, all attributes).
+    """
+
+    attrs = None if attr is None else list(set(attr.split(",")) - {"id", "login", "status"})
+
+    def decode(content):
+        result = loads(content)
+        if isinstance(result, list):
+            return [project_user(data, attrs) for data in result]
+        return project_user(result, attrs)
+
+    return decode
@@ -0,0 +1,205 @@
+"""Checkpoint journal for bulk jobs.
+
+Records the outcome of every record of a bulk operation in an append-only file as soon
+as it is known, so that an interrupted job can be resumed without repeating the records
+that already succeeded. Writes are flushed immediately and synced to disk in batches.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from oktapy.exceptions import ConfigurationException
+
+
+class Journal(object):
+    """Append-only outcome journal of a bulk job.
+
+    The first line holds the job header, every following line the outcome of one record
+    in one stage of the job, such as `deactivate` and `delete`. When a record appears
+    several times, its last outcome wins.
+
+    Attributes
+    ----------
+    job_id : str
+        Job identifier, also the journal file name.
+    operation : str
+        Bulk operation of the job. Example - delete
+    params : dict
+        Parameters the job was started with.
+
+    Methods
+    -------
+    create(directory, operation, params={})
+        Starts the journal of a new job.
+
+    resume(directory, job_id, operation)
+        Reopens the journal of an interrupted job.
+
+    completed(stage)
+        Returns the keys of the records that succeeded in the stage.
+
+    record(stage, key, ok, value=None, error=None)
+        Appends the outcome of a record.
+
+    close()
+        Syncs and closes the journal.
+
+    finish()
+        Closes the journal, and removes it when every record succeeded.
+    """
+
+    def __init__(self, path, job_id, operation, params=None, outcomes=None, sync_every=100, sync_interval=1.0):
+        self.job_id = job_id
+        self.operation = operation
+        self.params = params or {}
+        self._path = path
+        self._outcomes = outcomes or {}
+        self._sync_every = sync_every
+        self._sync_interval = sync_interval
+        self._pending = 0
+        self._synced_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    @classmethod
+    def create(cls, directory, operation, params={}):
+        """Starts the journal of a new job.
+
+        Parameters
+        ----------
+        directory : str
+            Directory holding the journals. Example - ~/.atkocli/jobs
+        operation : str
+            Bulk operation of the job. Example - create
+        params : dict
+            Parameters the job was started with, kept for reference.
+        """
+
+        os.makedirs(directory, exist_ok=True)
+        job_id = f"{operation}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        journal = cls(os.path.join(directory, job_id + ".journal"), job_id, operation, params)
+        journal._append({"job": job_id, "operation": operation, "params": params, "created": datetime.now().isoformat()})
+        journal._sync()
+        return journal
+
+    @classmethod
+    def resume(cls, directory, job_id, operation):
+        """Reopens the journal of an interrupted job.
+
+        A line left incomplete by a crash is ignored.
+
+        Parameters
+        ----------
+        directory : str
+            Directory holding the journals. Example - ~/.atkocli/jobs
+        job_id : str
+            Identifier of the job to resume.
+        operation : str
+            Bulk operation being resumed. Must match the job's.
+        """
+
+        path = os.path.join(directory, job_id + ".journal")
+        if not os.path.exists(path):
+            raise ConfigurationException(f"Job {job_id} not found in {directory}")
+        header = None
+        outcomes = {}
+        with open(path, "r", encoding="utf-8") as journal_file:
+            for line in journal_file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if header is None:
+                    header = entry
+                else:
+                    outcomes[(entry["stage"], entry["key"])] = entry
+        if header is None or header.get("operation") != operation:
+            raise ConfigurationException(f"Job {job_id} is not a {operation} job")
+        journal = cls(path, job_id, operation, header.get("params"), outcomes)
+        with open(path, "rb") as journal_file:
+            journal_file.seek(-1, os.SEEK_END)
+            if journal_file.read(1) != b"\n":
+                # Terminate the incomplete line so that new outcomes start on their own line
+                journal._file.write("\n")
+        return journal
+
+    def completed(self, stage):
+        """Returns the keys of the records that succeeded in the stage, with their success values.
+
+        Parameters
+        ----------
+        stage : str
+            Job stage. Example - deactivate
+        """
+
+        with self._lock:
+            return {key: entry.get("value") for (entry_stage, key), entry in self._outcomes.items()
+                    if entry_stage == stage and entry["ok"]}
+
+    def record(self, stage, key, ok, value=None, error=None):
+        """Appends the outcome of a record. The journal is synced every `sync_every` records or `sync_interval` seconds.
+
+        Parameters
+        ----------
+        stage : str
+            Job stage. Example - deactivate
+        key : str
+            Record key, such as the user id or login.
+        ok : bool
+            Whether the record succeeded.
+        value : object, optional
+            Success value reported for the record.
+        error : object, optional
+            Error reported for the record.
+        """
+
+        entry = {"stage": stage, "key": key, "ok": ok}
+        if value is not None:
+            entry["value"] = value
+        if error is not None:
+            entry["error"] = error
+        with self._lock:
+            self._outcomes[(stage, key)] = entry
+            self._append(entry)
+            self._pending = self._pending + 1
+            if self._pending >= self._sync_every or time.monotonic() - self._synced_at >= self._sync_interval:
+                self._sync()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+    def finish(self):
+        """Closes the journal, and removes it when every record succeeded.
+
+        Journals with failed records are kept, so that the job can be resumed to retry
+        them. Returns True if the journal was removed.
+        """
+
+        self.close()
+        with self._lock:
+            failed = any(not entry["ok"] for entry in self._outcomes.values())
+        if not failed:
+            os.remove(self._path)
+        return not failed
+
+    def _append(self, entry):
+        self._file.write(json.dumps(entry, default=str) + "\n")
+        self._file.flush()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._synced_at = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,177 @@
+"""Cursor pagination helpers.
+
+Okta list APIs return one page per call along with a `next` link to the following page.
+The helpers here walk those links and yield the result of each page.
+"""
+
+import queue
+import threading
+
+_END = object()
+
+
+class _Failure(object):
+    def __init__(self, error):
+        self.error = error
+
+
+def iter_pages(client, caller, apiurl, prefetch=0, follow=True, decoder=None):
+    """Yields the results of a paginated API page by page.
+
+    With `prefetch` above zero, pages are fetched by a background thread that requests the
+    `next` page as soon as the previous response has been received, while the caller is
+    still processing earlier pages. Up to `prefetch` pages are buffered ahead of the caller.
+    Stopping the iteration early stops the background thread.
+
+    Parameters
+    ----------
+    client : object
+        Okta client object. Instance of OktaAPIToken class.
+    caller : object
+        Caller object making the API call.
+    apiurl : str
+        Relative URL of the first page.
+    prefetch : int
+        Number of pages to fetch ahead of the caller. 0 fetches pages on demand (default is 0).
+    follow : bool
+        Follow the `next` links. When False only the first page is returned (default is True).
+    decoder : callable, optional
+        Decodes the raw body of each page (default is None, standard JSON decoding).
+    """
+
+    if prefetch <= 0:
+        next = apiurl
+        while next:
+            result, next = client.request(next, caller, decoder=decoder)
+            if not follow:
+                next = None
+            yield result
+        return
+
+    pages = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            next = apiurl
+            while next and not stop.is_set():
+                result, next = client.request(next, caller, decoder=decoder)
+                if not follow:
+                    next = None
+                if not put(result):
+                    return
+            put(_END)
+        except Exception as ex:
+            put(_Failure(ex))
+
+    producer = threading.Thread(target=produce, name="okta-page-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = pages.get()
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+
+
+async def aiter_pages(client, caller, apiurl, follow=True, decoder=None):
+    """Asynchronously yields the results of a paginated API page by page.
+
+    The async counterpart of `iter_pages`, used with `async for`.
+
+    Parameters
+    ----------
+    client : object
+        Async Okta client object. Instance of AsyncOktaAPIToken class.
+    caller : object
+        Caller object making the API call.
+    apiurl : str
+        Relative URL of the first page.
+    follow : bool
+        Follow the `next` links. When False only the first page is returned (default is True).
+    decoder : callable, optional
+        Decodes the raw body of each page (default is None, standard JSON decoding).
+    """
+
+    next = apiurl
+    while next:
+        result, next = await client.request(next, caller, decoder=decoder)
+        if not follow:
+            next = None
+        yield result
+
+
+def merge_pages(sources, workers=4, buffer=None):
+    """Yields the pages of several page iterables as they arrive, draining them concurrently.
+
+    Each source is consumed by its own worker thread, with at most `workers` sources
+    active at a time. Pages from different sources are interleaved in arrival order.
+    Stopping the iteration early stops the workers.
+
+    Parameters
+    ----------
+    sources : list
+        Page iterables, such as the ones returned by `iter_pages`.
+    workers : int
+        Maximum number of sources drained in parallel (default is 4).
+    buffer : int, optional
+        Number of pages buffered ahead of the caller (default is twice the workers).
+    """
+
+    pages = queue.Queue(maxsize=buffer or 2 * workers)
+    stop = threading.Event()
+    slots = threading.Semaphore(max(1, workers))
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def drain(source):
+        with slots:
+            try:
+                if stop.is_set():
+                    return
+                for page in source:
+                    if not put(page):
+                        return
+                put(_END)
+            except Exception as ex:
+                put(_Failure(ex))
+            finally:
+                close = getattr(source, "close", None)
+                if close:
+                    close()
+
+    threads = [threading.Thread(target=drain, args=(source,), name="okta-page-merge", daemon=True) for source in sources]
+    for thread in threads:
+        thread.start()
+    try:
+        pending = len(threads)
+        while pending:
+            item = pages.get()
+            if item is _END:
+                pending = pending - 1
+            elif isinstance(item, _Failure):
+                raise item.error
+            else:
+                yield item
+    finally:
+        stop.set()
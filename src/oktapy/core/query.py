@@ -0,0 +1,372 @@
+"""Offline evaluation of Okta user queries.
+
+Parses the subset of the Okta `filter`/`search` expression language used with the users
+API and evaluates it against user JSON objects, so that queries can be answered from the
+local user snapshot without calling the API.
+More details on the expression language - https://developer.okta.com/docs/reference/core-okta-api/#filter
+"""
+
+import re
+
+from oktapy.exceptions import ConfigurationException
+
+OPERATORS = {"eq", "ne", "gt", "ge", "lt", "le", "sw", "co", "ew", "pr"}
+
+_token = re.compile(r'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|([^\s()"]+))')
+
+
+def _tokenize(expression):
+    tokens = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _token.match(expression, position)
+        if not match:
+            raise ConfigurationException(f"Invalid expression near `{expression[position:]}`")
+        position = match.end()
+        if match.group(1):
+            tokens.append(("(", None))
+        elif match.group(2):
+            tokens.append((")", None))
+        elif match.group(3) is not None:
+            tokens.append(("value", re.sub(r"\\(.)", r"\1", match.group(3))))
+        else:
+            tokens.append(("word", match.group(4)))
+    return tokens
+
+
+class _Parser(object):
+    def __init__(self, expression):
+        self._tokens = _tokenize(expression)
+        self._position = 0
+
+    def _peek(self):
+        return self._tokens[self._position] if self._position < len(self._tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        self._position = self._position + 1
+        return token
+
+    def _keyword(self, word):
+        kind, value = self._peek()
+        return kind == "word" and value.lower() == word
+
+    def parse(self):
+        node = self._or()
+        if self._position != len(self._tokens):
+            raise ConfigurationException(f"Unexpected token `{self._peek()[1] or self._peek()[0]}` in expression")
+        return node
+
+    def _or(self):
+        nodes = [self._and()]
+        while self._keyword("or"):
+            self._next()
+            nodes.append(self._and())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def _and(self):
+        nodes = [self._factor()]
+        while self._keyword("and"):
+            self._next()
+            nodes.append(self._factor())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def _factor(self):
+        kind, value = self._next()
+        if kind == "(":
+            node = self._or()
+            if self._next()[0] != ")":
+                raise ConfigurationException("Missing `)` in expression")
+            return node
+        if kind != "word":
+            raise ConfigurationException("Expected an attribute name in expression")
+        attribute = value
+        kind, op = self._next()
+        if kind != "word" or op.lower() not in OPERATORS:
+            raise ConfigurationException(f"Unsupported operator `{op}` in expression")
+        op = op.lower()
+        if op == "pr":
+            return ("cmp", attribute, op, None)
+        kind, operand = self._next()
+        if kind == "value":
+            return ("cmp", attribute, op, operand)
+        if kind == "word":
+            literals = {"true": True, "false": False, "null": None}
+            if operand.lower() in literals:
+                return ("cmp", attribute, op, literals[operand.lower()])
+            try:
+                return ("cmp", attribute, op, float(operand) if "." in operand else int(operand))
+            except ValueError:
+                pass
+        raise ConfigurationException(f"Invalid value for `{attribute}` in expression")
+
+
+def parse_expression(expression):
+    """Parses an Okta filter or search expression into a tree of tuples.
+
+    Nodes are `("and", [nodes])`, `("or", [nodes])` and `("cmp", attribute, operator, value)`.
+
+    Parameters
+    ----------
+    expression : str
+        Expression. Example - profile.login sw "john" and status eq "ACTIVE"
+    """
+
+    return _Parser(expression).parse()
+
+
+def attribute_value(record, attribute):
+    """Returns the value of a dotted attribute path of a user JSON object, or None.
+
+    Parameters
+    ----------
+    record : dict
+        User JSON object.
+    attribute : str
+        Attribute path. Example - profile.login
+    """
+
+    value = record
+    for part in attribute.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _compare(actual, op, expected):
+    if op == "pr":
+        return actual is not None and actual != ""
+    if actual is None:
+        return op == "ne" and expected is not None
+    if isinstance(actual, list):
+        return any(_compare(item, op, expected) for item in actual)
+    if isinstance(expected, str) or isinstance(actual, str):
+        actual = str(actual).lower()
+        expected = "" if expected is None else str(expected).lower()
+    try:
+        if op == "eq":
+            return actual == expected
+        if op == "ne":
+            return actual != expected
+        if op == "sw":
+            return actual.startswith(expected)
+        if op == "co":
+            return expected in actual
+        if op == "ew":
+            return actual.endswith(expected)
+        if op == "gt":
+            return actual > expected
+        if op == "ge":
+            return actual >= expected
+        if op == "lt":
+            return actual < expected
+        if op == "le":
+            return actual <= expected
+    except (TypeError, AttributeError):
+        return False
+    return False
+
+
+def evaluate(node, record):
+    """Returns True if the user JSON object matches the parsed expression.
+
+    String comparisons are case-insensitive.
+
+    Parameters
+    ----------
+    node : tuple
+        Parsed expression, as returned by `parse_expression`.
+    record : dict
+        User JSON object.
+    """
+
+    if node[0] == "and":
+        return all(evaluate(child, record) for child in node[1])
+    if node[0] == "or":
+        return any(evaluate(child, record) for child in node[1])
+    return _compare(attribute_value(record, node[1]), node[2], node[3])
+
+
+def references(node, attribute):
+    """Returns True if the parsed expression compares the supplied attribute.
+
+    Parameters
+    ----------
+    node : tuple
+        Parsed expression, as returned by `parse_expression`.
+    attribute : str
+        Attribute path. Example - status
+    """
+
+    if node[0] in ("and", "or"):
+        return any(references(child, attribute) for child in node[1])
+    return node[1] == attribute
+
+
+def pattern_matchers(pattern, regex=False, case=True):
+    """Returns a function per attribute of the pattern, telling whether a value matches it.
+
+    Parameters
+    ----------
+    pattern : dict
+        Attribute to pattern mapping. Example - {"login": "john"}
+    regex : bool
+        Treat patterns as regular expressions (default is False, literal substrings).
+    case : bool
+        Case-sensitive matching (default is True).
+    """
+
+    flags = 0 if case else re.IGNORECASE
+    return {key: re.compile(value if regex else re.escape(value), flags).search for key, value in pattern.items()}
+
+
+def matches_pattern(record, matchers):
+    """Returns True if every attribute of the user matches its pattern.
+
+    Like `--pattern`, keys are profile attributes, `id` or `status`.
+
+    Parameters
+    ----------
+    record : dict
+        User JSON object.
+    matchers : dict
+        Attribute to match function mapping, as returned by `pattern_matchers`.
+    """
+
+    for key, match in matchers.items():
+        actual = record.get(key) if key in ("id", "status") else record.get("profile", {}).get(key)
+        if not match(str(actual or "")):
+            return False
+    return True
+
+
+def matches_query(record, query):
+    """Returns True if the user matches an Okta `q` query.
+
+    Like the users API, `q` is a case-insensitive prefix match on first name, last name or email.
+
+    Parameters
+    ----------
+    record : dict
+        User JSON object.
+    query : str
+        Query string.
+    """
+
+    query = query.lower()
+    profile = record.get("profile", {})
+    return any(str(profile.get(key) or "").lower().startswith(query) for key in ("firstName", "lastName", "email"))
+
+
+class OfflineQuery(object):
+    """Query planner over the local user snapshot.
+
+    Uses the snapshot indexes where the expression allows it - the id, login and email
+    lookups for `eq`, the sorted login index for `sw`, and the trigram index for `--pattern`
+    substrings - and falls back to scanning the snapshot otherwise. Every candidate is
+    checked against the full expression, so the indexes only narrow the scan.
+
+    Methods
+    -------
+    find(query=None, filter=None, search=None, pattern=None, threshold=0, regex=False, case=True)
+        Yields the user JSON objects matching the criteria.
+    """
+
+    _lookup_columns = {"id": "id", "profile.login": "login", "profile.email": "email"}
+
+    def __init__(self, store):
+        """
+        Instantiates a query planner.
+
+        Parameters
+        ----------
+        store : object
+            Local snapshot store. Instance of oktapy.core.store.UserStore.
+        """
+
+        self._store = store
+
+    def _candidates(self, node):
+        """Returns the candidate records for a parsed expression, or None when a scan is needed."""
+
+        if node[0] == "and":
+            for child in node[1]:
+                candidates = self._candidates(child)
+                if candidates is not None:
+                    return candidates
+            return None
+        if node[0] == "or":
+            found = {}
+            for child in node[1]:
+                candidates = self._candidates(child)
+                if candidates is None:
+                    return None
+                for record in candidates:
+                    found[record["id"]] = record
+            return list(found.values())
+        _, attribute, op, value = node
+        if not isinstance(value, str):
+            return None
+        if op == "eq" and attribute in self._lookup_columns:
+            return self._store.lookup(self._lookup_columns[attribute], [value])
+        if op == "sw" and attribute == "profile.login":
+            return self._store.login_prefix(value)
+        return None
+
+    def find(self, query=None, filter=None, search=None, pattern=None, threshold=0, regex=False, case=True):
+        """Yields the user JSON objects matching the criteria.
+
+        Mirrors the users API: without `search`, or a `filter` on `status`, deprovisioned
+        users are left out.
+
+        Parameters
+        ----------
+        query : str, optional
+            `q` prefix query on first name, last name or email.
+        filter : str, optional
+            Okta filter expression.
+        search : str, optional
+            Okta search expression.
+        pattern : dict, optional
+            Attribute to pattern mapping. Every pattern must occur in its attribute.
+        threshold : int
+            Maximum number of records to return. 0 returns all records (default is 0).
+        regex : bool
+            Treat patterns as regular expressions (default is False, literal substrings).
+        case : bool
+            Case-sensitive pattern matching (default is True).
+        """
+
+        expression = search if (search and search.strip()) else filter
+        node = parse_expression(expression) if (expression and expression.strip()) else None
+        include_deprovisioned = bool(search and search.strip()) or (node is not None and references(node, "status"))
+
+        candidates = self._candidates(node) if node is not None else None
+        matchers = pattern_matchers(pattern, regex=regex, case=case) if pattern else None
+        if candidates is None and pattern:
+            for key, value in pattern.items():
+                # The trigram index only narrows literal substrings
+                if regex and re.escape(value) != value:
+                    continue
+                candidates = self._store.substring(key, value)
+                if candidates is not None:
+                    break
+        if candidates is None:
+            candidates = self._store.records()
+
+        count = 0
+        for record in candidates:
+            if (not include_deprovisioned) and record.get("status") == "DEPROVISIONED":
+                continue
+            if query and not matches_query(record, query):
+                continue
+            if node is not None and not evaluate(node, record):
+                continue
+            if matchers and not matches_pattern(record, matchers):
+                continue
+            yield record
+            count = count + 1
+            if threshold > 0 and count >= threshold:
+                return
@@ -0,0 +1,243 @@
+"""Client side rate limit scheduler.
+
+Okta reports the rate limit of the endpoint bucket serving a request through the
+`X-Rate-Limit-Limit`, `X-Rate-Limit-Remaining` and `X-Rate-Limit-Reset` response headers.
+The scheduler tracks those values per bucket and delays outgoing calls once a configured
+fraction of the limit has been consumed, until the bucket resets.
+More details on Okta rate limits - https://developer.okta.com/docs/reference/rl-best-practices/
+"""
+
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# Okta IDs, such as 00u1abcd2EFGH3ijk4l5
+_okta_id = re.compile(r"^00[0-9A-Za-z]{15,}$")
+
+# Resource collections whose next path segment identifies a resource (an ID, login or name)
+_COLLECTIONS = {"users", "groups", "apps", "factors", "roles", "policies", "rules", "idps", "authorizationServers",
+                "zones", "eventHooks", "inlineHooks", "templates", "domains", "brands", "themes"}
+
+
+def bucket_key(method, url):
+    """Returns the rate limit bucket key of an API call.
+
+    The key is the HTTP method plus the URL path with identifier segments replaced by `{id}`,
+    so that for example every `GET /api/v1/users/${userId}` call shares one bucket. A
+    segment is an identifier when it follows a resource collection, such as `users`, or is
+    an Okta ID.
+
+    Parameters
+    ----------
+    method : str
+        HTTP method of the call.
+    url : str
+        Absolute or relative URL of the call.
+    """
+
+    segments = urlsplit(url).path.split("/")
+    key = [segment if index == 0 or (segments[index - 1] not in _COLLECTIONS and not _okta_id.match(segment)) else "{id}"
+           for index, segment in enumerate(segments)]
+    return method.upper() + " " + "/".join(key)
+
+
+class _Bucket(object):
+    __slots__ = ("limit", "remaining", "start", "reset", "estimated")
+
+    def __init__(self, limit, remaining, reset):
+        self.limit = limit
+        self.remaining = remaining
+        self.start = 0
+        self.reset = reset
+        # True while the window is assumed locally rather than reported by Okta
+        self.estimated = False
+
+    def renew(self, start):
+        self.remaining = self.limit
+        self.start = start
+        self.reset = start + 60
+        self.estimated = True
+
+
+class RateLimiter(object):
+    """Per endpoint bucket rate limit scheduler.
+
+    One scheduler is shared by all API calls made through a client, including calls made
+    concurrently from several threads. Each call reserves one request from its bucket
+    before it is sent; once the bucket is down to `(1 - fraction) * limit` remaining
+    requests, further calls wait for the bucket's reset time.
+
+    Attributes
+    ----------
+    fraction : float
+        Fraction of each bucket's limit the client may consume per window.
+    max_waits : int
+        Maximum number of times a single call waits for a reset after a 429 response.
+
+    Methods
+    -------
+    reserve(method, url)
+        Reserves a request from the bucket and returns the seconds to wait before sending it.
+
+    acquire(method, url)
+        Reserves a request from the bucket, sleeping as long as needed.
+
+    update(method, url, headers)
+        Records the rate limit state reported in the response headers.
+
+    reset_delay(method, url)
+        Returns the seconds until the bucket resets.
+
+    wait_reset(method, url)
+        Sleeps until the bucket resets.
+    """
+
+    def __init__(self, fraction=0.8, max_waits=5, sleep=time.sleep, clock=time.time):
+        """
+        Instantiates a rate limit scheduler.
+
+        Parameters
+        ----------
+        fraction : float
+            Fraction of each bucket's limit the client may consume per window (default is 0.8).
+        max_waits : int
+            Maximum number of times a single call waits for a reset after a 429 response (default is 5).
+        sleep : callable
+            Function used to wait (default is `time.sleep`).
+        clock : callable
+            Function returning the current epoch time (default is `time.time`).
+        """
+
+        if not 0 < fraction <= 1:
+            raise ValueError("Rate limit fraction must be in the (0, 1] range")
+        self.fraction = fraction
+        self.max_waits = max_waits
+        self._sleep = sleep
+        self._clock = clock
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, method, url):
+        """Reserves a request from the bucket and returns the seconds to wait before sending it.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method of the call.
+        url : str
+            URL of the call.
+        """
+
+        key = bucket_key(method, url)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                return 0
+            now = self._clock()
+            if now >= bucket.reset:
+                # New window. Assume a full budget until the next response tells otherwise.
+                bucket.renew(now)
+            elif bucket.remaining <= bucket.limit * (1 - self.fraction):
+                # Budget spent. Reserve from the next window, which starts at the reset time.
+                bucket.renew(bucket.reset)
+            bucket.remaining -= 1
+            return max(0, bucket.start - now)
+
+    def acquire(self, method, url):
+        """Reserves a request from the bucket, sleeping as long as needed.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method of the call.
+        url : str
+            URL of the call.
+        """
+
+        delay = self.reserve(method, url)
+        if delay > 0:
+            self._sleep(delay)
+
+    def update(self, method, url, headers):
+        """Records the rate limit state reported in the response headers.
+
+        The reset time is translated to the local clock using the response `Date` header,
+        when present, to absorb clock skew between the client and Okta.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method of the call.
+        url : str
+            URL of the call.
+        headers : dict
+            Response headers.
+        """
+
+        try:
+            limit = int(headers["X-Rate-Limit-Limit"])
+            remaining = int(headers["X-Rate-Limit-Remaining"])
+            reset = float(headers["X-Rate-Limit-Reset"])
+        except (KeyError, TypeError, ValueError):
+            return
+
+        now = self._clock()
+        try:
+            reset = reset - parsedate_to_datetime(headers["Date"]).timestamp() + now
+        except (KeyError, TypeError, ValueError):
+            pass
+
+        key = bucket_key(method, url)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or reset > bucket.reset + 1:
+                self._buckets[key] = _Bucket(limit, remaining, reset)
+            elif bucket.estimated and reset <= bucket.start + 1:
+                # Late response from the window before the estimated one. It does not know the calls
+                # reserved from the estimated window, so keep those.
+                return
+            else:
+                # Responses of concurrent calls arrive out of order, and calls may have been reserved
+                # since; keep the highest usage.
+                used = max(bucket.limit - bucket.remaining, limit - remaining)
+                bucket.limit = limit
+                bucket.remaining = limit - used
+                if bucket.estimated:
+                    # Okta reports the window; use its reset time
+                    bucket.reset = reset
+                    bucket.estimated = False
+
+    def reset_delay(self, method, url):
+        """Returns the seconds until the bucket resets.
+
+        Used after a 429 response. Falls back to one second when the bucket is unknown.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method of the call.
+        url : str
+            URL of the call.
+        """
+
+        key = bucket_key(method, url)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                return 1
+            return max(1, bucket.reset - self._clock())
+
+    def wait_reset(self, method, url):
+        """Sleeps until the bucket resets.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method of the call.
+        url : str
+            URL of the call.
+        """
+
+        self._sleep(self.reset_delay(method, url))
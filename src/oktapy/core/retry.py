@@ -0,0 +1,154 @@
+"""Retry policy for transient API failures.
+
+Connection errors, timeouts, 429 and 5xx responses are usually transient. The policy
+decides whether a failed call may be replayed and how long to back off before the next
+attempt, using capped exponential backoff with full jitter.
+"""
+
+import random
+import time
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+DEFAULT_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Methods that can be replayed without the risk of applying the operation twice
+DEFAULT_RETRY_METHODS = ("get", "put", "delete")
+
+
+class RetryPolicy(object):
+    """Retry policy for transient API failures.
+
+    Idempotent methods are retried on any connection error, timeout or retryable status.
+    Other methods, such as POST to create a user, are only retried when the request
+    provably did not reach Okta: when the connection could not be established, or when
+    Okta rejected the call with 429 before processing it.
+
+    Attributes
+    ----------
+    max_attempts : int
+        Maximum number of attempts per call, including the first one.
+    backoff_base : float
+        Backoff in seconds before the first retry. Doubles on every further retry.
+    backoff_cap : float
+        Upper bound of the backoff in seconds.
+    jitter : bool
+        Randomize each backoff between zero and its exponential value.
+    retry_statuses : set
+        HTTP status codes considered transient.
+    retry_methods : set
+        HTTP methods that are safe to replay on any transient failure.
+
+    Methods
+    -------
+    retry_error(mode, error, attempt)
+        Returns True if the call may be retried after the supplied request exception.
+
+    retry_status(mode, status, attempt)
+        Returns True if the call may be retried after a response with the supplied status.
+
+    backoff(attempt)
+        Returns the seconds to wait before the supplied retry attempt.
+
+    wait(attempt)
+        Sleeps for the backoff of the supplied retry attempt.
+    """
+
+    def __init__(self, max_attempts=3, backoff_base=0.5, backoff_cap=30, jitter=True, retry_statuses=None,
+                 retry_methods=None, sleep=time.sleep):
+        """
+        Instantiates a retry policy.
+
+        Parameters
+        ----------
+        max_attempts : int
+            Maximum number of attempts per call, including the first one (default is 3).
+        backoff_base : float
+            Backoff in seconds before the first retry (default is 0.5).
+        backoff_cap : float
+            Upper bound of the backoff in seconds (default is 30).
+        jitter : bool
+            Randomize each backoff between zero and its exponential value (default is True).
+        retry_statuses : iterable, optional
+            HTTP status codes considered transient (default is 429, 500, 502, 503 and 504).
+        retry_methods : iterable, optional
+            HTTP methods that are safe to replay on any transient failure (default is GET, PUT and DELETE).
+        sleep : callable
+            Function used to wait (default is `time.sleep`).
+        """
+
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.jitter = jitter
+        self.retry_statuses = set(retry_statuses or DEFAULT_RETRY_STATUSES)
+        self.retry_methods = {method.lower() for method in (retry_methods or DEFAULT_RETRY_METHODS)}
+        self._sleep = sleep
+
+    def retry_error(self, mode, error, attempt):
+        """Returns True if the call may be retried after the supplied request exception.
+
+        Parameters
+        ----------
+        mode : str
+            HTTP method of the call.
+        error : Exception
+            Exception raised by `requests`.
+        attempt : int
+            Number of retries already made for the call.
+        """
+
+        if attempt + 1 >= self.max_attempts:
+            return False
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        if not isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return False
+        if mode in self.retry_methods:
+            return True
+        # The request may have been processed; only replay when it never left the client.
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(reason, NewConnectionError)
+
+    def retry_status(self, mode, status, attempt):
+        """Returns True if the call may be retried after a response with the supplied status.
+
+        Parameters
+        ----------
+        mode : str
+            HTTP method of the call.
+        status : int
+            HTTP status code of the response.
+        attempt : int
+            Number of retries already made for the call.
+        """
+
+        if attempt + 1 >= self.max_attempts or status not in self.retry_statuses:
+            return False
+        return mode in self.retry_methods or status == 429
+
+    def backoff(self, attempt):
+        """Returns the seconds to wait before the supplied retry attempt.
+
+        Parameters
+        ----------
+        attempt : int
+            Retry attempt number, starting at 1.
+        """
+
+        delay = min(self.backoff_cap, self.backoff_base * (2 ** (attempt - 1)))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def wait(self, attempt):
+        """Sleeps for the backoff of the supplied retry attempt.
+
+        Parameters
+        ----------
+        attempt : int
+            Retry attempt number, starting at 1.
+        """
+
+        self._sleep(self.backoff(attempt))
@@ -0,0 +1,324 @@
+"""Local user snapshot store.
+
+Keeps a per profile copy of the org's users in the same SQLite database as the resource
+cache, together with the high-water mark of the last synchronization, so that later
+synchronizations only need to fetch the users changed since.
+The snapshot is indexed by id, login and email, and by login, email and name trigrams
+when the SQLite build includes FTS5, so that it can be queried offline.
+"""
+
+import copy
+import json
+import sqlite3
+import threading
+
+from oktapy.core.cache import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users_snapshot (
+    namespace TEXT NOT NULL,
+    id TEXT NOT NULL,
+    login TEXT,
+    email TEXT,
+    status TEXT,
+    last_updated TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (namespace, id)
+);
+CREATE INDEX IF NOT EXISTS users_snapshot_login ON users_snapshot (namespace, login);
+CREATE INDEX IF NOT EXISTS users_snapshot_email ON users_snapshot (namespace, email);
+CREATE TABLE IF NOT EXISTS sync_state (
+    namespace TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    high_water_mark TEXT,
+    PRIMARY KEY (namespace, kind)
+);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE users_fts USING fts5 (login, email, firstName, lastName, tokenize = 'trigram');
+"""
+
+FTS_COLUMNS = ("login", "email", "firstName", "lastName")
+
+# Suffix of the namespace a full synchronization builds the new snapshot in
+STAGING_SUFFIX = ":staging"
+
+
+class UserStore(object):
+    """Per profile snapshot of the org's users.
+
+    Attributes
+    ----------
+    namespace : str
+        Store namespace, usually the profile name.
+
+    Methods
+    -------
+    upsert_many(records)
+        Inserts or replaces users in the snapshot.
+
+    count()
+        Returns the number of users in the snapshot.
+
+    records()
+        Yields every user JSON object in the snapshot.
+
+    lookup(column, values)
+        Returns the users whose `id`, `login` or `email` is one of the values.
+
+    login_prefix(prefix)
+        Returns the users whose login starts with the prefix.
+
+    substring(attribute, value)
+        Returns the users whose profile attribute may contain the value, or None without a usable index.
+
+    clear()
+        Removes every user and the high-water mark of the namespace.
+
+    staging()
+        Returns an empty store, sharing the database, to build a replacement snapshot in.
+
+    promote(staging, high_water_mark)
+        Replaces the snapshot with the users of a staging store, in one transaction.
+
+    high_water_mark()
+        Returns the `lastUpdated` timestamp the snapshot is current up to, or None.
+
+    set_high_water_mark(value)
+        Records the `lastUpdated` timestamp the snapshot is current up to.
+    """
+
+    def __init__(self, path, namespace="DEFAULT"):
+        """
+        Opens, and creates if needed, the snapshot store.
+
+        Parameters
+        ----------
+        path : str
+            SQLite database file name. Example - ~/.atkocli/cache
+        namespace : str
+            Store namespace, usually the profile name (default is `DEFAULT`).
+        """
+
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._db = connect(path)
+        self._db.executescript(_SCHEMA)
+        self._fts = self._create_fts()
+
+    def _create_fts(self):
+        """Creates the trigram index if needed and returns whether it is available."""
+
+        if self._db.execute("SELECT 1 FROM sqlite_master WHERE name = 'users_fts'").fetchone():
+            return True
+        try:
+            self._db.executescript(_FTS_SCHEMA)
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5 or the trigram tokenizer, substring queries scan the snapshot
+            return False
+        # Index the users of a snapshot synchronized before the trigram index existed
+        for rowid, data in self._db.execute("SELECT rowid, data FROM users_snapshot").fetchall():
+            self._index(rowid, json.loads(data))
+        return True
+
+    def _index(self, rowid, data):
+        profile = data.get("profile", {})
+        self._db.execute("INSERT INTO users_fts (rowid, login, email, firstName, lastName) VALUES (?, ?, ?, ?, ?)",
+                         (rowid,) + tuple(profile.get(column) for column in FTS_COLUMNS))
+
+    def upsert_many(self, records):
+        """Inserts or replaces users in the snapshot, in one transaction.
+
+        Parameters
+        ----------
+        records : iterable
+            User JSON objects as returned by Okta.
+        """
+
+        rows = []
+        for data in records:
+            data = {k: v for k, v in data.items() if k != "_links"}
+            profile = data.get("profile", {})
+            login = profile.get("login")
+            email = profile.get("email")
+            rows.append((data, (self.namespace, data["id"], login.lower() if login else None, email.lower() if email else None,
+                                data.get("status"), data.get("lastUpdated"), json.dumps(data))))
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                if self._fts:
+                    for data, row in rows:
+                        self._db.execute("DELETE FROM users_fts WHERE rowid IN "
+                                         "(SELECT rowid FROM users_snapshot WHERE namespace = ? AND id = ?)", row[:2])
+                        cursor = self._db.execute("INSERT OR REPLACE INTO users_snapshot VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+                        self._index(cursor.lastrowid, data)
+                else:
+                    self._db.executemany("INSERT OR REPLACE INTO users_snapshot VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                         [row for _, row in rows])
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def count(self):
+        """Returns the number of users in the snapshot."""
+
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM users_snapshot WHERE namespace = ?", (self.namespace,)).fetchone()[0]
+
+    def records(self):
+        """Yields every user JSON object in the snapshot."""
+
+        with self._lock:
+            cursor = self._db.execute("SELECT data FROM users_snapshot WHERE namespace = ?", (self.namespace,))
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(1000)
+            if not rows:
+                return
+            for row in rows:
+                yield json.loads(row[0])
+
+    def _select(self, where, parameters):
+        with self._lock:
+            rows = self._db.execute(f"SELECT s.data FROM {where}", parameters).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def lookup(self, column, values):
+        """Returns the users whose `id`, `login` or `email` is one of the values.
+
+        Login and email comparisons are case-insensitive.
+
+        Parameters
+        ----------
+        column : str
+            Indexed column. One of `id`, `login`, `email`.
+        values : list
+            Values to look up.
+        """
+
+        if column not in ("id", "login", "email"):
+            raise ValueError(f"Column {column} is not indexed")
+        values = [value if column == "id" else value.lower() for value in values]
+        found = []
+        # Stay below the SQLite bound parameter limit
+        for start in range(0, len(values), 500):
+            chunk = values[start:start + 500]
+            found.extend(self._select(f"users_snapshot s WHERE s.namespace = ? AND s.{column} IN ({', '.join('?' * len(chunk))})",
+                                      [self.namespace] + chunk))
+        return found
+
+    def login_prefix(self, prefix):
+        """Returns the users whose login starts with the prefix, case-insensitive.
+
+        Parameters
+        ----------
+        prefix : str
+            Login prefix. Example - john.
+        """
+
+        prefix = prefix.lower()
+        return self._select("users_snapshot s WHERE s.namespace = ? AND s.login >= ? AND s.login < ? ORDER BY s.login",
+                            (self.namespace, prefix, prefix + "\uffff"))
+
+    def substring(self, attribute, value):
+        """Returns the users whose profile attribute may contain the value, or None without a usable index.
+
+        The trigram index is case-insensitive and needs at least three characters, so the
+        result is a superset of the exact matches that callers still have to check.
+
+        Parameters
+        ----------
+        attribute : str
+            Profile attribute. One of `login`, `email`, `firstName`, `lastName`.
+        value : str
+            Substring to look for.
+        """
+
+        if not self._fts or attribute not in FTS_COLUMNS or len(value) < 3:
+            return None
+        phrase = '"' + value.replace('"', '""') + '"'
+        return self._select("users_fts f JOIN users_snapshot s ON s.rowid = f.rowid WHERE users_fts MATCH ? AND s.namespace = ?",
+                            (f"{attribute} : {phrase}", self.namespace))
+
+    def clear(self):
+        """Removes every user and the high-water mark of the namespace."""
+
+        with self._lock:
+            if self._fts:
+                self._db.execute("DELETE FROM users_fts WHERE rowid IN (SELECT rowid FROM users_snapshot WHERE namespace = ?)",
+                                 (self.namespace,))
+            self._db.execute("DELETE FROM users_snapshot WHERE namespace = ?", (self.namespace,))
+            self._db.execute("DELETE FROM sync_state WHERE namespace = ?", (self.namespace,))
+
+    def staging(self):
+        """Returns an empty store, sharing the database, to build a replacement snapshot in.
+
+        The snapshot stays untouched until `promote` swaps the staging users in, so that a
+        failed full synchronization leaves the previous snapshot in place.
+        """
+
+        store = copy.copy(self)
+        store.namespace = self.namespace + STAGING_SUFFIX
+        # Discard what an interrupted synchronization left behind
+        store.clear()
+        return store
+
+    def promote(self, staging, high_water_mark, kind="users"):
+        """Replaces the snapshot with the users of a staging store and records its high-water mark, in one transaction.
+
+        Parameters
+        ----------
+        staging : object
+            Store returned by `staging`.
+        high_water_mark : str
+            ISO 8601 timestamp the staging users are current up to.
+        kind : str
+            Resource kind (default is `users`).
+        """
+
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                if self._fts:
+                    self._db.execute("DELETE FROM users_fts WHERE rowid IN "
+                                     "(SELECT rowid FROM users_snapshot WHERE namespace = ?)", (self.namespace,))
+                self._db.execute("DELETE FROM users_snapshot WHERE namespace = ?", (self.namespace,))
+                # Rows keep their rowid, and so their trigram index entries
+                self._db.execute("UPDATE users_snapshot SET namespace = ? WHERE namespace = ?", (self.namespace, staging.namespace))
+                self._db.execute("DELETE FROM sync_state WHERE namespace = ?", (staging.namespace,))
+                self._db.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)", (self.namespace, kind, high_water_mark))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def high_water_mark(self, kind="users"):
+        """Returns the `lastUpdated` timestamp the snapshot is current up to, or None.
+
+        Parameters
+        ----------
+        kind : str
+            Resource kind (default is `users`).
+        """
+
+        with self._lock:
+            row = self._db.execute("SELECT high_water_mark FROM sync_state WHERE namespace = ? AND kind = ?",
+                                   (self.namespace, kind)).fetchone()
+        return row[0] if row else None
+
+    def set_high_water_mark(self, value, kind="users"):
+        """Records the `lastUpdated` timestamp the snapshot is current up to.
+
+        Parameters
+        ----------
+        value : str
+            ISO 8601 timestamp as returned by Okta. Example - 2024-01-31T12:00:00.000Z
+        kind : str
+            Resource kind (default is `users`).
+        """
+
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)", (self.namespace, kind, value))
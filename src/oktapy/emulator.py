@@ -0,0 +1,823 @@
+"""Local emulator of the Okta users and groups API.
+
+Serves the `/api/v1/users` and `/api/v1/groups` endpoints used by this package from a
+synthetic dataset, over HTTP on a local port or in-process, so that the managers can be
+tested and benchmarked without an Okta org. The emulator follows the behavior of Okta
+where the package depends on it - cursor pagination with `Link` headers, the `q`, `filter`
+and `search` parameters, user lifecycle transitions, `X-Rate-Limit-*` headers and 429
+responses - and can inject latency and transient failures.
+
+Seeded users and groups are generated on demand from their position in the dataset, and
+only the records changed through the API are kept in memory, so datasets of millions of
+users cost little memory.
+
+Run it standalone with `python -m oktapy.emulator --users 1000000 --port 8765`.
+"""
+
+import heapq
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from itertools import islice
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from oktapy.core.query import evaluate, matches_query, parse_expression, references
+from oktapy.core.ratelimit import bucket_key
+from oktapy.exceptions import ConfigurationException
+
+USER_ID = "00u{:017d}"
+GROUP_ID = "00g{:017d}"
+
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+               "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin"]
+DEPARTMENTS = ["Engineering", "Sales", "Marketing", "Finance", "Support", "Legal", "Operations", "Research"]
+
+# Status of a seeded user per hundred users: 85 active, 5 provisioned, 4 staged, 3 suspended, 3 deprovisioned
+_STATUSES = ["ACTIVE"] * 85 + ["PROVISIONED"] * 5 + ["STAGED"] * 4 + ["SUSPENDED"] * 3 + ["DEPROVISIONED"] * 3
+
+# Seeded records are created one minute apart from this date
+_EPOCH = 1577836800
+
+# Allowed lifecycle transitions, as operation: (statuses it applies to, resulting status)
+_TRANSITIONS = {
+    "activate": ({"STAGED", "PROVISIONED", "DEPROVISIONED"}, "ACTIVE"),
+    "deactivate": ({"STAGED", "PROVISIONED", "ACTIVE", "RECOVERY", "PASSWORD_EXPIRED", "LOCKED_OUT", "SUSPENDED",
+                    "DEPROVISIONED"}, "DEPROVISIONED"),
+    "suspend": ({"ACTIVE"}, "SUSPENDED"),
+    "unsuspend": ({"SUSPENDED"}, "ACTIVE"),
+}
+
+
+def _timestamp(seconds):
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(seconds))
+
+
+class Dataset(object):
+    """Synthetic Okta users and groups.
+
+    Seeded user `i` has the id `00u` followed by `i` on 17 digits and the login
+    `user{i}@{domain}`, and belongs to seeded group `i % groups`. Its names, department and
+    status are derived from `i` and `seed`. Users and groups created, changed or deleted
+    through the API are tracked on top of the seeded records. Positions in the dataset
+    give the order of listings.
+
+    Attributes
+    ----------
+    users : int
+        Number of seeded users.
+    groups : int
+        Number of seeded groups.
+    seed : int
+        Varies the generated names.
+    domain : str
+        Domain of the generated logins.
+    """
+
+    def __init__(self, users=1000, groups=20, seed=0, domain="example.com"):
+        self.users = users
+        self.groups = groups
+        self.seed = seed
+        self.domain = domain
+        self._lock = threading.RLock()
+        self._login = re.compile(r"user(0|[1-9]\d*)@" + re.escape(domain) + "$", re.IGNORECASE)
+        self._user_count = users
+        self._group_count = groups
+        self._changed_users = {}
+        self._deleted_users = set()
+        self._created_logins = {}
+        self._changed_groups = {}
+        self._deleted_groups = set()
+        self._added = {}
+        self._removed = {}
+
+    # Users
+
+    def _seeded_user(self, index):
+        first = FIRST_NAMES[(index + self.seed) % len(FIRST_NAMES)]
+        last = LAST_NAMES[(index // len(FIRST_NAMES) + self.seed) % len(LAST_NAMES)]
+        status = _STATUSES[(index * 37) % len(_STATUSES)]
+        created = _timestamp(_EPOCH + index * 60)
+        login = f"user{index}@{self.domain}"
+        return {
+            "id": USER_ID.format(index),
+            "status": status,
+            "created": created,
+            "activated": None if status in ("STAGED", "PROVISIONED") else created,
+            "statusChanged": created,
+            "lastLogin": None,
+            "lastUpdated": created,
+            "passwordChanged": None if status in ("STAGED", "PROVISIONED") else created,
+            "profile": {
+                "firstName": first,
+                "lastName": last,
+                "login": login,
+                "email": login,
+                "department": DEPARTMENTS[(index + self.seed) % len(DEPARTMENTS)],
+                "employeeNumber": str(index),
+            },
+            "credentials": {"provider": {"type": "OKTA", "name": "OKTA"}},
+        }
+
+    @property
+    def user_count(self):
+        """Number of user positions, deleted users included."""
+        return self._user_count
+
+    def user(self, index):
+        """Returns the user JSON object at a position, or None when it does not exist."""
+
+        if index < 0 or index >= self._user_count or index in self._deleted_users:
+            return None
+        record = self._changed_users.get(index)
+        if record is not None:
+            return json.loads(json.dumps(record))
+        return self._seeded_user(index)
+
+    def find_user(self, key):
+        """Returns the position of the user with the supplied id or login, or None."""
+
+        index = _position(key, "00u")
+        if index is None:
+            # Created users come first, as they may reuse the login of a deleted seeded user
+            index = self._created_logins.get(key.lower())
+        if index is None:
+            match = self._login.match(key)
+            index = int(match.group(1)) if match and int(match.group(1)) < self.users else None
+        return index if index is not None and self.user(index) is not None else None
+
+    def create_user(self, profile, credentials=None, status="ACTIVE"):
+        """Adds a user and returns it.
+
+        Raises ConfigurationException when the login is missing or already taken.
+        """
+
+        login = (profile or {}).get("login")
+        if not login:
+            raise ConfigurationException("login: The field cannot be left blank")
+        with self._lock:
+            if self.find_user(login) is not None:
+                raise ConfigurationException("login: An object with this field already exists in the current organization")
+            index = self._user_count
+            now = _timestamp(time.time())
+            record = {
+                "id": USER_ID.format(index),
+                "status": status,
+                "created": now,
+                "activated": now if status == "ACTIVE" else None,
+                "statusChanged": now,
+                "lastLogin": None,
+                "lastUpdated": now,
+                "passwordChanged": now if (credentials or {}).get("password") else None,
+                "profile": dict(profile),
+                "credentials": {"provider": {"type": "OKTA", "name": "OKTA"}},
+            }
+            self._changed_users[index] = record
+            self._created_logins[login.lower()] = index
+            self._user_count = index + 1
+        return self.user(index)
+
+    def set_status(self, index, status):
+        """Changes the status of the user at a position."""
+
+        with self._lock:
+            record = self.user(index)
+            now = _timestamp(time.time())
+            record["status"] = status
+            record["statusChanged"] = now
+            record["lastUpdated"] = now
+            if status == "ACTIVE" and not record.get("activated"):
+                record["activated"] = now
+            self._changed_users[index] = record
+
+    def delete_user(self, index):
+        with self._lock:
+            record = self.user(index)
+            self._deleted_users.add(index)
+            self._changed_users.pop(index, None)
+            if record and self._created_logins.get(record["profile"]["login"].lower()) == index:
+                del self._created_logins[record["profile"]["login"].lower()]
+
+    # Groups
+
+    def _seeded_group(self, index):
+        created = _timestamp(_EPOCH + index * 60)
+        return {
+            "id": GROUP_ID.format(index),
+            "created": created,
+            "lastUpdated": created,
+            "lastMembershipUpdated": created,
+            "objectClass": ["okta:user_group"],
+            "type": "OKTA_GROUP",
+            "profile": {"name": f"Group {index}", "description": f"Synthetic group {index}"},
+        }
+
+    @property
+    def group_count(self):
+        """Number of group positions, deleted groups included."""
+        return self._group_count
+
+    def group(self, index):
+        """Returns the group JSON object at a position, or None when it does not exist."""
+
+        if index < 0 or index >= self._group_count or index in self._deleted_groups:
+            return None
+        record = self._changed_groups.get(index)
+        if record is not None:
+            return json.loads(json.dumps(record))
+        return self._seeded_group(index)
+
+    def find_group(self, key):
+        """Returns the position of the group with the supplied id, or None."""
+
+        index = _position(key, "00g")
+        return index if index is not None and self.group(index) is not None else None
+
+    def create_group(self, profile):
+        """Adds a group and returns it.
+
+        Raises ConfigurationException when the name is missing or already taken.
+        """
+
+        name = (profile or {}).get("name")
+        if not name:
+            raise ConfigurationException("name: The field cannot be left blank")
+        with self._lock:
+            if any(self.group(index) and self.group(index)["profile"]["name"].lower() == name.lower()
+                   for index in range(self._group_count)):
+                raise ConfigurationException("name: An object with this field already exists in the current organization")
+            index = self._group_count
+            now = _timestamp(time.time())
+            record = dict(self._seeded_group(index), created=now, lastUpdated=now, lastMembershipUpdated=now,
+                          profile={"name": name, "description": profile.get("description")})
+            self._changed_groups[index] = record
+            self._group_count = index + 1
+        return self.group(index)
+
+    def delete_group(self, index):
+        with self._lock:
+            self._deleted_groups.add(index)
+            self._changed_groups.pop(index, None)
+            self._added.pop(index, None)
+            self._removed.pop(index, None)
+
+    # Memberships
+
+    def _seeded_member(self, group, user):
+        return group < self.groups and user < self.users and user % self.groups == group
+
+    def is_member(self, group, user):
+        if user in self._deleted_users:
+            return False
+        if self._seeded_member(group, user):
+            return user not in self._removed.get(group, ())
+        return user in self._added.get(group, ())
+
+    def add_member(self, group, user):
+        with self._lock:
+            if self._seeded_member(group, user):
+                self._removed.get(group, set()).discard(user)
+            else:
+                self._added.setdefault(group, set()).add(user)
+
+    def remove_member(self, group, user):
+        with self._lock:
+            if self._seeded_member(group, user):
+                self._removed.setdefault(group, set()).add(user)
+            else:
+                self._added.get(group, set()).discard(user)
+
+    def members(self, group, start=0):
+        """Yields the positions of the members of a group, from position `start` on."""
+
+        seeded = range(0)
+        if group < self.groups:
+            first = start + (group - start) % self.groups
+            seeded = range(first, self.users, self.groups)
+        with self._lock:
+            added = sorted(user for user in self._added.get(group, ()) if user >= start)
+            removed = set(self._removed.get(group, ()))
+        for user in heapq.merge(seeded, added):
+            if user not in removed and user not in self._deleted_users:
+                yield user
+
+
+class Emulator(object):
+    """Okta users and groups API emulator.
+
+    Requests can be served over HTTP, once `start` is called, or in-process through
+    `handle`. Both paths apply the same latency, fault injection and rate limits.
+
+    Attributes
+    ----------
+    dataset : object
+        Served data. Instance of Dataset.
+    url : str
+        Base URL of the emulated org, once started. Example - http://127.0.0.1:8765
+    token : str
+        API token expected in the `Authorization: SSWS` header. None accepts any request.
+    calls : Counter
+        Number of requests served per rate limit bucket, such as `GET /api/v1/users`.
+
+    Methods
+    -------
+    start()
+        Serves the API on the local port in a background thread.
+
+    stop()
+        Stops serving.
+
+    handle(method, target, body=None, headers=None)
+        Serves one request in-process.
+
+    okta(**options)
+        Returns an Okta client of the emulated org.
+    """
+
+    def __init__(self, dataset=None, host="127.0.0.1", port=0, token=None, latency=0, jitter=0, rate_limit=None,
+                 rate_window=60, error_rate=0, throttle_rate=0, page_size=200, max_page_size=200, seed=0):
+        """
+        Instantiates an emulator.
+
+        Parameters
+        ----------
+        dataset : object, optional
+            Served data. Instance of Dataset (default is None, 1000 users in 20 groups).
+        host : str
+            Interface to listen on (default is 127.0.0.1).
+        port : int
+            Port to listen on (default is 0, any free port).
+        token : str, optional
+            API token to require (default is None, any token).
+        latency : float
+            Seconds added to every request (default is 0).
+        jitter : float
+            Upper bound of a random number of seconds added to the latency (default is 0).
+        rate_limit : int, optional
+            Requests allowed per rate limit bucket and window. Enables the `X-Rate-Limit-*`
+            headers and 429 responses (default is None, unlimited).
+        rate_window : float
+            Seconds of a rate limit window (default is 60).
+        error_rate : float
+            Fraction of requests failing with a 500 response (default is 0).
+        throttle_rate : float
+            Fraction of requests failing with a 429 response regardless of the rate limit (default is 0).
+        page_size : int
+            Users listed per page when the request has no `limit` (default is 200).
+        max_page_size : int
+            Upper bound of the `limit` of users listings (default is 200, as Okta).
+        seed : int
+            Seed of the latency jitter and fault injection (default is 0).
+        """
+
+        self.dataset = dataset if dataset is not None else Dataset()
+        self.host = host
+        self.port = port
+        self.token = token
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.url = None
+        self.calls = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._windows = {}
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """Serves the API on the local port in a background thread and returns the emulator."""
+
+        emulator = self
+
+        class Handler(_Handler):
+            pass
+
+        Handler.emulator = emulator
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self.url = f"http://{self.host}:{self.port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, name="okta-emulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops serving."""
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def serve_forever(self):
+        """Serves the API on the local port until interrupted."""
+
+        if self._server is None:
+            self.start()
+        try:
+            self._thread.join()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def okta(self, **options):
+        """Returns an Okta client of the emulated org.
+
+        Parameters
+        ----------
+        options : dict
+            Client options passed through to oktapy.okta.Okta, such as `cache` or `pool_maxsize`.
+        """
+
+        from oktapy.okta import Okta
+
+        if self.url is None:
+            raise ConfigurationException("The emulator is not started")
+        return Okta(self.url, token=self.token or "emulator", **options)
+
+    # Request handling
+
+    def handle(self, method, target, body=None, headers=None):
+        """Serves one request and returns its status, headers and JSON body.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method.
+        target : str
+            Path and query string. Example - /api/v1/users?limit=10
+        body : bytes, optional
+            Request body (default is None).
+        headers : dict, optional
+            Request headers (default is None).
+        """
+
+        headers = headers or {}
+        method = method.upper()
+        url = urlsplit(target)
+        key = bucket_key(method, url.path)
+        with self._lock:
+            self.calls[key] += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            fault = self._random.random()
+        if delay > 0:
+            time.sleep(delay)
+
+        response_headers, exceeded = self._rate_limit(key)
+        if exceeded or fault < self.throttle_rate:
+            return self._error(429, "E0000047", "API call exceeded rate limit due to too many requests.", response_headers)
+        if fault < self.throttle_rate + self.error_rate:
+            return self._error(500, "E0000009", "Internal Server Error", response_headers)
+        if self.token is not None and headers.get("Authorization") != f"SSWS {self.token}":
+            return self._error(401, "E0000011", "Invalid token provided", response_headers)
+
+        base = f"http://{headers['Host']}" if headers.get("Host") else (self.url or "http://localhost")
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return self._error(400, "E0000003", "The request body was not well-formed.", response_headers)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        segments = [segment for segment in url.path.split("/") if segment][3:]
+        if url.path.startswith("/api/v1/users"):
+            status, result, link = self._users(method, segments, params, payload, base)
+        elif url.path.startswith("/api/v1/groups"):
+            status, result, link = self._groups(method, segments, params, payload, base)
+        else:
+            status, result, link = _not_found()
+        if link:
+            response_headers["Link"] = link
+        return status, response_headers, result
+
+    def _rate_limit(self, key):
+        """Counts a request in its rate limit window and returns the rate limit headers, and whether the limit is exceeded."""
+
+        if not self.rate_limit:
+            return {}, False
+        with self._lock:
+            now = time.time()
+            window = self._windows.get(key)
+            if window is None or now >= window[0]:
+                window = self._windows[key] = [now + self.rate_window, 0]
+            window[1] += 1
+            remaining = self.rate_limit - window[1]
+        return {"X-Rate-Limit-Limit": str(self.rate_limit), "X-Rate-Limit-Remaining": str(max(remaining, 0)),
+                "X-Rate-Limit-Reset": str(math.ceil(window[0]))}, remaining < 0
+
+    @staticmethod
+    def _error(status, code, summary, headers, causes=None):
+        return status, headers, {"errorCode": code, "errorSummary": summary, "errorLink": code,
+                                 "errorId": "emulator", "errorCauses": [{"errorSummary": cause} for cause in causes or []]}
+
+    def _page(self, path, params, positions, render, limit, base):
+        """Returns the records of the next page and its `Link` header."""
+
+        records = []
+        last = None
+        for position in positions:
+            record = render(position)
+            if record is None:
+                continue
+            if len(records) == limit:
+                query = dict(params, limit=limit, after=last["id"])
+                return records, (f'<{base}{path}?{urlencode(dict(params, limit=limit))}>; rel="self", '
+                                 f'<{base}{path}?{urlencode(query)}>; rel="next"')
+            records.append(record)
+            last = record
+        return records, f'<{base}{path}?{urlencode(dict(params, limit=limit))}>; rel="self"'
+
+    @staticmethod
+    def _limit(params, default, maximum):
+        try:
+            return max(1, min(int(params.get("limit", default)), maximum))
+        except ValueError:
+            return default
+
+    def _users(self, method, segments, params, payload, base):
+        dataset = self.dataset
+        if not segments:
+            if method == "GET":
+                return self._list_users(params, base)
+            if method == "POST":
+                activate = params.get("activate", "true").lower() != "false"
+                credentials = payload.get("credentials") or {}
+                status = ("ACTIVE" if credentials.get("password") else "PROVISIONED") if activate else "STAGED"
+                try:
+                    return 200, self._render_user(dataset.create_user(payload.get("profile"), credentials, status), base), None
+                except ConfigurationException as err:
+                    return _invalid(err.message)
+            return _not_allowed()
+
+        index = 0 if segments[0] == "me" else dataset.find_user(segments[0])
+        if index is None or dataset.user(index) is None:
+            return _not_found(f"Not found: Resource not found: {segments[0]} (User)")
+        if len(segments) == 1:
+            if method == "GET":
+                return 200, self._render_user(dataset.user(index), base), None
+            if method == "DELETE":
+                # Like Okta, deleting a user that is not deprovisioned deactivates it
+                if dataset.user(index)["status"] == "DEPROVISIONED":
+                    dataset.delete_user(index)
+                else:
+                    dataset.set_status(index, "DEPROVISIONED")
+                return 204, None, None
+            return _not_allowed()
+        if len(segments) == 3 and segments[1] == "lifecycle" and method == "POST" and segments[2] in _TRANSITIONS:
+            allowed, status = _TRANSITIONS[segments[2]]
+            if dataset.user(index)["status"] not in allowed:
+                return 403, {"errorCode": "E0000038", "errorSummary": "This operation is not allowed in the user's current status.",
+                             "errorLink": "E0000038", "errorId": "emulator", "errorCauses": []}, None
+            dataset.set_status(index, status)
+            return 200, {}, None
+        if len(segments) == 2 and segments[1] == "groups" and method == "GET":
+            groups = [self.dataset.group(group) for group in range(dataset.group_count) if dataset.is_member(group, index)]
+            return 200, [group for group in groups if group], None
+        return _not_found()
+
+    def _list_users(self, params, base):
+        dataset = self.dataset
+        if params.get("q"):
+            # Okta answers `q` with a single page
+            limit = self._limit(params, 10, self.max_page_size)
+            users = (dataset.user(index) for index in range(dataset.user_count))
+            found = islice((user for user in users if user and user["status"] != "DEPROVISIONED"
+                            and matches_query(user, params["q"])), limit)
+            return 200, [self._render_user(user, base) for user in found], None
+
+        expression = params.get("search") or params.get("filter")
+        try:
+            node = parse_expression(expression) if expression else None
+        except ConfigurationException as err:
+            return 400, {"errorCode": "E0000031", "errorSummary": "Invalid search criteria.", "errorLink": "E0000031",
+                         "errorId": "emulator", "errorCauses": [{"errorSummary": err.message}]}, None
+        # Like Okta, deprovisioned users are only listed by searches and status filters
+        deprovisioned = bool(params.get("search")) or (node is not None and references(node, "status"))
+
+        start = _start(params, "00u")
+        candidates = self._candidates(node) if node is not None else None
+        positions = range(start, dataset.user_count) if candidates is None else (i for i in candidates if i >= start)
+
+        def render(index):
+            user = dataset.user(index)
+            if user is None or (user["status"] == "DEPROVISIONED" and not deprovisioned):
+                return None
+            if node is not None and not evaluate(node, user):
+                return None
+            return self._render_user(user, base)
+
+        limit = self._limit(params, self.page_size, self.max_page_size)
+        records, link = self._page("/api/v1/users", {k: v for k, v in params.items() if k not in ("limit", "after")},
+                                   positions, render, limit, base)
+        return 200, records, link
+
+    def _candidates(self, node):
+        """Returns the sorted positions of the users an expression can match, or None when a scan is needed.
+
+        Like the offline query planner, `eq` comparisons on id, login or email are looked up directly.
+        """
+
+        if node[0] == "and":
+            for child in node[1]:
+                candidates = self._candidates(child)
+                if candidates is not None:
+                    return candidates
+            return None
+        if node[0] == "or":
+            found = set()
+            for child in node[1]:
+                candidates = self._candidates(child)
+                if candidates is None:
+                    return None
+                found.update(candidates)
+            return sorted(found)
+        _, attribute, op, value = node
+        if op != "eq" or not isinstance(value, str) or attribute not in ("id", "profile.login", "profile.email"):
+            return None
+        index = self.dataset.find_user(value)
+        if index is None and attribute == "profile.email":
+            # Emails are only looked up when they equal the login
+            return None
+        return [] if index is None else [index]
+
+    def _groups(self, method, segments, params, payload, base):
+        dataset = self.dataset
+        if not segments:
+            if method == "GET":
+                return self._list_groups(params, base)
+            if method == "POST":
+                try:
+                    return 200, self._render_group(dataset.create_group(payload.get("profile")), base), None
+                except ConfigurationException as err:
+                    return _invalid(err.message)
+            return _not_allowed()
+
+        group = dataset.find_group(segments[0])
+        if group is None:
+            return _not_found(f"Not found: Resource not found: {segments[0]} (UserGroup)")
+        if len(segments) == 1:
+            if method == "GET":
+                return 200, self._render_group(dataset.group(group), base), None
+            if method == "DELETE":
+                dataset.delete_group(group)
+                return 204, None, None
+            return _not_allowed()
+        if segments[1] == "users" and len(segments) == 2 and method == "GET":
+            start = _start(params, "00u")
+            limit = self._limit(params, 1000, 10000)
+            records, link = self._page(f"/api/v1/groups/{segments[0]}/users",
+                                       {k: v for k, v in params.items() if k not in ("limit", "after")},
+                                       dataset.members(group, start),
+                                       lambda index: self._render_user(dataset.user(index), base), limit, base)
+            return 200, records, link
+        if segments[1] == "users" and len(segments) == 3 and method in ("PUT", "DELETE"):
+            user = dataset.find_user(segments[2])
+            if user is None:
+                return _not_found(f"Not found: Resource not found: {segments[2]} (User)")
+            if method == "PUT":
+                dataset.add_member(group, user)
+            else:
+                dataset.remove_member(group, user)
+            return 204, None, None
+        if segments[1] == "apps" and len(segments) == 2 and method == "GET":
+            return 200, [], None
+        return _not_found()
+
+    def _list_groups(self, params, base):
+        dataset = self.dataset
+        try:
+            node = parse_expression(params["filter"]) if params.get("filter") else None
+        except ConfigurationException as err:
+            return 400, {"errorCode": "E0000031", "errorSummary": "Invalid search criteria.", "errorLink": "E0000031",
+                         "errorId": "emulator", "errorCauses": [{"errorSummary": err.message}]}, None
+        query = (params.get("q") or "").lower()
+        start = _start(params, "00g")
+
+        def render(index):
+            group = dataset.group(index)
+            if group is None or not group["profile"]["name"].lower().startswith(query):
+                return None
+            if node is not None and not evaluate(node, group):
+                return None
+            return self._render_group(group, base)
+
+        limit = self._limit(params, 10000, 10000)
+        records, link = self._page("/api/v1/groups", {k: v for k, v in params.items() if k not in ("limit", "after")},
+                                   range(start, dataset.group_count), render, limit, base)
+        return 200, records, link
+
+    @staticmethod
+    def _render_user(user, base):
+        user["_links"] = {"self": {"href": f"{base}/api/v1/users/{user['id']}"}}
+        return user
+
+    @staticmethod
+    def _render_group(group, base):
+        group["_links"] = {"users": {"href": f"{base}/api/v1/groups/{group['id']}/users"}}
+        return group
+
+
+def _position(key, prefix):
+    """Returns the dataset position encoded in a user or group id, or None."""
+
+    if key.startswith(prefix) and len(key) == 20 and key[3:].isdigit():
+        return int(key[3:])
+    return None
+
+
+def _start(params, prefix):
+    """Returns the position a listing resumes from, after the record of its `after` cursor."""
+
+    after = _position(params.get("after") or "", prefix)
+    return 0 if after is None else after + 1
+
+
+def _not_found(summary="Not found: Resource not found"):
+    return 404, {"errorCode": "E0000007", "errorSummary": summary, "errorLink": "E0000007", "errorId": "emulator",
+                 "errorCauses": []}, None
+
+
+def _not_allowed():
+    return 405, {"errorCode": "E0000022", "errorSummary": "The endpoint does not support the provided HTTP method",
+                 "errorLink": "E0000022", "errorId": "emulator", "errorCauses": []}, None
+
+
+def _invalid(cause):
+    return 400, {"errorCode": "E0000001", "errorSummary": "Api validation failed", "errorLink": "E0000001",
+                 "errorId": "emulator", "errorCauses": [{"errorSummary": cause}]}, None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; do not let Nagle's algorithm hold the body back
+    disable_nagle_algorithm = True
+    emulator = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _serve(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        status, headers, result = self.emulator.handle(self.command, self.path, body, self.headers)
+        data = b"" if result is None else json.dumps(result).encode()
+        self.send_response(status)
+        if data:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _serve
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m oktapy.emulator", description="Serve an emulated Okta users and groups API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on, 0 for any free port")
+    parser.add_argument("--users", type=int, default=1000, help="Seeded users")
+    parser.add_argument("--groups", type=int, default=20, help="Seeded groups")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--domain", default="example.com", help="Domain of the seeded logins")
+    parser.add_argument("--token", help="API token to require")
+    parser.add_argument("--latency", type=float, default=0, help="Seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0, help="Upper bound of random seconds added to the latency")
+    parser.add_argument("--rate-limit", type=int, help="Requests per rate limit bucket and window")
+    parser.add_argument("--rate-window", type=float, default=60, help="Seconds of a rate limit window")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of requests failing with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0, help="Fraction of requests failing with 429")
+    args = parser.parse_args(argv)
+
+    emulator = Emulator(Dataset(args.users, args.groups, seed=args.seed, domain=args.domain), host=args.host, port=args.port,
+                        token=args.token, latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit,
+                        rate_window=args.rate_window, error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                        seed=args.seed)
+    emulator.start()
+    print(f"Serving {args.users} users and {args.groups} groups on {emulator.url}", flush=True)
+    emulator.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
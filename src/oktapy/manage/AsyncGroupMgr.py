@@ -0,0 +1,93 @@
+from oktapy.manage.GroupMgr import GroupMgr
+from oktapy.resources.group import Group
+from oktapy.resources.user import User
+from oktapy.core.pager import aiter_pages
+import json
+
+class AsyncGroupMgr(GroupMgr):
+    """Asynchronous counterpart of GroupMgr, bound to an AsyncOktaAPIToken client.
+
+    API calling methods are coroutines; `iter_groups` and `iter_users` are async generators.
+    """
+
+    async def list(self, query=None, filter=None, limit=20):
+        apiurl = self._base_url
+        if query or filter or limit:
+            apiurl += "?"
+            if query:
+                apiurl += f"q={query}&"
+            if filter:
+                apiurl += f"filter={filter}&"
+            if limit:
+                apiurl += f"limit={limit}&"
+            apiurl = apiurl.rstrip("&")
+        result, _ = await self._client.request(apiurl, self)
+        return [Group(data) for data in result]
+
+    async def iter_groups(self, query=None, filter=None, limit=200):
+        """Yield all groups matching the query or filter, following the pagination links. Use with `async for`."""
+        apiurl = f"{self._base_url}?limit={limit}"
+        if query:
+            apiurl += f"&q={query}"
+        if filter:
+            apiurl += f"&filter={filter}"
+        async for result in aiter_pages(self._client, self, apiurl):
+            for data in result:
+                yield Group(data)
+
+    async def create(self, data):
+        """Create a new group"""
+        if isinstance(data, dict):
+            data = json.dumps(data)
+        return await self._client.request(self._base_url, self, mode="post", data=data)
+
+    async def get(self, group_id):
+        """Get a group, from the local cache when available"""
+        result = self._cache.get("groups", group_id) if self._cache else None
+        if result is None:
+            result, _ = await self._client.request(f"{self._base_url}/{group_id}", self)
+            if self._cache:
+                self._cache.put("groups", {k: v for k, v in result.items() if k != "_links"})
+        return result
+
+    async def delete(self, group_id):
+        """Delete a group"""
+        if self._cache:
+            self._cache.invalidate("groups", group_id)
+        response = await self._client.request(f"{self._base_url}/{group_id}", self, mode="delete")
+        # DELETE returns 204 No Content on success
+        return response == 204 or response
+
+    async def list_users(self, group_id, limit=200):
+        """List users in a group"""
+        url = f"{self._base_url}/{group_id}/users"
+        if limit:
+            url += f"?limit={limit}"
+        result, next_url = await self._client.request(url, self)
+        return result
+
+    async def iter_users(self, group_id, limit=200, attr=None):
+        """Yield all users in a group, following the pagination links. Use with `async for`."""
+        url = f"{self._base_url}/{group_id}/users"
+        if limit:
+            url += f"?limit={limit}"
+        async for result in aiter_pages(self._client, self, url):
+            for data in result:
+                yield User(data, attr=attr)
+
+    async def add_user(self, group_id, user_id):
+        """Add a user to a group"""
+        url = f"{self._base_url}/{group_id}/users/{user_id}"
+        response = await self._client.request(url, self, mode="put")
+        return response is None or response == 204 or response
+
+    async def remove_user(self, group_id, user_id):
+        """Remove a user from a group"""
+        response = await self._client.request(f"{self._base_url}/{group_id}/users/{user_id}", self, mode="delete")
+        # DELETE returns 204 No Content on success
+        return response == 204 or response
+
+    async def list_apps(self, group_id, limit=20):
+        apiurl = f"{self._base_url}/{group_id}/apps?limit={limit}"
+        result, _ = await self._client.request(apiurl, self)
+        return result
@@ -0,0 +1,205 @@
+from oktapy.manage.UserMgr import UserMgr, pattern_keys, payload_key
+from oktapy.resources.user import User
+from oktapy.resources.userbatch import UserBatch
+from oktapy.core.bulk import AsyncBulkExecutor
+from oktapy.core.pager import aiter_pages
+from oktapy.core.decode import user_decoder
+import contextvars
+import json
+
+
+class AsyncUserMgr(UserMgr):
+    """Asynchronous Okta user manager class.
+
+    The asyncio counterpart of UserMgr, bound to an AsyncOktaAPIToken client. API calling
+    methods are coroutines and `iterUsers` is an async generator. Bulk methods keep up to
+    `concurrency` calls in flight on the event loop instead of in a thread pool. Local
+    helpers such as `deep_search`, `cacheUsers` and `getCachedUsers` are inherited as is.
+    The snapshot, export and target resolution methods of UserMgr are synchronous only.
+
+    Methods
+    -------
+    createUser(payload, activate=False)
+        Creates a user
+
+    createUsers(inputs, concurrency=1, journal=None)
+        Creates users, awaiting up to `concurrency` API calls at a time
+
+    deactivateUser(id)
+        Deactivates an active or suspended user
+
+    deactivateUsers(ids, concurrency=1, journal=None)
+        Deactivates users, awaiting up to `concurrency` API calls at a time
+
+    deleteUser(id)
+        Deletes a deactivated user
+
+    deleteUsers(ids, concurrency=1, journal=None)
+        Deletes deactivated users, awaiting up to `concurrency` API calls at a time
+
+    purgeUsers(users, concurrency=1, journal=None)
+        Deactivates, if needed, and deletes users, each user flowing from one step to the next
+
+    getCurrentUser()
+        Returns the current user
+
+    getUser(idOrLogin)
+        Get the user with supplied `ID` or `login`, from the local cache when available
+
+    getUsers()
+        Returns all users
+
+    iterUsers()
+        Yields all users page by page, with `async for`
+    """
+
+    async def createUser(self, payload, activate=False):
+        apiurl = self._url + "?activate=" + str(activate).lower()
+        return await self._client.request(apiurl, self, mode="post", data=payload)
+
+    async def createUsers(self, inputs=[], activate=False, concurrency=1, journal=None):
+        executor = AsyncBulkExecutor(concurrency=concurrency, retry_counter=self._retry_counter())
+        return await executor.run(inputs,
+                                  lambda userdata: self.createUser(json.dumps(userdata), activate=activate),
+                                  on_success=lambda userdata, response: response["profile"]["login"],
+                                  journal=journal, stage="create", key=payload_key)
+
+    async def deactivateUser(self, id, notify=False):
+        apiurl = self._url + "/" + id + \
+            "/lifecycle/deactivate?sendEmail=" + str(notify).lower()
+        if self._cache:
+            self._cache.invalidate("users", id)
+        return await self._client.request(apiurl, self, mode="post")
+
+    async def deactivateUsers(self, ids, notify=False, concurrency=1, journal=None):
+        executor = AsyncBulkExecutor(concurrency=concurrency, retry_counter=self._retry_counter())
+        return await executor.run(ids, lambda rid: self.deactivateUser(rid, notify=notify), journal=journal, stage="deactivate")
+
+    async def deleteUser(self, id, notify=False):
+        apiurl = self._url + "/" + id + "?sendEmail=" + str(notify).lower()
+        if self._cache:
+            self._cache.invalidate("users", id)
+        return await self._client.request(apiurl, self, mode="delete")
+
+    async def deleteUsers(self, ids, notify=False, concurrency=1, journal=None):
+        executor = AsyncBulkExecutor(concurrency=concurrency, retry_counter=self._retry_counter())
+        return await executor.run(ids, lambda rid: self.deleteUser(rid, notify=notify), journal=journal, stage="delete")
+
+    async def purgeUsers(self, users, notify=False, concurrency=1, journal=None):
+        """Deletes users, deactivating first the ones that are not deprovisioned. See UserMgr.purgeUsers."""
+
+        counter = self._retry_counter()
+        # Retries of both calls of the user, read back by the executor from the same task
+        retries = contextvars.ContextVar("purge_retries", default=0)
+
+        async def purge(user):
+            retries.set(0)
+            if user["status"] != "DEPROVISIONED":
+                try:
+                    await self.deactivateUser(user["id"], notify=False)
+                finally:
+                    retries.set(retries.get() + (counter() if counter else 0))
+            try:
+                return await self.deleteUser(user["id"], notify=notify)
+            finally:
+                retries.set(retries.get() + (counter() if counter else 0))
+
+        executor = AsyncBulkExecutor(concurrency=concurrency, retry_counter=retries.get)
+        return await executor.run(users, purge, on_success=lambda user, response: user["id"],
+                                  journal=journal, stage="delete", key=lambda user: user["id"])
+
+    async def getCurrentUser(self, attr=None):
+        """Returns the current user, the owner of the API token."""
+
+        result, link = await self._client.request(self._url + '/me', self)
+        return User(result, links=False, attr=attr)
+
+    async def getUser(self, idOrLogin, attr=None):
+        """Get the user with supplied `ID` or `login`.
+
+        Parameters
+        ----------
+        idOrLogin : str
+            Either the internal Okta user ID or login attribute value
+        """
+        result = self._cache.get("users", idOrLogin) if self._cache else None
+        if result is None:
+            result, link = await self._client.request(self._url + "/" + idOrLogin, self)
+            self.cacheUsers([result])
+        return User(result, attr=attr)
+
+    async def _pages(self, query=None, filter=None, search=None, limit=200, threshold=0, decoder=None):
+        """Asynchronously yields the raw user JSON objects of a list or search page by page, up to `threshold` users."""
+
+        apiurl = self._url
+        paginate = True
+
+        if (query is not None) and (len(query.strip()) > 0):
+            if threshold > 0:
+                apiurl = apiurl + "?limit=" + str(threshold) + "&q=" + query
+            else:
+                apiurl = apiurl + "?q=" + query
+            paginate = False
+        elif (filter is not None) and (len(filter.strip()) > 0):
+            apiurl = apiurl + "?limit=" + str(limit) + "&filter=" + filter
+        elif (search is not None) and (len(search.strip()) > 0):
+            apiurl = apiurl + "?limit=" + str(limit) + "&search=" + search
+        else:
+            apiurl = apiurl + "?limit=" + str(limit)
+
+        remaining = threshold
+        pages = aiter_pages(self._client, self, apiurl, follow=paginate, decoder=decoder)
+        try:
+            async for result in pages:
+                if threshold > 0:
+                    result = result[:remaining]
+                    remaining = remaining - len(result)
+                yield result
+                if threshold > 0 and remaining <= 0:
+                    break
+        finally:
+            await pages.aclose()
+
+    async def iterUsers(self, query=None, filter=None, search=None, attr=None, limit=200, threshold=0, deepSearch={},
+                        regex=True, case=True, lean=False):
+        """Yields users page by page, following the `next` link of each page. Use with `async for`.
+
+        Takes the same criteria as UserMgr.iterUsers, except `prefetch`: other tasks keep
+        running on the event loop while a page is awaited.
+        """
+
+        pages = self._pages(query=query, filter=filter, search=search, limit=limit, threshold=threshold,
+                            decoder=user_decoder(attr) if lean else None)
+        keys = pattern_keys(deepSearch, attr)
+        try:
+            async for result in pages:
+                user_list = [User(d, links=True) if lean else User(d, attr=attr) for d in result]
+                if deepSearch:
+                    user_list = self.deep_search(user_list, deepSearch, regex=regex, case=case, keys=keys)
+                for user in user_list:
+                    yield user
+        finally:
+            await pages.aclose()
+
+    async def getUsers(self, query=None, filter=None, search=None, attr=None, limit=200, threshold=0, deepSearch={},
+                       regex=True, case=True, bulk=False, lean=False):
+        """Returns all users matching the criteria.
+
+        Takes the same criteria as UserMgr.getUsers, except `prefetch`.
+        """
+
+        if bulk:
+            user_list = UserBatch(attr=None if lean else attr)
+            pages = self._pages(query=query, filter=filter, search=search, limit=limit, threshold=threshold,
+                                decoder=user_decoder(attr) if lean else None)
+            try:
+                async for result in pages:
+                    user_list.extend(result)
+            finally:
+                await pages.aclose()
+        else:
+            user_list = [user async for user in self.iterUsers(query=query, filter=filter, search=search, attr=attr,
+                                                                limit=limit, threshold=threshold, lean=lean)]
+        if deepSearch:
+            user_list = self.deep_search(user_list, deepSearch, regex=regex, case=case)
+        return user_list
@@ -1,14 +1,19 @@
 from oktapy.resources.group import Group
-import pandas as pd
+from oktapy.resources.user import User
+from oktapy.core.bulk import BulkExecutor
+from oktapy.core.pager import iter_pages
+from oktapy.manage.UserMgr import UserMgr
 import json
 
 class GroupMgr:
-    def __init__(self, client):
+    def __init__(self, client, cache=None):
         self._client = client
+        self._cache = cache
         self._base_url = "/api/v1/groups"
 
     @staticmethod
     def to_frame(group_list):
+        import pandas as pd
         data = pd.DataFrame([group.to_dict() for group in group_list])
         data.fillna('', inplace=True)
         data.sort_index(axis=1, inplace=True)
@@ -28,6 +33,24 @@ class GroupMgr:
         result, _ = self._client.request(apiurl, self)
         return [Group(data) for data in result]
 
+    def iter_groups(self, query=None, filter=None, limit=200, prefetch=0):
+        """Yield all groups matching the query or filter, following the pagination links.
+
+        With `prefetch` above zero, the next pages are fetched in the background
+        while the current page is processed.
+        """
+        apiurl = f"{self._base_url}?limit={limit}"
+        if query:
+            apiurl += f"&q={query}"
+        if filter:
+            apiurl += f"&filter={filter}"
+        pages = iter_pages(self._client, self, apiurl, prefetch=prefetch)
+        try:
+            for result in pages:
+                yield from [Group(data) for data in result]
+        finally:
+            pages.close()
+
     def create(self, data):
         """Create a new group"""
         # Ensure data is properly formatted as JSON
@@ -41,11 +64,18 @@ class GroupMgr:
         return response
 
     def get(self, group_id):
-        result, _ = self._client.request(f"{self._base_url}/{group_id}", self)
+        """Get a group, from the local cache when available"""
+        result = self._cache.get("groups", group_id) if self._cache else None
+        if result is None:
+            result, _ = self._client.request(f"{self._base_url}/{group_id}", self)
+            if self._cache:
+                self._cache.put("groups", {k: v for k, v in result.items() if k != "_links"})
         return result
 
     def delete(self, group_id):
         """Delete a group"""
+        if self._cache:
+            self._cache.invalidate("groups", group_id)
         response = self._client.request(f"{self._base_url}/{group_id}", self, mode="delete")
         # DELETE returns 204 No Content on success
         if isinstance(response, int) and response == 204:
@@ -61,6 +91,22 @@ class GroupMgr:
         result, next_url = self._client.request(url, self)
         return result
 
+    def iter_users(self, group_id, limit=200, attr=None, prefetch=0):
+        """Yield all users in a group, following the pagination links.
+
+        With `prefetch` above zero, the next pages are fetched in the background
+        while the current page is processed.
+        """
+        url = f"{self._base_url}/{group_id}/users"
+        if limit:
+            url += f"?limit={limit}"
+        pages = iter_pages(self._client, self, url, prefetch=prefetch)
+        try:
+            for result in pages:
+                yield from [User(data, attr=attr) for data in result]
+        finally:
+            pages.close()
+
     def add_user(self, group_id, user_id):
         """Add a user to a group"""
         url = f"{self._base_url}/{group_id}/users/{user_id}"
@@ -81,6 +127,41 @@ class GroupMgr:
         result, _ = response
         return result
 
+    def add_users(self, group_id, users, field="id", concurrency=1, journal=None):
+        """Add many users to a group, running up to `concurrency` API calls in parallel.
+
+        Users given by another attribute than `id` are first resolved to ids in batched
+        searches. Returns the bulk report of UserMgr.deactivateUsers, with the added user ids
+        as success and the ids that failed, or the values no user matched, as failure.
+        Users a resumed job journal records as added are skipped.
+        """
+        return self._update_members(group_id, users, field, self.add_user, "add", concurrency, journal)
+
+    def remove_users(self, group_id, users, field="id", concurrency=1, journal=None):
+        """Remove many users from a group, running up to `concurrency` API calls in parallel.
+
+        Takes the same arguments and returns the same report as `add_users`.
+        """
+        return self._update_members(group_id, users, field, self.remove_user, "remove", concurrency, journal)
+
+    def _update_members(self, group_id, users, field, operation, stage, concurrency, journal):
+        import pandas as pd
+
+        unresolved = []
+        if field == "id":
+            ids = list(dict.fromkeys(str(value).strip() for value in users
+                                     if value is not None and not pd.isna(value) and str(value).strip()))
+        else:
+            resolved, unresolved = UserMgr(self._client, cache=self._cache).resolveUsers(users, field=field,
+                                                                                      concurrency=concurrency)
+            ids = [user["id"] for user in resolved]
+
+        executor = BulkExecutor(concurrency=concurrency, retry_counter=getattr(self._client, "last_retries", None))
+        result = executor.run(ids, lambda user_id: operation(group_id, user_id), journal=journal, stage=stage)
+        result["failure"] = result["failure"] + unresolved
+        result["errors"] = result["errors"] + [f"No user found with {field} {value}" for value in unresolved]
+        return result
+
     def list_apps(self, group_id, limit=20):
         apiurl = f"{self._base_url}/{group_id}/apps?limit={limit}"
         result, _ = self._client.request(apiurl, self)
@@ -9,9 +9,11 @@ class OktaResourceBase(object):
     ----------
     _client : object
         Associated Okta client object. Instance of OktaAPIToken class.
+    _cache : object
+        Local resource cache. Instance of oktapy.core.cache.ResourceCache, or None.
     """
 
-    def __init__(self, client):
+    def __init__(self, client, cache=None):
         """
         Instantiates an Okta resource manager object.
 
@@ -19,5 +21,8 @@ class OktaResourceBase(object):
         ----------
         client : object
             Okta client object to associate. Instance of OktaAPIToken class.
+        cache : object, optional
+            Local resource cache to consult before calling the API (default is None).
         """
-        self._client = client 
\ No newline at end of file
+        self._client = client
+        self._cache = cache 
\ No newline at end of file
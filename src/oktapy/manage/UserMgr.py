@@ -1,90 +1,269 @@
 from oktapy.manage.OktaResourceBase import OktaResourceBase
 from oktapy.resources.user import User
-from oktapy.exceptions import ServiceException
-import pandas as pd
+from oktapy.resources.userbatch import UserBatch
+from oktapy.core.bulk import BulkExecutor
+from oktapy.core.pager import iter_pages, merge_pages
+from oktapy.core.query import OfflineQuery, attribute_value
+from oktapy.core.decode import user_decoder
+import itertools
 import json
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote
+
+ALL_STATUS = ["STAGED", "PROVISIONED", "ACTIVE", "RECOVERY", "LOCKED_OUT", "PASSWORD_EXPIRED", "SUSPENDED", "DEPROVISIONED"]
+
+# Number of CSV rows read at a time by `iter_users_from_csv`
+CSV_CHUNK = 10000
+
+# Number of users matched per chunk by `deep_search`
+DEEP_SEARCH_CHUNK = 50000
+
+# Leading login characters used to split the login keyspace into ranges
+LOGIN_KEYSPACE = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+# Maximum URL encoded length of one target resolution search expression
+RESOLVE_QUERY_LENGTH = 4000
+
+# Maximum number of values looked up by one target resolution search expression
+RESOLVE_QUERY_TERMS = 100
+
+# Seconds the high-water mark of `syncUsers` is set back from the org time the synchronization started at
+SYNC_MARGIN = 60
 
 
 def to_frame(user_list):
+    if isinstance(user_list, UserBatch):
+        return user_list.to_frame()
+    import pandas as pd
+
     data = pd.DataFrame([user.to_dict() for user in user_list])
     data.fillna('', inplace=True)
     data.sort_index(axis=1, inplace=True)
     return data
 
 
-def to_users_json_from_csv(file, options={}):
-    list_of_users = []
-    df = pd.read_csv(file, index_col=False)
-    df = df.drop(["id", "status"], axis=1, errors='ignore')
-    fallThrough = True
+def pattern_keys(deepSearch, attr=None):
+    """Returns the attributes of a `deepSearch` mapping whose patterns apply to a listing.
+
+    Patterns on attributes that `attr` drops from the users are ignored, as `deep_search`
+    ignores patterns on attributes none of its users have. Listings filtered page by page
+    pass the result to every `deep_search` call, so that a page where nobody has an
+    attribute is rejected rather than let through unfiltered.
+
+    Parameters
+    ----------
+    deepSearch : dict
+        Attribute to pattern mapping.
+    attr : str, optional
+        Comma separated subset of profile attributes kept (default is None, all attributes).
+    """
+
+    if attr is None:
+        return list(deepSearch)
+    kept = set(attr.split(",")) | {"id", "status", "login"}
+    return [key for key in deepSearch if key in kept]
+
+
+def shard_expressions(shards, search=None):
+    """Split the user population into disjoint search expressions.
+
+    The login keyspace is split into `profile.login` ranges. When at least as many shards as
+    user statuses are requested, every range is further split by status. Together the
+    expressions cover every user, in every status, exactly once.
+
+    Parameters
+    ----------
+    shards : int
+        Requested number of shards. The returned list can be slightly shorter.
+    search : str, optional
+        Search expression every shard is restricted to.
+    """
+
+    shards = max(1, shards)
+    if shards >= len(ALL_STATUS):
+        status_groups = [[status] for status in ALL_STATUS]
+    else:
+        status_groups = [ALL_STATUS]
+    ranges = max(1, min(len(LOGIN_KEYSPACE), shards // len(status_groups)))
+
+    boundaries = [LOGIN_KEYSPACE[(i * len(LOGIN_KEYSPACE)) // ranges] for i in range(1, ranges)]
+    login_ranges = []
+    lower = None
+    for upper in boundaries + [None]:
+        bounds = []
+        if lower:
+            bounds.append(f"profile.login ge \"{lower}\"")
+        if upper:
+            bounds.append(f"profile.login lt \"{upper}\"")
+        login_ranges.append(" and ".join(bounds))
+        lower = upper
+
+    expressions = []
+    for statuses in status_groups:
+        status_filter = "(" + " or ".join([f"status eq \"{status}\"" for status in statuses]) + ")"
+        for login_range in login_ranges:
+            criteria = [f"({search})"] if search else []
+            criteria.append(status_filter)
+            if login_range:
+                criteria.append(f"({login_range})")
+            expressions.append(" and ".join(criteria))
+    return expressions
+
+
+def search_attribute(field):
+    """Returns the attribute path searched for a user field: `id`, `status` and `type.id` as is, others in `profile`."""
+
+    return field if field in ["id", "status", "type.id"] else f"profile.{field}"
+
+
+def resolve_expressions(values, field="login", status_list=None, prefix=False,
+                        max_length=RESOLVE_QUERY_LENGTH, max_terms=RESOLVE_QUERY_TERMS):
+    """Split a lookup of many attribute values into search expressions of bounded size.
+
+    Values are packed greedily into `or` expressions, each at most `max_terms` values
+    and `max_length` characters once URL encoded, status restriction included, so that
+    every expression fits in a request URL. Together the expressions cover every value
+    exactly once.
+
+    Parameters
+    ----------
+    values : list
+        Distinct attribute values to look up.
+    field : str
+        Attribute the values belong to. Example - login
+    status_list : list, optional
+        Statuses the users are restricted to (default is None, any status).
+    prefix : bool
+        Match values as prefixes (`sw`) instead of exactly (`eq`) (default is False).
+    """
+
+    attribute = search_attribute(field)
+    op = "sw" if prefix else "eq"
+    suffix = ""
+    if status_list:
+        suffix = " and (" + " or ".join([f"status eq \"{status}\"" for status in status_list]) + ")"
+    overhead = len(quote("()" + suffix, safe=""))
+    separator = len(quote(" or ", safe=""))
+
+    expressions = []
+    terms = []
+    length = overhead
+    for value in values:
+        value = value.replace("\\", "\\\\").replace("\"", "\\\"")
+        term = f"{attribute} {op} \"{value}\""
+        term_length = len(quote(term, safe=""))
+        if terms and (len(terms) >= max_terms or length + separator + term_length > max_length):
+            expressions.append("(" + " or ".join(terms) + ")" + suffix)
+            terms = []
+            length = overhead
+        length = length + (separator if terms else 0) + term_length
+        terms.append(term)
+    if terms:
+        expressions.append("(" + " or ".join(terms) + ")" + suffix)
+    return expressions
+
+
+def payload_key(userdata):
+    """Returns the journal key of a user creation payload: its login, or the payload as JSON when it has none.
+
+    Parameters
+    ----------
+    userdata : dict
+        User creation payload.
+    """
+
+    login = (userdata.get("profile") or {}).get("login") if isinstance(userdata, dict) else None
+    return login if login else json.dumps(userdata, sort_keys=True, default=str)
+
+
+def _csv_payload_builder(columns, options={}):
+    """Returns the function turning a CSV record into a user payload, as selected by the password options."""
+
     selectors = list({"default-password", "no-password", "import-password",
                       "hashed-password"}.intersection((list(options.keys()))))
     if selectors:
         if "default-password" in selectors:
-            df = df.drop(["password"], axis=1, errors='ignore')
-            records = json.loads(df.to_json(orient="records"))
-            list_of_users = list(map(lambda x: {"profile": x, "credentials": {
-                "password": {"value": options["default-password"]}}}, records))
-            fallThrough = False
+            return ["password"], lambda x: {"profile": x, "credentials": {
+                "password": {"value": options["default-password"]}}}
         elif options.get("no-password", False):
-            df = df.drop(["password"], axis=1, errors='ignore')
-            records = json.loads(df.to_json(orient="records"))
-            list_of_users = list(
-                map(lambda x: {"profile": x}, records))
-            fallThrough = False
+            return ["password"], lambda x: {"profile": x}
         elif options.get("import-password", False):
-            df = df.drop(["password"], axis=1, errors='ignore')
-            records = json.loads(df.to_json(orient="records"))
-            list_of_users = list(map(lambda x: {"profile": x, "credentials": {
-                "password": {"hook": {"type": "default"}}}}, records))
-            fallThrough = False
-        elif (options.get("hashed-password", False) and ("password" in df.columns)):
-            records = json.loads(df.to_json(orient="records"))
+            return ["password"], lambda x: {"profile": x, "credentials": {
+                "password": {"hook": {"type": "default"}}}}
+        elif (options.get("hashed-password", False) and ("password" in columns)):
             algorithm = options.get("hash-algorithm", "SHA-1")
             isSalted = options.get("hash-salt", False)
             saltOrder = options.get("hash-salt-order", "POSTFIX")
             if isSalted:
-                list_of_users = list(map(lambda x: {"profile": x,
-                                                    "credentials": {
-                                                        "password": {
-                                                            "hash": {
-                                                                "algorithm": algorithm,
-                                                                "workFactor": 10,
-                                                                "salt": x.pop("salt"),
-                                                                "saltOrder": saltOrder,
-                                                                "value": x.pop("password")
-                                                            }
-                                                        }
-                                                    }
-                                                    },
-                                         records))
+                return [], lambda x: {"profile": x,
+                                      "credentials": {
+                                          "password": {
+                                              "hash": {
+                                                  "algorithm": algorithm,
+                                                  "workFactor": 10,
+                                                  "salt": x.pop("salt"),
+                                                  "saltOrder": saltOrder,
+                                                  "value": x.pop("password")
+                                              }
+                                          }
+                                      }
+                                      }
             else:
-                list_of_users = list(map(lambda x: {"profile": x,
-                                                    "credentials": {
-                                                        "password": {
-                                                            "hash": {
-                                                                "algorithm": algorithm,
-                                                                "workFactor": 10,
-                                                                "value": x.pop("password")
-                                                            }
-                                                        }
-                                                    }
-                                                    },
-                                         records))
-
-            fallThrough = False
-        else:
-            fallThrough = True
-    if fallThrough:
-        if "password" in df.columns:
-            records = json.loads(df.to_json(orient="records"))
-            list_of_users = list(map(lambda x: {"profile": x, "credentials": {
-                "password": {"value": x.pop("password")}}}, records))
-        else:
-            records = json.loads(df.to_json(orient="records"))
-            list_of_users = list(
-                map(lambda x: {"profile": x}, records))
-    return list_of_users
+                return [], lambda x: {"profile": x,
+                                      "credentials": {
+                                          "password": {
+                                              "hash": {
+                                                  "algorithm": algorithm,
+                                                  "workFactor": 10,
+                                                  "value": x.pop("password")
+                                              }
+                                          }
+                                      }
+                                      }
+    if "password" in columns:
+        return [], lambda x: {"profile": x, "credentials": {
+            "password": {"value": x.pop("password")}}}
+    return [], lambda x: {"profile": x}
+
+
+def iter_users_from_csv(file, options={}, chunksize=CSV_CHUNK):
+    """Yields user creation payloads from a header based CSV file, reading it in chunks.
+
+    Only `chunksize` rows are held in memory at a time, so payloads can be sent while the
+    rest of the file is still being read. The password options are the same as for
+    `to_users_json_from_csv`. Values are strings, and blank cells are null.
+
+    Parameters
+    ----------
+    file : str
+        CSV file name. `id` and `status` columns are ignored.
+    options : dict
+        Password options. Keys `default-password`, `no-password`, `import-password` or
+        `hashed-password`, with `hash-algorithm`, `hash-salt` and `hash-salt-order`.
+    chunksize : int
+        Number of rows read at a time (default is CSV_CHUNK).
+    """
+
+    build = None
+    import pandas as pd
+
+    # Every cell is read as a string, as dtypes inferred per chunk would differ between chunks
+    with pd.read_csv(file, index_col=False, chunksize=chunksize, dtype=str, keep_default_na=False) as reader:
+        for df in reader:
+            df = df.drop(["id", "status"], axis=1, errors='ignore')
+            if build is None:
+                dropped, build = _csv_payload_builder(list(df.columns), options)
+            df = df.drop(dropped, axis=1, errors='ignore')
+            # Blank cells are sent as null
+            df = df.replace({"": None})
+            for record in df.to_dict("records"):
+                yield build(record)
+
+
+def to_users_json_from_csv(file, options={}):
+    return list(iter_users_from_csv(file, options))
 
 
 class UserMgr(OktaResourceBase):
@@ -105,32 +284,65 @@ class UserMgr(OktaResourceBase):
     activateUser(id)
         Activates a staged user.
 
-    createUsers(input)
-        Creates a user
+    createUsers(inputs, concurrency=1, journal=None)
+        Creates users, running up to `concurrency` API calls in parallel. Skips the logins
+        a resumed job journal records as created
 
     deactivateUser(id)
         Deactivates an active or suspended user
 
+    deactivateUsers(ids, concurrency=1, journal=None)
+        Deactivates users, running up to `concurrency` API calls in parallel. Skips the ids
+        a resumed job journal records as deactivated
+
     deleteUser(id)
         Deletes a deactivated user
 
+    deleteUsers(ids, concurrency=1, journal=None)
+        Deletes deactivated users, running up to `concurrency` API calls in parallel. Skips
+        the ids a resumed job journal records as deleted
+
+    purgeUsers(users, concurrency=1, journal=None)
+        Deactivates, if needed, and deletes users, each user flowing from one step to the next
+
     getCurrentUser()
         Returns the current user
 
     getUser(idOrLogin)
-        Get the user with supplied `ID` or `login`
+        Get the user with supplied `ID` or `login`, from the local cache when available
+
+    getCachedUsers(keys)
+        Looks up users in the local cache
+
+    cacheUsers(users)
+        Stores users in the local cache
+
+    exportUsers(shards)
+        Yields all users, paginating shards of the user population concurrently
+
+    resolveUsers(values, field="login")
+        Looks up the users with any of many attribute values, in concurrent chunked searches
+
+    findOfflineUsers(store)
+        Yields the users of the local snapshot matching the criteria, without API calls
 
     getUsers()
         Returns all users
 
+    iterUsers()
+        Yields all users page by page
+
     reactivateUser(id)
         Reactivates a deactivated user
 
+    syncUsers(store, full=False)
+        Synchronizes the local user snapshot with the org, incrementally by `lastUpdated`
+
     searchUser(query)
         Searches users based on query
     """
 
-    def __init__(self, client):
+    def __init__(self, client, cache=None):
         """
         Instantiates an user manager object.
 
@@ -139,10 +351,15 @@ class UserMgr(OktaResourceBase):
         client : object
             Okta client object to associate. Instance of OktaAPIToken class.
             Sets the relative URL of Okta user API endpoint to `/api/v1/users`
+        cache : object, optional
+            Local resource cache consulted by `getUser` (default is None).
         """
-        super(UserMgr, self).__init__(client)
+        super(UserMgr, self).__init__(client, cache=cache)
         self._url = '/api/v1/users'
 
+    def _retry_counter(self):
+        return getattr(self._client, "last_retries", None)
+
     def activateUser(self, id):
         pass
 
@@ -150,19 +367,15 @@ class UserMgr(OktaResourceBase):
         apiurl = self._url + "?activate=" + str(activate).lower()
         return self._client.request(apiurl, self, mode="post", data=payload)
 
-    def createUsers(self, inputs=[], file=None, mode="json", options={}, source="input", activate=False):
-        result = {},
-        success = []
-        failure = []
-        errors = []
-
+    def createUsers(self, inputs=[], file=None, mode="json", options={}, source="input", activate=False, concurrency=1, journal=None):
         list_of_users = []
 
         if file is None:
             list_of_users = inputs
         else:
             if mode == "csv":
-                list_of_users = to_users_json_from_csv(file, options)
+                # Users are created while the rest of the file is still being read
+                list_of_users = iter_users_from_csv(file, options)
             else:
                 with open(file, 'r') as infile:
                     data = json.load(infile)
@@ -171,72 +384,72 @@ class UserMgr(OktaResourceBase):
                     else:
                         list_of_users = [data]
 
-        for userdata in list_of_users:
-            try:
-                payload = json.dumps(userdata)
-                response = self.createUser(payload, activate=activate)
-            except ServiceException as ex:
-                errors.append(ex.info)
-                failure.append(userdata)
-            except Exception as ex:
-                errors.append(ex.message)
-                failure.append(userdata)
-            else:
-                success.append(response["profile"]["login"])
-
-        result = {"success": success, "failure": failure, "errors": errors}
-        return result
+        executor = BulkExecutor(concurrency=concurrency, retry_counter=self._retry_counter())
+        return executor.run(list_of_users,
+                            lambda userdata: self.createUser(json.dumps(userdata), activate=activate),
+                            on_success=lambda userdata, response: response["profile"]["login"],
+                            journal=journal, stage="create", key=payload_key)
 
     def deactivateUser(self, id, notify=False):
         apiurl = self._url + "/" + id + \
             "/lifecycle/deactivate?sendEmail=" + str(notify).lower()
+        if self._cache:
+            self._cache.invalidate("users", id)
         return self._client.request(apiurl, self, mode="post")
 
-    def deactivateUsers(self, ids, notify=False):
-        result = {},
-        success = []
-        failure = []
-        errors = []
-
-        for rid in ids:
-            try:
-                self.deactivateUser(rid, notify=notify)
-            except ServiceException as ex:
-                errors.append(ex.info)
-                failure.append(rid)
-            except Exception as ex:
-                errors.append(ex.message)
-                failure.append(rid)
-            else:
-                success.append(rid)
-
-        result = {"success": success, "failure": failure, "errors": errors}
-        return result
+    def deactivateUsers(self, ids, notify=False, concurrency=1, journal=None):
+        executor = BulkExecutor(concurrency=concurrency, retry_counter=self._retry_counter())
+        return executor.run(ids, lambda rid: self.deactivateUser(rid, notify=notify), journal=journal, stage="deactivate")
 
     def deleteUser(self, id, notify=False):
         apiurl = self._url + "/" + id + "?sendEmail=" + str(notify).lower()
+        if self._cache:
+            self._cache.invalidate("users", id)
         return self._client.request(apiurl, self, mode="delete")
 
-    def deleteUsers(self, ids, notify=False):
-        result = {},
-        success = []
-        failure = []
-        errors = []
+    def deleteUsers(self, ids, notify=False, concurrency=1, journal=None):
+        executor = BulkExecutor(concurrency=concurrency, retry_counter=self._retry_counter())
+        return executor.run(ids, lambda rid: self.deleteUser(rid, notify=notify), journal=journal, stage="delete")
+
+    def purgeUsers(self, users, notify=False, concurrency=1, journal=None):
+        """Deletes users, deactivating first the ones that are not deprovisioned.
+
+        Each worker takes a user through deactivation and deletion back to back, so
+        deletions start as soon as the first deactivation succeeds instead of after the
+        whole set is deactivated. Reports deleted user ids as success and the users that
+        failed either step as failure.
 
-        for rid in ids:
+        Parameters
+        ----------
+        users : iterable
+            Users to delete, with their `id` and `status`. Instances of User class.
+        notify : bool
+            Send the deletion email notifications (default is False). Deactivations never
+            send emails.
+        concurrency : int
+            Maximum number of users processed in parallel (default is 1, serial).
+        journal : object, optional
+            Job journal. Users it records as deleted are skipped.
+        """
+
+        counter = self._retry_counter()
+        local = threading.local()
+
+        def purge(user):
+            local.retries = 0
+            if user["status"] != "DEPROVISIONED":
+                try:
+                    self.deactivateUser(user["id"], notify=False)
+                finally:
+                    local.retries += counter() if counter else 0
             try:
-                self.deleteUser(rid, notify=notify)
-            except ServiceException as ex:
-                errors.append(ex.info)
-                failure.append(rid)
-            except Exception as ex:
-                errors.append(ex.message)
-                failure.append(rid)
-            else:
-                success.append(rid)
+                return self.deleteUser(user["id"], notify=notify)
+            finally:
+                local.retries += counter() if counter else 0
 
-        result = {"success": success, "failure": failure, "errors": errors}
-        return result
+        executor = BulkExecutor(concurrency=concurrency, retry_counter=lambda: getattr(local, "retries", 0))
+        return executor.run(users, purge, on_success=lambda user, response: user["id"],
+                            journal=journal, stage="delete", key=lambda user: user["id"])
 
     def getCurrentUser(self, attr=None):
         """Returns the current user.
@@ -258,65 +471,442 @@ class UserMgr(OktaResourceBase):
         idOrLogin : str
             Either the internal Okta user ID or login attribute value
         """
-        apiurl = self._url + "/" + idOrLogin
-        result, link = self._client.request(apiurl, self)
+        result = self._cache.get("users", idOrLogin) if self._cache else None
+        if result is None:
+            apiurl = self._url + "/" + idOrLogin
+            result, link = self._client.request(apiurl, self)
+            self.cacheUsers([result])
         user = User(result, attr=attr)
         return user
 
-    def getUsers(self, query=None, filter=None, search=None, attr=None, limit=200, threshold=0, deepSearch={}):
+    def getCachedUsers(self, keys):
+        """Looks up users in the local cache.
+
+        Returns the cached users and the keys that were not found.
+
+        Parameters
+        ----------
+        keys : list
+            User IDs or logins.
+        """
+
+        found = []
+        missing = []
+        for key in keys:
+            result = self._cache.get("users", key) if self._cache else None
+            if result is None:
+                missing.append(key)
+            else:
+                found.append(User(result))
+        return found, missing
+
+    def cacheUsers(self, users):
+        """Stores full user objects in the local cache, keyed by ID and login.
+
+        Parameters
+        ----------
+        users : list
+            User JSON objects or `User` instances fetched without an attribute subset.
+        """
+
+        if not self._cache:
+            return
+        records = [user._data if isinstance(user, User) else user for user in users]
+        records = [{k: v for k, v in record.items() if k != "_links"} for record in records]
+        self._cache.put_many("users", records, keys=lambda record: [record.get("profile", {}).get("login")])
+
+    def iterUsers(self, query=None, filter=None, search=None, attr=None, limit=200, threshold=0, deepSearch={}, prefetch=0,
+                  regex=True, case=True, lean=False):
+        """Yields users page by page, following the `next` link of each page.
+
+        Only one page of users is held in memory at a time, so results can be processed
+        or written out while the remaining pages are still being fetched.
+
+        Parameters
+        ----------
+        query : str, optional
+            Matches the query against first name, last name or email. Returns a single page.
+        filter : str, optional
+            Okta filter expression.
+        search : str, optional
+            Okta search expression.
+        attr : str, optional
+            Comma separated subset of profile attributes to keep.
+        limit : int
+            Page size (default is 200).
+        threshold : int
+            Maximum number of records to return. 0 returns all records (default is 0).
+        deepSearch : dict
+            Attribute to pattern mapping applied to every page. See `deep_search`. Every
+            pattern must match, except those on attributes `attr` drops.
+        prefetch : int
+            Number of pages fetched ahead in the background while the current page is being
+            processed. 0 fetches pages on demand (default is 0).
+        regex : bool
+            Treat `deepSearch` patterns as regular expressions (default is True).
+        case : bool
+            Case-sensitive `deepSearch` matching (default is True).
+        lean : bool
+            Decode pages from raw bytes, with orjson when installed, and reduce users to `attr`
+            while decoding (default is False).
+        """
+
+        pages = self._pages(query=query, filter=filter, search=search, limit=limit, threshold=threshold, prefetch=prefetch,
+                            decoder=user_decoder(attr) if lean else None)
+        keys = pattern_keys(deepSearch, attr)
+        try:
+            for result in pages:
+                user_list = [User(d, links=True) if lean else User(d, attr=attr) for d in result]
+                if deepSearch:
+                    user_list = self.deep_search(user_list, deepSearch, regex=regex, case=case, keys=keys)
+                yield from user_list
+        finally:
+            pages.close()
+
+    def _pages(self, query=None, filter=None, search=None, limit=200, threshold=0, prefetch=0, decoder=None):
+        """Yields the raw user JSON objects of a list or search page by page, up to `threshold` users."""
+
         apiurl = self._url
-        result_arr = []
+        paginate = True
 
         if (query is not None) and (len(query.strip()) > 0):
             if threshold > 0:
                 apiurl = apiurl + "?limit=" + str(threshold) + "&q=" + query
             else:
                 apiurl = apiurl + "?q=" + query
-            result, next = self._client.request(apiurl, self)
-            result_arr = result
+            paginate = False
+        elif (filter is not None) and (len(filter.strip()) > 0):
+            apiurl = apiurl + "?limit=" + str(limit) + "&filter=" + filter
+        elif (search is not None) and (len(search.strip()) > 0):
+            apiurl = apiurl + "?limit=" + str(limit) + "&search=" + search
         else:
-            if (filter is not None) and (len(filter.strip()) > 0):
-                apiurl = apiurl + "?limit=" + str(limit) + "&filter=" + filter
-            elif (search is not None) and (len(search.strip()) > 0):
-                apiurl = apiurl + "?limit=" + str(limit) + "&search=" + search
-            else:
-                apiurl = apiurl + "?limit=" + str(limit)
+            apiurl = apiurl + "?limit=" + str(limit)
+
+        remaining = threshold
+        pages = iter_pages(self._client, self, apiurl, prefetch=prefetch, follow=paginate, decoder=decoder)
+        try:
+            for result in pages:
+                if threshold > 0:
+                    result = result[:remaining]
+                    remaining = remaining - len(result)
+                yield result
+                if threshold > 0 and remaining <= 0:
+                    break
+        finally:
+            pages.close()
+
+    def getUsers(self, query=None, filter=None, search=None, attr=None, limit=200, threshold=0, deepSearch={}, prefetch=0,
+                 regex=True, case=True, bulk=False, lean=False):
+        """Returns all users matching the criteria.
+
+        Takes the same criteria as `iterUsers`. In `bulk` mode the users are returned as a
+        columnar UserBatch instead of a list of User objects, which takes far less memory for
+        large result sets and converts directly to a DataFrame or CSV.
 
-            result, next = self._client.request(apiurl, self)
+        Parameters
+        ----------
+        bulk : bool
+            Return a UserBatch (default is False, a list of User objects).
+        lean : bool
+            Decode pages from raw bytes and reduce users to `attr` while decoding (default is False).
+        """
 
-            if (threshold > 0) and (threshold <= limit):
-                result_arr = result[:threshold]
-            else:
-                result_arr = result
-                while next:
-                    result, next = self._client.request(next, self)
-                    delta = threshold - len(result_arr)
-                    if (threshold > 0) and (delta <= limit):
-                        result_arr = result_arr + result[:delta]
-                        break
-                    else:
-                        result_arr = result_arr + result
-        user_list = list(map(lambda d: User(d, attr=attr), result_arr))
+        if bulk:
+            user_list = UserBatch(attr=None if lean else attr)
+            pages = self._pages(query=query, filter=filter, search=search, limit=limit, threshold=threshold, prefetch=prefetch,
+                                decoder=user_decoder(attr) if lean else None)
+            try:
+                for result in pages:
+                    user_list.extend(result)
+            finally:
+                pages.close()
+        else:
+            user_list = list(self.iterUsers(query=query, filter=filter, search=search, attr=attr, limit=limit, threshold=threshold,
+                                            prefetch=prefetch, lean=lean))
         if deepSearch:
-            user_list = self.deep_search(user_list, deepSearch)
+            user_list = self.deep_search(user_list, deepSearch, regex=regex, case=case)
         return user_list
 
-    def deep_search(self, user_list, deepSearch):
-        print("Deep Search")
-        df = to_frame(user_list)
-        cols = list(set(list(deepSearch.keys())
-                        ).intersection(list(df.columns)))
-        if len(cols) == 0:
+    def exportUsers(self, shards=4, search=None, attr=None, limit=200, concurrency=None, lean=False):
+        """Yields every user, paginating disjoint shards of the user population concurrently.
+
+        Cursor pagination fetches one page per round trip. Splitting the population into
+        shards (see `shard_expressions`) lets several cursors advance in parallel. Users are
+        yielded in arrival order and de-duplicated by id.
+
+        Parameters
+        ----------
+        shards : int
+            Number of shards (default is 4).
+        search : str, optional
+            Search expression restricting the exported users.
+        attr : str, optional
+            Comma separated subset of profile attributes to keep.
+        limit : int
+            Page size (default is 200).
+        concurrency : int, optional
+            Maximum number of shards paginated in parallel (default is the number of shards).
+        lean : bool
+            Decode pages from raw bytes and reduce users to `attr` while decoding (default is False).
+        """
+
+        expressions = shard_expressions(shards, search=search)
+        decoder = user_decoder(attr) if lean else None
+        sources = [iter_pages(self._client, self, self._url + "?limit=" + str(limit) + "&search=" + quote(expression, safe=""),
+                              decoder=decoder)
+                   for expression in expressions]
+        seen = set()
+        pages = merge_pages(sources, workers=concurrency or len(sources))
+        try:
+            for result in pages:
+                for d in result:
+                    if d["id"] in seen:
+                        continue
+                    seen.add(d["id"])
+                    yield User(d, links=True) if lean else User(d, attr=attr)
+        finally:
+            pages.close()
+
+    def resolveUsers(self, values, field="login", status_list=None, prefix=False, limit=200, concurrency=4):
+        """Looks up the users with any of the given attribute values.
+
+        The values are split into search expressions of bounded size (see
+        `resolve_expressions`), which are paginated concurrently. Returns the matching
+        users, de-duplicated by id, and the values no user matched. Blank values are
+        ignored.
+
+        Parameters
+        ----------
+        values : iterable
+            Attribute values to look up, such as a column of a CSV file.
+        field : str
+            Attribute the values belong to (default is `login`).
+        status_list : list, optional
+            Statuses the users are restricted to (default is None, any status).
+        prefix : bool
+            Match values as prefixes instead of exactly (default is False).
+        limit : int
+            Page size (default is 200).
+        concurrency : int
+            Maximum number of searches paginated in parallel (default is 4).
+        """
+
+        import pandas as pd
+
+        lookup = {}
+        for value in values:
+            if value is None or pd.isna(value):
+                continue
+            value = str(value).strip()
+            if value:
+                lookup.setdefault(value.lower(), value)
+        if not lookup:
+            return [], []
+
+        expressions = resolve_expressions(list(lookup.values()), field=field, status_list=status_list, prefix=prefix)
+        # Values are read from the attribute the expressions search
+        attribute = search_attribute(field)
+        sources = [iter_pages(self._client, self, self._url + "?limit=" + str(limit) + "&search=" + quote(expression, safe=""))
+                   for expression in expressions]
+        users = []
+        seen = set()
+        resolved = set()
+        pages = merge_pages(sources, workers=max(1, min(concurrency, len(sources))))
+        try:
+            for result in pages:
+                for d in result:
+                    if d["id"] in seen:
+                        continue
+                    seen.add(d["id"])
+                    users.append(User(d))
+                    matched = attribute_value(d, attribute)
+                    if matched is None:
+                        continue
+                    # Search values compare case-insensitively
+                    matched = str(matched).lower()
+                    if prefix:
+                        resolved.update(matched[:end] for end in range(1, len(matched) + 1) if matched[:end] in lookup)
+                    elif matched in lookup:
+                        resolved.add(matched)
+        finally:
+            pages.close()
+        unresolved = [value for key, value in lookup.items() if key not in resolved]
+        return users, unresolved
+
+    def _server_time(self):
+        """Returns the epoch time of the org, from the `Date` header of the last response of this thread."""
+
+        last_date = getattr(self._client, "last_date", None)
+        try:
+            return parsedate_to_datetime(last_date()).timestamp()
+        except (TypeError, ValueError):
+            return time.time()
+
+    def syncUsers(self, store, full=False, limit=200, prefetch=2, batch=1000):
+        """Synchronizes the local user snapshot with the org.
+
+        The first synchronization, or a `full` one, fetches every user in every status into
+        a staging copy of the snapshot, which replaces the snapshot once every page has been
+        stored. Later ones only fetch the users whose `lastUpdated` is after the high-water
+        mark recorded by the previous synchronization, and upsert them into the snapshot.
+        Deleted users are only removed from the snapshot by a full synchronization.
+
+        The high-water mark is the org time the synchronization started at, taken from the
+        `Date` header of its first response, minus SYNC_MARGIN seconds. Users updated while
+        the pages are fetched are picked up again by the next synchronization.
+
+        Returns a summary with the synchronization `mode`, the number of `fetched` users,
+        the snapshot `total` and the new `high_water_mark`.
+
+        Parameters
+        ----------
+        store : object
+            Local snapshot store. Instance of oktapy.core.store.UserStore.
+        full : bool
+            Replace the snapshot with every user (default is False).
+        limit : int
+            Page size (default is 200).
+        prefetch : int
+            Number of pages fetched ahead (default is 2).
+        batch : int
+            Number of users written to the store per transaction (default is 1000).
+        """
+
+        high_water_mark = None if full else store.high_water_mark()
+        if high_water_mark is None:
+            mode = "full"
+            search = " or ".join([f"status eq \"{status}\"" for status in ALL_STATUS])
+        else:
+            mode = "delta"
+            search = f"lastUpdated gt \"{high_water_mark}\""
+
+        # The first page is fetched on this thread, to read the org time off its response
+        first, next = self._client.request(self._url + "?limit=" + str(limit) + "&search=" + quote(search, safe=""), self)
+        started = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(self._server_time() - SYNC_MARGIN))
+        rest = iter_pages(self._client, self, next, prefetch=prefetch) if next else None
+
+        target = store.staging() if mode == "full" else store
+        records = itertools.chain(first, itertools.chain.from_iterable(rest or []))
+        fetched = 0
+        try:
+            while True:
+                chunk = list(itertools.islice(records, batch))
+                if not chunk:
+                    break
+                target.upsert_many(chunk)
+                fetched = fetched + len(chunk)
+        except BaseException:
+            if target is not store:
+                target.clear()
+            raise
+        finally:
+            if rest is not None:
+                rest.close()
+
+        if mode == "full":
+            store.promote(target, started)
+        else:
+            store.set_high_water_mark(started)
+        return {"mode": mode, "fetched": fetched, "total": store.count(), "high_water_mark": started}
+
+    def findOfflineUsers(self, store, query=None, filter=None, search=None, attr=None, threshold=0, deepSearch={}, regex=True,
+                         case=True):
+        """Yields the users of the local snapshot matching the criteria, without API calls.
+
+        Takes the same criteria as `iterUsers` and evaluates them against the snapshot kept by
+        `syncUsers`, using its id, login, email and trigram indexes where possible. Results are
+        only as current as the last synchronization.
+
+        Parameters
+        ----------
+        store : object
+            Local snapshot store. Instance of oktapy.core.store.UserStore.
+        query : str, optional
+            Matches the query as a prefix of first name, last name or email.
+        filter : str, optional
+            Okta filter expression.
+        search : str, optional
+            Okta search expression.
+        attr : str, optional
+            Comma separated subset of profile attributes to keep.
+        threshold : int
+            Maximum number of records to return. 0 returns all records (default is 0).
+        deepSearch : dict
+            Attribute to pattern mapping. Every pattern must occur in its attribute.
+        regex : bool
+            Treat `deepSearch` patterns as regular expressions (default is True).
+        case : bool
+            Case-sensitive `deepSearch` matching (default is True).
+        """
+
+        for d in OfflineQuery(store).find(query=query, filter=filter, search=search, pattern=deepSearch, threshold=threshold,
+                                          regex=regex, case=case):
+            yield User(d, attr=attr)
+
+    def deep_search(self, user_list, deepSearch, regex=True, case=True, chunk_size=DEEP_SEARCH_CHUNK, keys=None):
+        """Returns the users whose attributes match every pattern, in their original order.
+
+        Only the searched attributes are extracted, into one column per attribute, and the
+        users are processed in chunks of `chunk_size` so that memory stays bounded for large
+        lists. Each chunk is filtered with a single boolean mask combining every pattern.
+        Unless `keys` is given, patterns on attributes that none of the users have are ignored.
+
+        Parameters
+        ----------
+        user_list : list
+            Users to filter. List of User objects, or a UserBatch.
+        deepSearch : dict
+            Attribute to pattern mapping. Keys are profile attributes, `id` or `status`.
+        regex : bool
+            Treat patterns as regular expressions. When False, patterns are literal substrings (default is True).
+        case : bool
+            Case-sensitive matching (default is True).
+        chunk_size : int
+            Number of users matched per chunk (default is DEEP_SEARCH_CHUNK).
+        keys : list, optional
+            Attributes whose patterns are applied, whether or not the users have them (default
+            is None, the attributes some user has). See `pattern_keys`.
+        """
+
+        if not deepSearch or not len(user_list):
             return user_list
+        import numpy as np
+        import pandas as pd
+
+        def path(key):
+            return key if key in ("id", "status") else "profile." + key
+
+        if isinstance(user_list, UserBatch):
+            if keys is None:
+                keys = [key for key in deepSearch if path(key) in user_list.columns()]
+
+            def values(start, stop, key):
+                return user_list.strings(path(key), start, stop)
         else:
-            d_search = {key: deepSearch[key] for key in cols}
-            id_list = df["id"].tolist()
-            for k in d_search:
-                col_id_list = df[df[k].str.contains(
-                    deepSearch[k])]["id"].tolist()
-                id_list = list(set(col_id_list).intersection(id_list))
-            new_list = [user for user in user_list if user["id"] in id_list]
-            return new_list
+            if keys is None:
+                keys = [key for key in deepSearch
+                        if key in ("id", "status") or any(key in user._data["profile"] for user in user_list)]
+
+            def values(start, stop, key):
+                return [str((user._data.get(key) if key in ("id", "status") else user._data["profile"].get(key)) or "")
+                        for user in user_list[start:stop]]
+
+        if len(keys) == 0:
+            return user_list
+
+        selected = []
+        for start in range(0, len(user_list), chunk_size):
+            stop = min(start + chunk_size, len(user_list))
+            mask = np.ones(stop - start, dtype=bool)
+            for key in keys:
+                column = pd.Series(values(start, stop, key), dtype=object)
+                mask &= column.str.contains(deepSearch[key], regex=regex, case=case, na=False).to_numpy(dtype=bool)
+                if not mask.any():
+                    break
+            selected.extend(start + int(i) for i in np.flatnonzero(mask))
+        if isinstance(user_list, UserBatch):
+            return user_list.take(selected)
+        return [user_list[i] for i in selected]
 
     def reactivateUser(self, id):
         pass
@@ -17,12 +17,17 @@ class Okta(object):
             Base URL of the Okta org. Example - https://example.okta.com
     _client : object
             Associated Okta client object. Instance of OktaAPIToken class.
+    _cache : object
+            Local resource cache shared by the managers. Instance of oktapy.core.cache.ResourceCache, or None.
 
     Methods
     -------
     client()
         Returns the associated Okta client object
 
+    cache()
+        Returns the associated local resource cache
+
     baseUrl()
         Returns the base URL of the target Okta org
 
@@ -33,10 +38,13 @@ class Okta(object):
         Instantiates and returns Okta group manager object
     """
 
-    def __init__(self, baseurl, token=None, verbose=False):
+    def __init__(self, baseurl, token=None, verbose=False, cache=None, **options):
         """
         Instantiates and associates an OktaAPIToken client object.
 
+        The client, and therefore its pooled HTTP connections and rate limit scheduler,
+        is shared by every manager handed out by this instance.
+
         Parameters
         ----------
         baseurl : str
@@ -45,11 +53,23 @@ class Okta(object):
             API token value for the org.
         verbose : bool
             Flag to enable verbose API calls
+        cache : object, optional
+            Local resource cache consulted by the managers before calling the API.
+            Instance of oktapy.core.cache.ResourceCache (default is None, no cache).
+        options : dict
+            Client tuning options passed through to OktaAPIToken, such as
+            `pool_connections`, `pool_maxsize`, `keep_alive`, `timeout`,
+            `rate_limit_fraction`, `rate_limit_max_waits` and the `retry_*` policy settings.
         """
         self._baseurl = baseurl
         self._token = token
         self._verbose = verbose
-        self._client = OktaAPIToken(baseurl, token=token, verbose=verbose)
+        self._cache = cache
+        self._client = OktaAPIToken(baseurl, token=token, verbose=verbose, **options)
+
+    def cache(self):
+        """Returns the associated local resource cache, or None."""
+        return self._cache
 
     def client(self):
         """Returns the associated OktaAPIToken client object."""
@@ -64,11 +84,11 @@ class Okta(object):
 
         User manager is responsible for managing user specific operations.
         """
-        return UserMgr(client=self._client)
+        return UserMgr(client=self._client, cache=self._cache)
 
     def GroupMgr(self):
         """Instantiates and returns Okta group manager object.
 
         Group manager is responsible for managing group specific operations.
         """
-        return GroupMgr(client=self._client)
+        return GroupMgr(client=self._client, cache=self._cache)
@@ -1,4 +1,6 @@
 from oktapy.core.api import OktaRequest
+from oktapy.core.ratelimit import RateLimiter
+from oktapy.core.retry import RetryPolicy
 import click
 import json
 
@@ -20,6 +22,9 @@ class OktaAPIToken(object):
             to Okta endpoints
     _verbose : bool
             Flag to print API calls as cURL commands
+    _rate_limiter : object
+            An instance of oktapy.core.ratelimit.RateLimiter shared by every API call made through
+            this client, or None when client side rate limiting is disabled
 
 
     Methods
@@ -30,9 +35,20 @@ class OktaAPIToken(object):
     request(apiurl, caller, mode="get", data=None)
         Carries out and return result from the actual REST API call to supplied Okta endpoint along with
         appropriate headers and data.
+
+    close()
+        Closes the pooled connections of the underlying requester.
+
+    last_retries()
+        Returns the number of times the last API call made from the current thread was replayed.
+
+    last_date()
+        Returns the `Date` header of the response to the last API call made from the current thread.
     """
 
-    def __init__(self, baseurl, token=None, verbose=False):
+    def __init__(self, baseurl, token=None, verbose=False, pool_connections=10, pool_maxsize=10, keep_alive=True, timeout=None,
+                 rate_limit_fraction=0.8, rate_limit_max_waits=5, retry_max_attempts=3, retry_backoff_base=0.5,
+                 retry_backoff_cap=30, retry_jitter=True, retry_statuses=None, retry_methods=None):
         """
 
         Instantiates OktaAPIToken client object along with the supplied token.
@@ -46,19 +62,74 @@ class OktaAPIToken(object):
             API token value for the org
         verbose : bool
             Flag to print API calls as cURL commands
+        pool_connections : int
+            Number of per-host connection pools to cache (default is 10).
+        pool_maxsize : int
+            Maximum number of keep-alive connections per host (default is 10).
+        keep_alive : bool
+            Reuse connections across API calls (default is True).
+        timeout : float, optional
+            Connect/read timeout in seconds for every API call (default is None).
+        rate_limit_fraction : float, optional
+            Fraction of each Okta rate limit bucket the client may consume before it waits for
+            the bucket to reset. None disables client side rate limiting (default is 0.8).
+        rate_limit_max_waits : int
+            Maximum number of times a call waits for a reset after a 429 response before
+            the error is raised (default is 5).
+        retry_max_attempts : int
+            Maximum number of attempts per API call, including the first one. 1 disables retries (default is 3).
+        retry_backoff_base : float
+            Backoff in seconds before the first retry; doubles on every further retry (default is 0.5).
+        retry_backoff_cap : float
+            Upper bound of the retry backoff in seconds (default is 30).
+        retry_jitter : bool
+            Randomize the retry backoff (default is True).
+        retry_statuses : iterable, optional
+            HTTP status codes to retry (default is 429, 500, 502, 503 and 504).
+        retry_methods : iterable, optional
+            HTTP methods safe to replay on any transient failure (default is GET, PUT and DELETE).
+            Other methods are only replayed when the request provably did not reach Okta.
         """
 
         self._baseurl = baseurl
         assert token is not None
         self._token = token
         self._verbose = verbose
-        self._requester = OktaRequest()
+        self._rate_limiter = RateLimiter(fraction=rate_limit_fraction, max_waits=rate_limit_max_waits) \
+            if rate_limit_fraction else None
+        self._retry_policy = RetryPolicy(max_attempts=retry_max_attempts,
+                                         backoff_base=retry_backoff_base,
+                                         backoff_cap=retry_backoff_cap,
+                                         jitter=retry_jitter,
+                                         retry_statuses=retry_statuses,
+                                         retry_methods=retry_methods)
+        self._requester = OktaRequest(pool_connections=pool_connections,
+                                      pool_maxsize=pool_maxsize,
+                                      keep_alive=keep_alive,
+                                      timeout=timeout,
+                                      rate_limiter=self._rate_limiter,
+                                      retry_policy=self._retry_policy)
 
     def baseurl(self):
         """Returns the base URL of the target Okta org. Example - https://example.okta.com"""
 
         return self._baseurl
 
+    def close(self):
+        """Closes the pooled connections of the underlying requester."""
+
+        self._requester.close()
+
+    def last_retries(self):
+        """Returns the number of times the last API call made from the current thread was replayed."""
+
+        return self._requester.last_retries
+
+    def last_date(self):
+        """Returns the `Date` header of the response to the last API call made from the current thread, or None."""
+
+        return self._requester.last_date
+
     def _print_curl(self, url, mode, headers, data=None):
         if not self._verbose:
             return
@@ -90,7 +161,7 @@ class OktaAPIToken(object):
         click.echo(" ".join(curl_cmd))
         click.echo()
 
-    def request(self, apiurl, caller, mode="get", data=None):
+    def request(self, apiurl, caller, mode="get", data=None, decoder=None):
         """Carries out and return result from the actual REST API call to supplied Okta endpoint.
 
         Parameters
@@ -103,6 +174,8 @@ class OktaAPIToken(object):
             REST method. Allowed values are `get`, `post`, `put`, `patch` and `delete` (default is `get`).
         data : object, optional
             REST API payload (default is None).
+        decoder : callable, optional
+            Decodes the raw body of a GET response (default is None, standard JSON decoding).
         """
 
         headers = {'Content-Type': 'application/json', 'Accept': 'application/json',
@@ -112,7 +185,7 @@ class OktaAPIToken(object):
         self._print_curl(full_url, mode, headers, data)
 
         if mode == "get":
-            return self._requester.get(full_url, headers=headers)
+            return self._requester.get(full_url, headers=headers, decoder=decoder)
         elif mode == "post":
             return self._requester.post(full_url, data=data, headers=headers)
         elif mode == "put":
@@ -0,0 +1,183 @@
+import sys
+
+from oktapy.resources.user import User
+
+# Marks an attribute absent from a user, as opposed to present with a null value
+_MISSING = object()
+
+# Low cardinality columns whose values are shared between users
+_INTERNED = {"status", "type.id"}
+
+
+def _flatten(data, prefix="", flat=None):
+    flat = {} if flat is None else flat
+    for key, value in data.items():
+        if key == "_links":
+            continue
+        if isinstance(value, dict):
+            _flatten(value, prefix + key + ".", flat)
+        else:
+            flat[prefix + key] = value
+    return flat
+
+
+def _project(data, attr):
+    attrList = list(set(attr.split(",")) - {"id", "login", "status"})
+    profile = {"login": data["profile"]["login"]}
+    for name in attrList:
+        if name in data["profile"]:
+            profile[name] = data["profile"].get(name, "")
+    return {"id": data["id"], "status": data["status"], "profile": profile}
+
+
+class UserBatch(object):
+    """Columnar container of Okta users.
+
+    Holds a large number of users as one list per attribute instead of one nested JSON
+    object per user. Attributes are keyed by their dotted path, such as `id`, `status`
+    or `profile.login`. `_links` are dropped. Individual `User` objects are only built
+    when the batch is indexed or iterated.
+
+    Attributes
+    ----------
+    _columns : dict
+        Attribute path to list of values mapping.
+    _length : int
+        Number of users in the batch.
+    _attr : str
+        Comma separated subset of profile attributes kept, or None for all.
+
+    Methods
+    -------
+    append(data)
+        Adds a user JSON object to the batch
+
+    extend(records)
+        Adds several user JSON objects to the batch
+
+    columns()
+        Returns the attribute paths held by the batch
+
+    column(name)
+        Returns the values of an attribute, one per user
+
+    strings(name, start=0, stop=None)
+        Returns the values of an attribute as strings, with '' for missing and falsy values
+
+    take(indices)
+        Returns a new batch with the users at the given positions
+
+    to_frame()
+        Returns the users as a DataFrame, in the same shape as UserMgr.to_frame
+
+    to_csv(path_or_buf)
+        Writes the users as CSV, in the same shape as UserMgr.to_frame
+    """
+
+    def __init__(self, records=None, attr=None):
+        """
+        Instantiates a user batch.
+
+        Parameters
+        ----------
+        records : iterable, optional
+            User JSON objects as returned by Okta user API.
+        attr : str, optional
+            Comma separated subset of profile attributes to keep, as with User.
+        """
+
+        self._columns = {}
+        self._length = 0
+        self._attr = attr
+        if records is not None:
+            self.extend(records)
+
+    def append(self, data):
+        if self._attr is not None:
+            data = _project(data, self._attr)
+        length = self._length
+        for name, value in _flatten(data).items():
+            column = self._columns.get(name)
+            if column is None:
+                column = self._columns[name] = [_MISSING] * length
+            if name in _INTERNED and isinstance(value, str):
+                value = sys.intern(value)
+            column.append(value)
+        self._length = length + 1
+        for column in self._columns.values():
+            if len(column) == length:
+                column.append(_MISSING)
+
+    def extend(self, records):
+        for data in records:
+            self.append(data)
+
+    def columns(self):
+        return list(self._columns.keys())
+
+    def column(self, name):
+        return [None if value is _MISSING else value for value in self._columns.get(name, [_MISSING] * self._length)]
+
+    def strings(self, name, start=0, stop=None):
+        values = self._columns.get(name)
+        stop = self._length if stop is None else min(stop, self._length)
+        if values is None:
+            return [""] * (stop - start)
+        # Falsy values render as '' like in User.to_dict
+        return [str(value) if (value is not _MISSING and value) else "" for value in values[start:stop]]
+
+    def take(self, indices):
+        batch = UserBatch(attr=self._attr)
+        for name, values in self._columns.items():
+            column = [values[i] for i in indices]
+            # Drop attributes none of the selected users have
+            if any(value is not _MISSING for value in column):
+                batch._columns[name] = column
+        batch._length = len(indices)
+        return batch
+
+    def _record(self, index):
+        data = {}
+        for name, values in self._columns.items():
+            value = values[index]
+            if value is _MISSING:
+                continue
+            parts = name.split(".")
+            node = data
+            for part in parts[:-1]:
+                node = node.setdefault(part, {})
+            node[parts[-1]] = value
+        return data
+
+    def to_frame(self):
+        import pandas as pd
+
+        profile = [name for name in self._columns if name.startswith("profile.")]
+        data = {name[len("profile."):]: self.strings(name) for name in profile}
+        data["id"] = self.strings("id")
+        data["status"] = self.strings("status")
+        frame = pd.DataFrame(data, index=pd.RangeIndex(self._length))
+        frame.sort_index(axis=1, inplace=True)
+        return frame
+
+    def to_csv(self, path_or_buf):
+        self.to_frame().to_csv(path_or_buf, index=False)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(range(*index.indices(self._length)))
+        if index < 0:
+            index = index + self._length
+        if not 0 <= index < self._length:
+            raise IndexError("UserBatch index out of range")
+        return User(self._record(index), links=True)
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield User(self._record(index), links=True)
+
+    def __repr__(self):
+        return "[" + ", ".join(repr(user) for user in self) + "]"
@@ -8,7 +8,6 @@ The module exposes the following functions:
 
 import urllib.parse
 import base64
-import pandas as pd
 
 
 def readCSV(inputFile):
@@ -19,8 +18,10 @@ def readCSV(inputFile):
     inputFile : str
         Filename.
     """
+    import pandas as pd
+
     df = pd.read_csv(inputFile, index_col=False)
-    data_dict = {col: df[col].squeeze().tolist() for col in df.columns}
+    data_dict = {col: df[col].tolist() for col in df.columns}
     return data_dict
 
 
@@ -0,0 +1,19 @@
+import pytest
+
+from oktapy.emulator import Dataset, Emulator
+
+
+@pytest.fixture
+def emulated_profile(tmp_path, monkeypatch):
+    """Serves an emulated org and points the DEFAULT profile of a temporary home at it.
+
+    Commands run in `tmp_path`, so the files they write land there too.
+    """
+    with Emulator(Dataset(users=100, groups=5)) as emulator:
+        home = tmp_path / "home"
+        (home / ".atkocli").mkdir(parents=True)
+        (home / ".atkocli" / "config").write_text(f"[DEFAULT]\nbase_url = {emulator.url}\napi_mode = token\n")
+        (home / ".atkocli" / "credentials").write_text("[DEFAULT]\napi_token = emulator\n")
+        monkeypatch.setenv("HOME", str(home))
+        monkeypatch.chdir(tmp_path)
+        yield emulator
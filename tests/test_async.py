@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from oktapy.emulator import Dataset, Emulator
+
+pytest.importorskip("aiohttp")
+
+from oktapy.asyncokta import AsyncOkta  # noqa: E402
+from oktapy.core.bulk import AsyncBulkExecutor  # noqa: E402
+
+
+def _run(emulator, scenario, **options):
+    async def main():
+        async with AsyncOkta(emulator.url, token="emulator", **options) as okta:
+            return await scenario(okta)
+
+    return asyncio.run(main())
+
+
+def test_async_get_users_pagination():
+    with Emulator(Dataset(users=1000, groups=10)) as emulator:
+        async def scenario(okta):
+            users = okta.UserMgr()
+            listed = await users.getUsers(limit=150)
+            batch = await users.getUsers(limit=150, bulk=True, lean=True, attr="department")
+            found = [user async for user in users.iterUsers(search='status eq "SUSPENDED"', limit=7,
+                                                             deepSearch={"department": "^Support$"})]
+            return listed, batch, found
+
+        listed, batch, found = _run(emulator, scenario)
+        assert len(listed) == 970
+        assert len({user["id"] for user in listed}) == 970
+        assert len(batch) == 970
+        assert emulator.calls["GET /api/v1/users"] == 7 + 7 + 5
+        assert len(found) == 5
+        assert all(user["profile"]["department"] == "Support" and user["status"] == "SUSPENDED" for user in found)
+
+
+def test_async_retries_throttled_calls():
+    with Emulator(Dataset(users=300, groups=1), throttle_rate=0.2, seed=7) as emulator:
+        async def scenario(okta):
+            users = okta.UserMgr()
+            listed = await users.getUsers(limit=20)
+            ids = [user["id"] for user in listed[:40]]
+            return listed, await users.deactivateUsers(ids, concurrency=4)
+
+        listed, result = _run(emulator, scenario, rate_limit_fraction=None, retry_max_attempts=10, retry_backoff_base=0.001,
+                              retry_jitter=False)
+        assert len(listed) == 291
+        assert len(result["success"]) == 40 and not result["failure"]
+        # Every throttled deactivation was replayed and counted
+        deactivations = emulator.calls["POST /api/v1/users/{id}/lifecycle/deactivate"]
+        assert deactivations > 40
+        assert result["retries"] == deactivations - 40
+
+
+def test_async_bulk_executor_order_and_retries():
+    async def operation(record):
+        await asyncio.sleep(0.001 * (10 - record))
+        if record == 4:
+            raise ValueError("bad record")
+        return record * 10
+
+    executor = AsyncBulkExecutor(concurrency=3, retry_counter=lambda: 2)
+    result = asyncio.run(executor.run(range(10), operation, on_success=lambda record, response: response))
+    assert result["success"] == [0, 10, 20, 30, 50, 60, 70, 80, 90]
+    assert result["failure"] == [4]
+    assert result["errors"] == ["bad record"]
+    assert result["retries"] == 20
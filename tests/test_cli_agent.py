@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+
+from click.testing import CliRunner
+from atkocli import cli
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def _atko(*args, input=None):
+    # Runs like the `atko` entry point, which forwards commands to a running agent
+    env = dict(os.environ, PYTHONPATH=SRC)
+    env.pop("ATKO_NO_AGENT", None)
+    return subprocess.run([sys.executable, "-c", "from atkocli import cli\ncli()", *args], env=env, input=input,
+                          capture_output=True, text=True, timeout=30)
+
+
+def test_cli_agent_forwards_commands(emulated_profile, tmp_path, monkeypatch):
+    monkeypatch.setenv("ATKO_AGENT_SOCKET", str(tmp_path / "agent.sock"))
+    runner = CliRunner()
+    result = runner.invoke(cli, ['agent', 'start', '--idle-timeout', '60'])
+    assert result.exit_code == 0, result.output
+    assert "Agent started" in result.output
+    try:
+        for login in ["user1@example.com", "user2@example.com"]:
+            result = _atko("users", "get", login, "-o", "id")
+            assert result.returncode == 0, result.stderr
+            assert result.stdout.splitlines()[0] == f"00u{int(login[4]):017d}"
+
+        result = _atko("users", "get", "nobody@example.com")
+        assert result.returncode == 112
+
+        # Password prompts are not forwarded, the agent cannot read them without echo
+        result = _atko("users", "create", input="new.hire@example.com\n\nNew\nHire\nSecret-123\n")
+        assert result.returncode == 0, result.stderr
+        assert "1 user(s) successfully created." in result.stdout
+        _, _, body = emulated_profile.handle("GET", "/api/v1/users/new.hire@example.com")
+        assert body["profile"]["lastName"] == "Hire"
+
+        result = runner.invoke(cli, ['agent', 'status'])
+        assert "3 command(s) served." in result.output
+        assert "Warm profiles: DEFAULT" in result.output
+    finally:
+        result = runner.invoke(cli, ['agent', 'stop'])
+    assert "Agent stopped" in result.output
+    assert not (tmp_path / "agent.sock").exists()
+
+    result = runner.invoke(cli, ['agent', 'status'])
+    assert result.exit_code == 1
+    assert "Agent is not running." in result.output
@@ -0,0 +1,47 @@
+import json
+
+from click.testing import CliRunner
+from atkocli import cli
+
+SCRIPT = """# Add the members to two groups, then deactivate them
+groups users add --group-id 00g00000000000000001 --file members.csv --field login -y
+groups users add --group-id 00g00000000000000002 --file members.csv --field login -y
+wait
+users deactivate members.csv --file --field login -y
+"""
+
+
+def test_cli_batch_parallel_stages(emulated_profile, tmp_path):
+    (tmp_path / "members.csv").write_text("login\nuser1@example.com\nuser2@example.com\n")
+    (tmp_path / "offboarding.atko").write_text(SCRIPT)
+    runner = CliRunner()
+    result = runner.invoke(cli, ['batch', 'offboarding.atko', '--parallel', '2', '--report', 'report.json'])
+    assert result.exit_code == 0, result.output
+    assert "3 command(s) run, 3 succeeded, 0 failed." in result.output
+
+    output = result.output
+    # Output is shown in script order
+    assert output.index("group 00g00000000000000001") < output.index("group 00g00000000000000002") \
+        < output.index("successfully deactivated")
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert [line["line"] for line in report] == [2, 3, 5]
+    assert [line["exit_code"] for line in report] == [0, 0, 0]
+
+    # Commands of a stage finishing within the same second keep their own result files
+    assert len(list(tmp_path.glob("okt_group_add_success_*.txt"))) == 2
+    for group_id in ["00g00000000000000001", "00g00000000000000002"]:
+        members = {user["profile"]["login"] for user in emulated_profile.okta().GroupMgr().iter_users(group_id)}
+        assert {"user1@example.com", "user2@example.com"} <= members
+    _, _, body = emulated_profile.handle("GET", "/api/v1/users/user1@example.com")
+    assert body["status"] == "DEPROVISIONED"
+
+
+def test_cli_batch_stop_on_error(emulated_profile, tmp_path):
+    (tmp_path / "script.atko").write_text("users get nobody@example.com\nwait\nusers get user1@example.com\n")
+    runner = CliRunner()
+    result = runner.invoke(cli, ['batch', 'script.atko', '--stop-on-error', '--report', 'report.json'])
+    assert result.exit_code == 113
+    assert "Line 1: `users get nobody@example.com` exited with 112." in result.output
+    assert "1 command(s) skipped after a failure." in result.output
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert [(line["line"], line["exit_code"]) for line in report] == [(1, 112), (3, None)]
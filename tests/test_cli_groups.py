@@ -0,0 +1,16 @@
+from click.testing import CliRunner
+from atkocli import cli
+
+
+def test_cli_group_members_missing_field(emulated_profile, tmp_path):
+    (tmp_path / "members.csv").write_text("login\nuser1@example.com\n")
+    runner = CliRunner()
+    result = runner.invoke(cli, ['groups', 'users', 'add', '--group-id', '00g00000000000000003',
+                                 '--file', 'members.csv', '--field', 'email', '-y'])
+    assert result.exit_code == 2
+    assert "Column 'email' not found in members.csv." in result.output
+
+    result = runner.invoke(cli, ['groups', 'users', 'add', '--group-id', '00g00000000000000003',
+                                 '--file', 'members.csv', '--field', 'login', '-y'])
+    assert result.exit_code == 0
+    assert "1 user(s) added to group 00g00000000000000003." in result.output
@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+HEAVY_MODULES = ["pandas", "numpy", "prettytable", "requests"]
+
+
+def _run(tmp_path, args, code):
+    env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=SRC)
+    script = "import sys\nfrom atkocli import cli\ntry:\n    cli(%r)\nexcept SystemExit:\n    pass\n%s" % (args, code)
+    return subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True)
+
+
+def test_cli_help_defers_heavy_imports(tmp_path):
+    for args in (["--help"], ["users", "--help"], ["groups", "users", "--help"]):
+        result = _run(tmp_path, args, "print('loaded:' + ','.join(m for m in %r if m in sys.modules))" % HEAVY_MODULES)
+        assert result.returncode == 0
+        assert result.stdout.splitlines()[-1] == "loaded:", f"{args} {result.stdout.splitlines()[-1]}"
+
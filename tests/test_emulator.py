@@ -0,0 +1,63 @@
+import pytest
+
+from oktapy.emulator import Dataset, Emulator
+
+
+@pytest.fixture
+def emulator():
+    with Emulator(Dataset(users=1000, groups=10)) as emulator:
+        yield emulator
+
+
+def test_users_pagination_and_queries(emulator):
+    users = emulator.okta().UserMgr()
+
+    listed = list(users.iterUsers(limit=150))
+    assert len(listed) == 970
+    assert len({user["id"] for user in listed}) == 970
+    assert emulator.calls["GET /api/v1/users"] == 7
+
+    deprovisioned = users.getUsers(filter='status eq "DEPROVISIONED"')
+    assert len(deprovisioned) == 30
+    assert {user["status"] for user in deprovisioned} == {"DEPROVISIONED"}
+
+    found, unresolved = users.resolveUsers(["user1@example.com", "USER2@example.com", "nobody@example.com"])
+    assert sorted(user["profile"]["login"] for user in found) == ["user1@example.com", "user2@example.com"]
+    assert unresolved == ["nobody@example.com"]
+
+
+def test_users_lifecycle(emulator):
+    users = emulator.okta().UserMgr()
+    payload = '{"profile": {"login": "new.hire@example.com", "email": "new.hire@example.com"}}'
+
+    created = users.createUser(payload, activate=True)
+    assert created["status"] == "PROVISIONED"
+    assert users.createUsers([{"profile": {"login": "new.hire@example.com"}}])["failure"]
+
+    result = users.purgeUsers([users.getUser("new.hire@example.com"), users.getUser("user3@example.com")], concurrency=2)
+    assert sorted(result["success"]) == ["00u00000000000000003", created["id"]]
+    status, _, body = emulator.handle("GET", "/api/v1/users/new.hire@example.com")
+    assert status == 404
+    assert body["errorCode"] == "E0000007"
+
+
+def test_group_members(emulator):
+    groups = emulator.okta().GroupMgr()
+
+    assert len(list(groups.iter_users("00g00000000000000003", limit=40))) == 100
+    result = groups.add_users("00g00000000000000003", ["user1@example.com", "user13@example.com"], field="login")
+    assert result["success"] and not result["failure"]
+    result = groups.remove_users("00g00000000000000003", ["00u00000000000000023"])
+    assert result["success"] == ["00u00000000000000023"]
+    members = {user["id"] for user in groups.iter_users("00g00000000000000003")}
+    assert len(members) == 100
+    assert "00u00000000000000001" in members and "00u00000000000000023" not in members
+
+
+def test_rate_limit_headers():
+    emulator = Emulator(Dataset(users=10, groups=1), rate_limit=2)
+
+    statuses = [emulator.handle("GET", "/api/v1/users/user1@example.com") for _ in range(3)]
+    assert [status for status, _, _ in statuses] == [200, 200, 429]
+    assert [headers["X-Rate-Limit-Remaining"] for _, headers, _ in statuses] == ["1", "0", "0"]
+    assert statuses[2][2]["errorCode"] == "E0000047"
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from oktapy.core.journal import Journal
+from oktapy.emulator import Dataset, Emulator
+from oktapy.exceptions import ConfigurationException
+
+
+def _payload(login):
+    return {"profile": {"login": login, "email": login}}
+
+
+def test_create_users_journal_and_resume(tmp_path):
+    directory = str(tmp_path / "jobs")
+    with Emulator(Dataset(users=10, groups=1)) as emulator:
+        users = emulator.okta().UserMgr()
+
+        # A payload without login is a failed record, not an aborted job
+        with Journal.create(directory, "create") as journal:
+            result = users.createUsers([{"profile": {"firstName": "No login"}}, _payload("z@example.com")], journal=journal)
+        assert result["success"] == ["z@example.com"]
+        assert result["failure"] == [{"profile": {"firstName": "No login"}}]
+        assert not journal.finish()
+
+        payloads = [_payload("a@example.com"), _payload("user3@example.com"), _payload("b@example.com")]
+        with Journal.create(directory, "create") as journal:
+            result = users.createUsers(payloads, concurrency=2, journal=journal)
+        assert result["success"] == ["a@example.com", "b@example.com"]
+        assert result["failure"] == payloads[1:2]
+        assert not journal.finish()
+        path = os.path.join(directory, journal.job_id + ".journal")
+        assert os.path.exists(path)
+
+        # Deletes deactivate active users first
+        for _ in range(2):
+            emulator.handle("DELETE", "/api/v1/users/user3@example.com")
+        with Journal.resume(directory, journal.job_id, "create") as resumed:
+            result = users.createUsers(payloads, journal=resumed)
+        assert result["resumed"] == 2
+        assert result["success"] == ["a@example.com", "user3@example.com", "b@example.com"]
+        assert emulator.calls["POST /api/v1/users"] == 6
+        assert resumed.finish()
+        assert not os.path.exists(path)
+
+
+def test_journal_resume(tmp_path):
+    directory = str(tmp_path)
+    journal = Journal.create(directory, "delete", params={"concurrency": 4})
+    journal.record("deactivate", "00u1", True)
+    journal.record("delete", "00u1", False, error="E0000001")
+    journal.record("delete", "00u1", True, value="00u1")
+    journal.record("delete", "00u2", False, error="E0000001")
+    journal.close()
+    path = os.path.join(directory, journal.job_id + ".journal")
+    with open(path, "a") as journal_file:
+        journal_file.write('{"stage": "delete", "key": "00u3", "o')
+
+    with pytest.raises(ConfigurationException):
+        Journal.resume(directory, journal.job_id, "create")
+    resumed = Journal.resume(directory, journal.job_id, "delete")
+    assert resumed.params == {"concurrency": 4}
+    assert resumed.completed("delete") == {"00u1": "00u1"}
+    resumed.record("delete", "00u3", True)
+    resumed.close()
+    assert Journal.resume(directory, journal.job_id, "delete").completed("delete") == {"00u1": "00u1", "00u3": None}
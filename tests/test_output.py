@@ -0,0 +1,43 @@
+import csv
+import io
+
+from common.okt_output import write_records
+from oktapy.resources.user import User
+
+
+def _users(count, late=None):
+    users = []
+    for index in range(count):
+        profile = {"login": f"user{index}@example.com", "firstName": f"First{index}"}
+        if late is not None and index >= late:
+            profile["costCenter"] = f"CC{index}"
+        users.append(User({"id": f"00u{index:017d}", "status": "ACTIVE", "profile": profile}))
+    return users
+
+
+def test_csv_columns_of_every_record():
+    out = io.StringIO()
+    assert write_records(_users(300, late=250), mode="csv", file=out) == 300
+
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert list(rows[0]) == ["costCenter", "firstName", "id", "login", "status"]
+    assert len(rows) == 300
+    assert rows[0]["costCenter"] == "" and rows[299]["costCenter"] == "CC299"
+    assert rows[299]["login"] == "user299@example.com"
+
+
+def test_csv_known_columns():
+    out = io.StringIO()
+    users = [User(user._data, attr="costCenter") for user in _users(3, late=2)]
+    write_records(users, mode="csv", file=out, columns={"costCenter", "id", "login", "status"})
+
+    assert out.getvalue().splitlines() == ["costCenter,id,login,status",
+                                           ",00u00000000000000000,user0@example.com,ACTIVE",
+                                           ",00u00000000000000001,user1@example.com,ACTIVE",
+                                           "CC2,00u00000000000000002,user2@example.com,ACTIVE"]
+
+
+def test_csv_without_records():
+    out = io.StringIO()
+    assert write_records([], mode="csv", file=out) == 0
+    assert out.getvalue() == "\n"
@@ -0,0 +1,90 @@
+import pytest
+
+from oktapy.core.query import OfflineQuery, evaluate, parse_expression, references
+from oktapy.core.store import UserStore
+from oktapy.exceptions import ConfigurationException
+
+USER = {"id": "00u1", "status": "ACTIVE", "lastUpdated": "2024-03-01T10:00:00.000Z",
+        "profile": {"login": "John.Doe@example.com", "firstName": "John", "department": "R&D \"Labs\"", "level": 3,
+                    "manager": None, "groups": ["Sales", "Admins"]}}
+
+
+def test_parse_precedence_and_grouping():
+    a, b, c = ("cmp", "a", "eq", 1), ("cmp", "b", "eq", 2), ("cmp", "c", "eq", 3)
+    assert parse_expression("a eq 1 or b eq 2 and c eq 3") == ("or", [a, ("and", [b, c])])
+    assert parse_expression("(a eq 1 or b eq 2) and c eq 3") == ("and", [("or", [a, b]), c])
+    assert parse_expression("a eq 1 AND b eq 2 Or c eq 3") == ("or", [("and", [a, b]), c])
+
+
+def test_parse_values():
+    assert parse_expression('profile.department eq "R&D \\"Labs\\""') == ("cmp", "profile.department", "eq", 'R&D "Labs"')
+    assert parse_expression('profile.login sw "a b (c)"') == ("cmp", "profile.login", "sw", "a b (c)")
+    assert parse_expression("profile.manager pr") == ("cmp", "profile.manager", "pr", None)
+    assert parse_expression("profile.level GE 2.5") == ("cmp", "profile.level", "ge", 2.5)
+    assert parse_expression("profile.active eq true") == ("cmp", "profile.active", "eq", True)
+
+
+@pytest.mark.parametrize("expression", [
+    'profile.login eq "john',
+    'profile.login like "john"',
+    "profile.login eq",
+    "profile.login eq john",
+    '(status eq "ACTIVE"',
+    'status eq "ACTIVE")',
+    'status eq "ACTIVE" status eq "STAGED"',
+    'and status eq "ACTIVE"',
+])
+def test_parse_invalid(expression):
+    with pytest.raises(ConfigurationException):
+        parse_expression(expression)
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ('profile.login eq "john.doe@EXAMPLE.com"', True),
+    ('profile.login sw "john."', True),
+    ('profile.login sw "doe"', False),
+    ('profile.login co "doe@"', True),
+    ('profile.login ew ".org"', False),
+    ('profile.department eq "r&d \\"labs\\""', True),
+    ("profile.level gt 2 and profile.level lt 4", True),
+    ('lastUpdated gt "2024-02-29T00:00:00.000Z"', True),
+    ('lastUpdated ge "2024-03-01T10:00:00.001Z"', False),
+    ("profile.manager pr", False),
+    ("profile.firstName pr", True),
+    ('profile.manager ne "x"', True),
+    ('profile.groups eq "admins"', True),
+    ('status eq "STAGED" or profile.firstName sw "jo" and status ne "SUSPENDED"', True),
+    ('(status eq "STAGED" or profile.firstName sw "jo") and status eq "SUSPENDED"', False),
+])
+def test_evaluate(expression, expected):
+    assert evaluate(parse_expression(expression), USER) is expected
+
+
+def test_references():
+    node = parse_expression('profile.login sw "j" and (status eq "ACTIVE" or status eq "STAGED")')
+    assert references(node, "status")
+    assert not references(node, "profile.email")
+
+
+def test_offline_query(tmp_path):
+    store = UserStore(str(tmp_path / "cache"))
+    store.upsert_many([{"id": f"00u{index}", "status": "DEPROVISIONED" if index % 4 == 0 else "ACTIVE",
+                        "profile": {"login": f"user{index}@example.com", "email": f"user{index}@example.com",
+                                    "firstName": "Ann" if index % 2 else "Bob", "lastName": "Lee"}}
+                       for index in range(20)])
+    query = OfflineQuery(store)
+
+    def ids(**criteria):
+        return sorted(record["id"] for record in query.find(**criteria))
+
+    assert ids(filter='profile.login eq "USER3@example.com"') == ["00u3"]
+    assert ids(filter='profile.login sw "user1" and profile.firstName eq "Ann"') == \
+        ["00u1", "00u11", "00u13", "00u15", "00u17", "00u19"]
+    # Deprovisioned users are only listed by searches and status filters
+    assert ids(filter='profile.login eq "user4@example.com"') == []
+    assert ids(search='profile.login eq "user4@example.com"') == ["00u4"]
+    assert ids(filter='status eq "DEPROVISIONED" and profile.login sw "user1"') == ["00u12", "00u16"]
+    assert ids(query="bo", pattern={"login": "r1"}) == ["00u10", "00u14", "00u18"]
+    assert ids(pattern={"login": r"r1\d@"}, regex=True, search='status eq "ACTIVE"') == \
+        ["00u10", "00u11", "00u13", "00u14", "00u15", "00u17", "00u18", "00u19"]
+    assert len(list(query.find(search='profile.lastName eq "lee"', threshold=5))) == 5
@@ -0,0 +1,63 @@
+from oktapy.core.ratelimit import RateLimiter, bucket_key
+
+
+def test_bucket_key():
+    assert bucket_key("get", "https://example.okta.com/api/v1/users?limit=200") == "GET /api/v1/users"
+    assert bucket_key("GET", "/api/v1/users/jdoe") == "GET /api/v1/users/{id}"
+    assert bucket_key("GET", "/api/v1/users/john.doe%40example.com") == "GET /api/v1/users/{id}"
+    assert bucket_key("POST", "/api/v1/users/00u1abcd2EFGH3ijk4l5/lifecycle/deactivate") == \
+        "POST /api/v1/users/{id}/lifecycle/deactivate"
+    assert bucket_key("PUT", "/api/v1/groups/00g1abcd2EFGH3ijk4l5/users/00u1abcd2EFGH3ijk4l5") == \
+        "PUT /api/v1/groups/{id}/users/{id}"
+
+
+class Clock(object):
+    def __init__(self, now):
+        self.now = now
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_rate_limiter_waits_for_reset():
+    clock = Clock(1000.0)
+    limiter = RateLimiter(fraction=0.5, sleep=clock.sleep, clock=clock)
+    url = "/api/v1/users/jdoe"
+
+    # Unknown buckets are not delayed
+    assert limiter.reserve("GET", url) == 0
+    limiter.update("GET", url, {"X-Rate-Limit-Limit": "10", "X-Rate-Limit-Remaining": "7", "X-Rate-Limit-Reset": "1030"})
+
+    # Same bucket for another login: 7 -> 5 remaining, then the budget of half the limit is spent
+    assert [limiter.reserve("GET", "/api/v1/users/asmith") for _ in range(2)] == [0, 0]
+    assert limiter.reserve("GET", url) == 30
+    # The call was reserved from the next window, which resets a minute after it starts
+    assert limiter.reset_delay("GET", url) == 90
+    assert limiter.reset_delay("GET", "/api/v1/groups") == 1
+
+    # The Date header translates the reset time to the local clock
+    limiter.update("GET", "/api/v1/groups", {"X-Rate-Limit-Limit": "10", "X-Rate-Limit-Remaining": "0",
+                                             "X-Rate-Limit-Reset": "2020", "Date": "Thu, 01 Jan 1970 00:33:20 GMT"})
+    limiter.wait_reset("GET", "/api/v1/groups")
+    assert clock.slept == [20]
+
+
+def test_rate_limiter_keeps_reservations_of_estimated_window():
+    clock = Clock(1000.0)
+    limiter = RateLimiter(fraction=0.5, sleep=clock.sleep, clock=clock)
+    url = "/api/v1/users"
+    limiter.update("GET", url, {"X-Rate-Limit-Limit": "10", "X-Rate-Limit-Remaining": "5", "X-Rate-Limit-Reset": "1030"})
+
+    # Budget spent: 5 calls are reserved from the next window, 1030 to 1090
+    assert [limiter.reserve("GET", url) for _ in range(5)] == [30] * 5
+    # A late response of the current window does not drop those reservations
+    limiter.update("GET", url, {"X-Rate-Limit-Limit": "10", "X-Rate-Limit-Remaining": "0", "X-Rate-Limit-Reset": "1030"})
+    clock.now = 1030.0
+    # Okta reports fewer calls in the new window than were reserved from it; the reservations win
+    limiter.update("GET", url, {"X-Rate-Limit-Limit": "10", "X-Rate-Limit-Remaining": "8", "X-Rate-Limit-Reset": "1090"})
+    assert limiter.reserve("GET", url) == 60
@@ -0,0 +1,75 @@
+import time
+from email.utils import parsedate_to_datetime
+
+import pytest
+
+from oktapy.core.store import UserStore
+from oktapy.emulator import Dataset, Emulator
+from oktapy.manage.UserMgr import SYNC_MARGIN
+
+
+@pytest.fixture
+def emulator():
+    with Emulator(Dataset(users=500, groups=5)) as emulator:
+        yield emulator
+
+
+def _on_response(users, hook):
+    users._client._requester._session.hooks["response"].append(hook)
+
+
+def test_sync_marks_start_time(emulator, tmp_path):
+    users = emulator.okta().UserMgr()
+    store = UserStore(str(tmp_path / "cache"))
+    dates = []
+    pages = []
+
+    def changed_during_sync(response, *args, **kwargs):
+        dates.append(response.headers["Date"])
+        pages.append(response.url)
+        if len(pages) == 2:
+            # A user of the first page changes while the next pages are fetched
+            emulator.handle("POST", "/api/v1/users/00u00000000000000001/lifecycle/suspend")
+
+    _on_response(users, changed_during_sync)
+    result = users.syncUsers(store, limit=100, prefetch=0)
+    assert result["mode"] == "full"
+    assert result["fetched"] == result["total"] == 500
+
+    started = parsedate_to_datetime(dates[0]).timestamp() - SYNC_MARGIN
+    assert result["high_water_mark"] == time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(started))
+    assert store.lookup("id", ["00u00000000000000001"])[0]["status"] == "ACTIVE"
+
+    result = users.syncUsers(store)
+    assert result["mode"] == "delta"
+    assert result["fetched"] == 1
+    assert store.lookup("id", ["00u00000000000000001"])[0]["status"] == "SUSPENDED"
+
+
+def test_failed_full_sync_keeps_snapshot(emulator, tmp_path):
+    users = emulator.okta().UserMgr()
+    store = UserStore(str(tmp_path / "cache"))
+    users.syncUsers(store)
+    mark = store.high_water_mark()
+    # Deletes deactivate active users first
+    for _ in range(2):
+        emulator.handle("DELETE", "/api/v1/users/00u00000000000000002")
+    calls = []
+
+    def fail_third_page(response, *args, **kwargs):
+        calls.append(response.url)
+        if len(calls) == 3:
+            raise RuntimeError("connection lost")
+
+    _on_response(users, fail_third_page)
+    with pytest.raises(RuntimeError):
+        users.syncUsers(store, full=True, limit=100, prefetch=0)
+    assert store.count() == 500
+    assert store.high_water_mark() == mark
+    assert len(store.login_prefix("user1")) == 111
+
+    users._client._requester._session.hooks["response"].clear()
+    result = users.syncUsers(store, full=True)
+    assert result["fetched"] == result["total"] == 499
+    assert store.lookup("login", ["user2@example.com"]) == []
+    assert len(store.substring("login", "user49")) == 11
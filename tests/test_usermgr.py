@@ -0,0 +1,94 @@
+from oktapy.manage.UserMgr import UserMgr, pattern_keys
+from oktapy.resources.user import User
+
+
+def _user(index, **profile):
+    return User({"id": f"00u{index}", "status": "ACTIVE", "profile": dict(profile, login=f"user{index}@example.com")})
+
+
+def test_deep_search_page_without_pattern_attribute():
+    manager = UserMgr(None)
+    page = [_user(1), _user(2, title="Engineer")]
+
+    # A whole listing where nobody has the attribute ignores its pattern
+    assert len(manager.deep_search(page, {"department": "Sales"})) == 2
+    # A page of a longer listing does not
+    keys = pattern_keys({"department": "Sales", "login": "user"})
+    assert manager.deep_search(page, {"department": "Sales", "login": "user"}, keys=keys) == []
+    assert manager.deep_search(page + [_user(3, department="Sales")], {"department": "Sales"}, keys=["department"]) == [_user(3)]
+    assert pattern_keys({"department": "Sales", "login": "user"}, attr="title") == ["login"]
+
+
+def test_user_batch_frame_matches_users():
+    from pandas.testing import assert_frame_equal
+
+    from oktapy.manage.UserMgr import to_frame
+    from oktapy.resources.userbatch import UserBatch
+
+    records = [{"id": "00u1", "status": "ACTIVE", "profile": {"login": "a@example.com", "admin": False, "level": 0, "title": None}},
+               {"id": "00u2", "status": "STAGED", "profile": {"login": "b@example.com", "admin": True, "level": 2, "title": ""}},
+               {"id": "00u3", "status": "ACTIVE", "profile": {"login": "c@example.com", "manager": "a@example.com"}}]
+
+    assert_frame_equal(UserBatch(records).to_frame(), to_frame([User(dict(record)) for record in records]))
+
+
+def test_csv_payloads_keep_types_across_chunks(tmp_path):
+    from oktapy.manage.UserMgr import iter_users_from_csv
+
+    file = tmp_path / "users.csv"
+    file.write_text("login,employeeNumber,id,password\na@example.com,123,00u1,secret1\nb@example.com,,00u2,secret2\n"
+                    "c@example.com,007,00u3,secret3\nd@example.com,NA,00u4,secret4\n")
+
+    payloads = list(iter_users_from_csv(str(file), chunksize=2))
+    assert [payload["profile"]["employeeNumber"] for payload in payloads] == ["123", None, "007", "NA"]
+    assert payloads[0] == {"profile": {"login": "a@example.com", "employeeNumber": "123"},
+                           "credentials": {"password": {"value": "secret1"}}}
+    assert list(iter_users_from_csv(str(file), {"no-password": True}))[1] == \
+        {"profile": {"login": "b@example.com", "employeeNumber": None}}
+
+
+def test_purge_users_notifies_deletions_only():
+    from oktapy.emulator import Dataset, Emulator
+
+    with Emulator(Dataset(users=10, groups=1)) as emulator:
+        users = emulator.okta().UserMgr()
+        urls = []
+        users._client._requester._session.hooks["response"].append(lambda response, *args, **kwargs: urls.append(response.url))
+
+        result = users.purgeUsers([users.getUser("user1@example.com")], notify=True)
+        assert result["success"] == ["00u00000000000000001"]
+        assert [url.split("/api/v1/users/")[1] for url in urls[1:]] == \
+            ["00u00000000000000001/lifecycle/deactivate?sendEmail=false", "00u00000000000000001?sendEmail=true"]
+
+
+def test_resolve_users_by_top_level_attribute():
+    from oktapy.emulator import Dataset, Emulator
+
+    with Emulator(Dataset(users=100, groups=1)) as emulator:
+        users = emulator.okta().UserMgr()
+
+        found, unresolved = users.resolveUsers(["suspended", "RECOVERY"], field="status", concurrency=2)
+        assert len(found) == 3 and {user["status"] for user in found} == {"SUSPENDED"}
+        assert unresolved == ["RECOVERY"]
+        found, unresolved = users.resolveUsers(["00u00000000000000007", "00u00000000000000999"], field="id")
+        assert [user["id"] for user in found] == ["00u00000000000000007"]
+        assert unresolved == ["00u00000000000000999"]
+        found, unresolved = users.resolveUsers(["12", "13"], field="employeeNumber")
+        assert sorted(user["profile"]["login"] for user in found) == ["user12@example.com", "user13@example.com"]
+        assert unresolved == []
+
+
+def test_resolve_users_with_reserved_url_characters():
+    from oktapy.emulator import Dataset, Emulator
+
+    with Emulator(Dataset(users=10, groups=1)) as emulator:
+        users = emulator.okta().UserMgr()
+        logins = ["john+test@example.com", "r&d#1@example.com"]
+        users.createUsers([{"profile": {"login": login, "email": login}} for login in logins])
+
+        found, unresolved = users.resolveUsers(logins + ["user1@example.com", "nobody+x@example.com"])
+        assert sorted(user["profile"]["login"] for user in found) == ["john+test@example.com", "r&d#1@example.com",
+                                                                       "user1@example.com"]
+        assert unresolved == ["nobody+x@example.com"]
+        exported = users.exportUsers(shards=2, search='profile.login sw "john+"')
+        assert [user["profile"]["login"] for user in exported] == ["john+test@example.com"]